@@ -17,6 +17,23 @@ SECRET_KEY = 'django-insecure-4(3&#f=oj+wc027ka34l8b@%%i#3kaibm7gvji7izl=6*7ra)1
 
 DEBUG = os.getenv('DJANGO_DEBUG', 'true').lower() == 'true'
 
+# Замеры запросов (Server-Timing + строка в лог results.perf), см. results/perf.py
+PERF_TIMING = os.getenv('DJANGO_PERF_TIMING', 'false').lower() == 'true'
+
+# Метрики Prometheus (/metrics/), общий файл для всех воркеров, см. results/metrics.py
+METRICS_ENABLED = os.getenv('DJANGO_METRICS', 'false').lower() == 'true'
+METRICS_STORE = os.getenv('DJANGO_METRICS_STORE', str(BASE_DIR / 'metrics.sqlite3'))
+METRICS_FLUSH_INTERVAL = 5  # секунд между сбросами дельт процесса в METRICS_STORE
+
+# Журнал медленных запросов (0 — выключен), сводка: manage.py slow_requests
+SLOW_REQUEST_THRESHOLD_MS = int(os.getenv('DJANGO_SLOW_REQUEST_MS', '0'))
+SLOW_REQUEST_LOG = os.getenv('DJANGO_SLOW_REQUEST_LOG', str(BASE_DIR / 'logs' / 'slow_requests.log'))
+SLOW_REQUEST_LOG_MAX_BYTES = 5 * 1024 * 1024
+SLOW_REQUEST_LOG_BACKUPS = 5
+
+# Куда ProfileMiddleware сохраняет .prof (pstats) по ?_profile=1
+PROFILE_DIR = os.getenv('DJANGO_PROFILE_DIR', str(BASE_DIR / 'profiles'))
+
 # Всегда держим локальные хосты + твои домены
 ALLOWED_HOSTS = [
     'localhost',
@@ -47,10 +64,18 @@ INSTALLED_APPS = [
 # --- MIDDLEWARE ---
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    # статика с хешами: br/gzip + immutable (при SERVE_STATIC), до сессий и прочего
+    'results.staticfiles.PrecompressedStaticMiddleware',
+    # замеры запросов; выключенные в настройках Django не подключает (MiddlewareNotUsed)
+    'results.perf.ServerTimingMiddleware',
+    'results.metrics.MetricsMiddleware',
+    'results.slowlog.SlowRequestMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    # ?_profile=1 для staff — отчёт cProfile вместо страницы
+    'results.profiling.ProfileMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -82,6 +107,30 @@ DATABASES = {
     }
 }
 
+# --- Кэш / сессии ---
+# Файловый кэш общий для всех воркеров на хосте и не требует сервисов.
+# Для Redis: {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': 'redis://…'}
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.getenv('DJANGO_CACHE_DIR', str(BASE_DIR / 'cache')),
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    }
+}
+
+# Сессия читается из кэша, БД — только при промахе (запись идёт в оба)
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+
+# Права пользователя кэшируются между запросами, см. results/permcache.py
+AUTHENTICATION_BACKENDS = ['results.permcache.CachedModelBackend']
+PERMISSION_CACHE_TIMEOUT = 15 * 60
+
+# --- Фоновые задачи (results/jobs.py, воркер: manage.py run_jobs) ---
+# сколько секунд взятая задача невидима другим воркерам
+JOBS_VISIBILITY_TIMEOUT = 5 * 60
+# пауза перед первым повтором после ошибки, дальше удваивается
+JOBS_RETRY_DELAY = 30
+
 # --- Валидаторы пароля ---
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
@@ -101,4 +150,25 @@ STATIC_URL = '/static/'
 STATICFILES_DIRS = [BASE_DIR / 'static']          # твои исходники статики
 STATIC_ROOT = BASE_DIR / 'staticfiles'            # сюда collectstatic собирает
 
+# collectstatic: имена с хешем содержимого + .gz/.br рядом (см. results/staticfiles.py)
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'results.staticfiles.CompressedManifestStaticFilesStorage'},
+}
+# Отдавать STATIC_ROOT из Django (если веб-сервер не настроен на /static/)
+SERVE_STATIC = os.getenv('DJANGO_SERVE_STATIC', str(not DEBUG)).lower() == 'true'
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# --- Логи ---
+# results.perf пишет по строке JSON на запрос, когда включён PERF_TIMING
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'results.perf': {'handlers': ['console'], 'level': 'INFO', 'propagate': False},
+    },
+}
@@ -1,8 +1,10 @@
 # results/admin.py
 
 from django.contrib import admin
+from django.db.models import Sum
+from django.db.models.functions import Coalesce
 from .models import Event, DisciplineType, Athlete, DisciplineResult, PuppyTrainingSession, PuppyTrainingExercise, \
-    Exercise, Puppy
+    Exercise, Puppy, Job
 
 
 @admin.register(Event)
@@ -22,25 +24,44 @@ class DisciplineTypeAdmin(admin.ModelAdmin):
 class AthleteAdmin(admin.ModelAdmin):
     list_display = ('name', 'event', 'growth_category', 'is_champion', 'total_points')
     list_filter = ('event', 'growth_category', 'is_champion')
+    list_select_related = ('event',)
     search_fields = ('name',)
+    autocomplete_fields = ('event',)
+
+    def get_queryset(self, request):
+        # сумма очков считается в том же запросе (вместо results.all() на каждую строку);
+        # event нужен и в списке, и в __str__ для автокомплита
+        return (
+            super().get_queryset(request)
+            .select_related('event')
+            .annotate(_total_points=Coalesce(Sum('results__points'), 0.0))
+        )
+
+    @admin.display(description='Итого очков', ordering='_total_points')
+    def total_points(self, obj):
+        return obj._total_points
 
 
 @admin.register(DisciplineResult)
 class DisciplineResultAdmin(admin.ModelAdmin):
     list_display = ('athlete', 'discipline', 'result', 'points')
     list_filter = ('discipline', 'athlete__event')
+    list_select_related = ('athlete__event', 'discipline')
     search_fields = ('athlete__name',)
+    autocomplete_fields = ('athlete',)
 
 
 class PuppyTrainingExerciseInline(admin.TabularInline):
     model = PuppyTrainingExercise
     extra = 0
+    autocomplete_fields = ('exercise',)
 
 
 @admin.register(PuppyTrainingSession)
 class PuppyTrainingSessionAdmin(admin.ModelAdmin):
     list_display = ("date", "start_time", "end_time", "notes")
     list_filter = ("date",)
+    autocomplete_fields = ("puppy",)
     inlines = [PuppyTrainingExerciseInline]
 
 
@@ -55,3 +76,11 @@ class PuppyAdmin(admin.ModelAdmin):
     list_display = ("pet_name", "registered_name", "sex", "birth_date")
     search_fields = ("pet_name", "registered_name")
     list_filter = ("sex",)
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ("key", "state", "attempts", "run_after", "locked_by", "created_at")
+    list_filter = ("state", "kind")
+    search_fields = ("key",)
+    readonly_fields = ("kind", "key", "args", "attempts", "locked_until", "locked_by", "last_error", "created_at")
@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+import calendar
+from datetime import date, timedelta
+from typing import Dict, List, Tuple
+
+from django.db.models import Count, DurationField, ExpressionWrapper, F, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+CALENDAR_VIEWS = ("week", "month")
+
+
+def calendar_range(view: str, anchor: date) -> Tuple[date, date]:
+    """
+    Границы периода для календаря дневника:
+      * week  — неделя (пн–вс), в которую попадает anchor
+      * month — календарный месяц anchor
+    """
+    if view == "week":
+        start = anchor - timedelta(days=anchor.weekday())
+        return start, start + timedelta(days=6)
+    last_day = calendar.monthrange(anchor.year, anchor.month)[1]
+    return anchor.replace(day=1), anchor.replace(day=last_day)
+
+
+def shift_anchor(view: str, anchor: date, step: int) -> date:
+    """Соседний период: step=-1 — предыдущий, step=+1 — следующий."""
+    if view == "week":
+        return anchor + timedelta(weeks=step)
+    month_index = anchor.year * 12 + (anchor.month - 1) + step
+    return date(month_index // 12, month_index % 12 + 1, 1)
+
+
+def _exercise_sum(field: str):
+    """Подзапрос: сумма поля упражнений по одной сессии (0, если упражнений нет)."""
+    from .models import PuppyTrainingExercise  # локальный импорт, чтобы избежать циклов
+
+    per_session = (
+        PuppyTrainingExercise.objects
+        .filter(session=OuterRef("pk"))
+        .order_by()
+        .values("session")
+        .annotate(s=Sum(field))
+        .values("s")
+    )
+    return Coalesce(Subquery(per_session), 0)
+
+
+def day_totals(puppy, start: date, end: date) -> Dict[date, dict]:
+    """
+    Сводка дневника по дням за период ОДНИМ запросом (GROUP BY date):
+      {date: {"sessions", "planned", "actual", "duration"}}
+
+    Суммы повторений берём подзапросами по сессии, а не JOIN'ом,
+    иначе длительность сессии умножалась бы на число её упражнений.
+    Дни без тренировок в словарь не попадают.
+    """
+    from .models import PuppyTrainingSession  # локальный импорт, чтобы избежать циклов
+
+    rows = (
+        PuppyTrainingSession.objects
+        .filter(puppy=puppy, date__range=(start, end))
+        .annotate(
+            _planned=_exercise_sum("planned_reps"),
+            _actual=_exercise_sum("actual_reps"),
+            _duration=ExpressionWrapper(F("end_time") - F("start_time"), output_field=DurationField()),
+        )
+        .values("date")
+        .annotate(
+            sessions=Count("id"),
+            planned=Sum("_planned"),
+            actual=Sum("_actual"),
+            duration=Sum("_duration"),
+        )
+        .order_by("date")
+    )
+    return {row.pop("date"): row for row in rows}
+
+
+def calendar_weeks(view: str, anchor: date, totals: Dict[date, dict]) -> List[List[dict]]:
+    """
+    Сетка календаря: список недель по 7 ячеек (пн–вс).
+    Для месяца недели дополняются днями соседних месяцев (in_range=False).
+    """
+    start, end = calendar_range(view, anchor)
+    grid_start = start - timedelta(days=start.weekday())
+    grid_end = end + timedelta(days=6 - end.weekday())
+
+    weeks: List[List[dict]] = []
+    day = grid_start
+    while day <= grid_end:
+        week = []
+        for _ in range(7):
+            t = totals.get(day)
+            week.append({
+                "date": day,
+                "in_range": start <= day <= end,
+                "totals": t,
+                "minutes": int(t["duration"].total_seconds() // 60) if t and t["duration"] else 0,
+            })
+            day += timedelta(days=1)
+        weeks.append(week)
+    return weeks
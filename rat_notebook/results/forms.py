@@ -1,9 +1,11 @@
 from django import forms
 from django.core.exceptions import ValidationError
 from .models import Athlete, DisciplineResult, Event
-from django.forms import inlineformset_factory
+from django.db import models, transaction
+from django.forms import BaseInlineFormSet, inlineformset_factory
 from django.forms.widgets import Select
 from .models import PuppyTrainingSession, PuppyTrainingExercise, Exercise, Puppy
+from .signals import exercises_bulk_created
 
 
 class LoginForm(forms.Form):
@@ -11,6 +13,26 @@ class LoginForm(forms.Form):
     password = forms.CharField(widget=forms.PasswordInput, label="Пароль")
 
 
+class VersionedFormMixin:
+    """
+    Скрытое поле version — версия строки, с которой пользователь открыл форму.
+    Её и проверит save() (см. VersionedModel): если за это время строку
+    сохранил кто-то другой, будет StaleObjectError. Без поля в POST (старые
+    клиенты) проверяется версия, загруженная во view.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields["version"] = forms.IntegerField(
+            widget=forms.HiddenInput, min_value=0, required=False, initial=self.instance.version)
+
+    def clean(self):
+        cleaned = super().clean()
+        if cleaned.get("version") is not None:
+            self.instance.version = cleaned["version"]
+        return cleaned
+
+
 # ---- Правила валидации результатов ----
 VALIDATION_RULES = {
     'long_jump':    {'step': 10,   'min': 0,   'max': 800},
@@ -65,12 +87,14 @@ class AthleteForm(forms.ModelForm):
 
 
 # ---- Результат дисциплины ----
-class DisciplineResultForm(forms.ModelForm):
+class DisciplineResultForm(VersionedFormMixin, forms.ModelForm):
     class Meta:
         model = DisciplineResult
         fields = ['athlete', 'discipline', 'result']
         widgets = {
-            'athlete': forms.Select(attrs={'class': 'form-select'}),
+            # спортсмена выбирают через поиск (event_athlete_search) — в форме только id,
+            # при валидации ModelChoiceField достаёт одну строку по этому id
+            'athlete': forms.HiddenInput(),
             'discipline': forms.Select(attrs={'class': 'form-select'}),
             # result на старте — базовый, значения min/max/step будут перезаписаны в __init__
             'result': forms.NumberInput(attrs={
@@ -96,6 +120,7 @@ class DisciplineResultForm(forms.ModelForm):
             cup = ' 🏆' if obj.is_champion else ''
             return f"{obj.name} ({obj.growth_category}){cup}"
         self.fields['athlete'].label_from_instance = athlete_label
+        self._athlete_label = athlete_label
 
         # если дисциплина уже выбрана (редактирование результата) → подставляем step/min/max
         discipline = self.initial.get('discipline') or self.data.get('discipline')
@@ -118,29 +143,47 @@ class DisciplineResultForm(forms.ModelForm):
             except Exception:
                 pass
 
+    def selected_athlete_label(self):
+        """Подпись выбранного спортсмена для повторного показа формы (после ошибки)."""
+        athlete = self.cleaned_data.get('athlete') if hasattr(self, 'cleaned_data') else None
+        if athlete is None:
+            pk = self['athlete'].value()
+            if not pk:
+                return ''
+            try:
+                athlete = self.fields['athlete'].queryset.filter(pk=pk).first()
+            except (TypeError, ValueError):
+                athlete = None
+        return self._athlete_label(athlete) if athlete else ''
+
     def clean_result(self):
         result = self.cleaned_data.get('result')
         discipline = self.cleaned_data.get('discipline')
-
-        if discipline and result is not None:
-            rules = VALIDATION_RULES.get(discipline.code)
-            if rules:
-                mn, mx, step = rules['min'], rules['max'], rules['step']
-
-                if not (mn <= result <= mx):
-                    raise ValidationError(
-                        f"Результат для «{discipline.verbose}» должен быть между {mn} и {mx}."
-                    )
-
-                # проверка кратности шагу
-                rem = (result - mn) / step
-                if abs(round(rem) - rem) > 1e-9:
-                    raise ValidationError(
-                        f"Результат для «{discipline.verbose}» должен быть кратен {step}."
-                    )
+        if discipline:
+            validate_result(discipline, result)
         return result
 
 
+def validate_result(discipline, result):
+    """Диапазон и кратность шагу по VALIDATION_RULES; ValidationError с текстом для судьи."""
+    rules = VALIDATION_RULES.get(discipline.code)
+    if not rules or result is None:
+        return
+    mn, mx, step = rules['min'], rules['max'], rules['step']
+
+    if not (mn <= result <= mx):
+        raise ValidationError(
+            f"Результат для «{discipline.verbose}» должен быть между {mn} и {mx}."
+        )
+
+    # проверка кратности шагу
+    rem = (result - mn) / step
+    if abs(round(rem) - rem) > 1e-9:
+        raise ValidationError(
+            f"Результат для «{discipline.verbose}» должен быть кратен {step}."
+        )
+
+
 # ---- Событие ----
 class EventForm(forms.ModelForm):
     class Meta:
@@ -158,7 +201,7 @@ class EventForm(forms.ModelForm):
         }
 
 
-class PuppyTrainingSessionForm(forms.ModelForm):
+class PuppyTrainingSessionForm(VersionedFormMixin, forms.ModelForm):
     class Meta:
         model = PuppyTrainingSession
         fields = ["date", "start_time", "end_time", "notes"]
@@ -222,10 +265,55 @@ class PuppyTrainingExerciseForm(forms.ModelForm):
         self.fields["exercise"].widget.attrs["class"] = (cls + " form-select js-exercise-select").strip()
 
 
+class BasePuppyTrainingExerciseFormSet(BaseInlineFormSet):
+    """
+    Новые строки сохраняем пачкой: один Max(position) на сессию,
+    позиции раздаём подряд и пишем одним bulk_create
+    (вместо агрегата + INSERT на каждую строку в PuppyTrainingExercise.save()).
+    """
+
+    def save_new_objects(self, commit=True):
+        if not commit:
+            return super().save_new_objects(commit=False)
+
+        self.new_objects = []
+        for form in self.extra_forms:
+            if not form.has_changed():
+                continue
+            # как в Django: удалённые (DELETE) новые строки не сохраняем
+            if self.can_delete and self._should_delete_form(form):
+                continue
+            self.new_objects.append(self.save_new(form, commit=False))
+
+        if not self.new_objects:
+            return self.new_objects
+
+        with transaction.atomic():
+            # блокируем сессию, чтобы параллельные сохранения не взяли одинаковый max
+            PuppyTrainingSession.objects.select_for_update().filter(pk=self.instance.pk).exists()
+            max_pos = (
+                PuppyTrainingExercise.objects
+                .filter(session=self.instance)
+                .aggregate(m=models.Max("position"))
+                .get("m")
+            ) or 0
+            for offset, obj in enumerate(self.new_objects, start=1):
+                obj.position = max_pos + offset
+            PuppyTrainingExercise.objects.bulk_create(self.new_objects)
+
+            # bulk_create не шлёт post_save — сводки и поиск обновятся по своему сигналу
+            exercises_bulk_created.send(
+                sender=PuppyTrainingExercise, session=self.instance, exercises=self.new_objects,
+            )
+
+        return self.new_objects
+
+
 PuppyTrainingExerciseCreateFormSet = inlineformset_factory(
     parent_model=PuppyTrainingSession,
     model=PuppyTrainingExercise,
     form=PuppyTrainingExerciseForm,
+    formset=BasePuppyTrainingExerciseFormSet,
     extra=1,           # на создании пусть будет 1 пустая строка
     can_delete=False,  # чекбокс удаления нам не нужен
 )
@@ -234,6 +322,7 @@ PuppyTrainingExerciseEditFormSet = inlineformset_factory(
     parent_model=PuppyTrainingSession,
     model=PuppyTrainingExercise,
     form=PuppyTrainingExerciseForm,
+    formset=BasePuppyTrainingExerciseFormSet,
     extra=0,           # на редактировании НЕ показываем пустую строку
     can_delete=True,
 )
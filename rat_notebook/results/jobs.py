@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+"""
+Очередь фоновых задач на той же БД — без Redis/Celery, для хостинга с одним
+always-on процессом (manage.py run_jobs) или cron (run_jobs --once).
+
+    enqueue("rescore_event", event_id=42)   # из view/сигнала, в транзакции изменения
+
+Склейка: задача с тем же видом и аргументами, уже ждущая в очереди, новую не
+создаёт (частичный уникальный индекс по key среди state=queued). Задача,
+которая уже выполняется, не считается: данные поменялись после её старта,
+значит нужен ещё один проход.
+
+Забор — условный UPDATE (state/locked_until не изменились с момента чтения),
+поэтому два воркера одну задачу не возьмут и без SELECT ... FOR UPDATE.
+Взятая задача невидима VISIBILITY_TIMEOUT секунд; воркер упал — по истечении
+её заберёт другой (это тоже попытка; после max_attempts — state=failed). Ошибка — повтор через RETRY_DELAY *
+2^(попытка-1), после max_attempts — state=failed.
+
+Обработчики должны быть идемпотентны: при истёкшем таймауте задача может
+выполниться дважды.
+"""
+import json
+import logging
+import os
+import socket
+import traceback
+from datetime import timedelta
+from typing import Callable, Dict, Optional
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from . import journal, rollups
+from .models import Athlete, DisciplineResult, Event, Job
+from .rescoring import apply_changes, champion_changes, diff_events
+
+logger = logging.getLogger(__name__)
+
+MAX_RETRY_DELAY = 60 * 60
+
+HANDLERS: Dict[str, Callable] = {}
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def handler(kind: str):
+    """Регистрирует обработчик вида задачи; аргументы задачи приходят как kwargs."""
+    def register(func):
+        HANDLERS[kind] = func
+        return func
+    return register
+
+
+def job_key(kind: str, **args) -> str:
+    return f"{kind}:{json.dumps(args, sort_keys=True, separators=(',', ':'))}"
+
+
+def enqueue(kind: str, delay: float = 0, max_attempts: int = 5, **args) -> bool:
+    """
+    Ставит задачу в очередь; False — такая уже ждёт (склеено).
+    Один запрос, если задача уже есть, два — если нет.
+    """
+    key = job_key(kind, **args)
+    if Job.objects.filter(key=key, state=Job.STATE_QUEUED).exists():
+        return False
+    # гонка двух постановок решается уникальным индексом: вторая вставка молча пропускается
+    Job.objects.bulk_create([Job(
+        kind=kind, key=key, args=args, max_attempts=max_attempts,
+        run_after=timezone.now() + timedelta(seconds=delay),
+    )], ignore_conflicts=True)
+    return True
+
+
+def is_pending(kind: str, **args) -> bool:
+    """Задача ждёт в очереди или выполняется."""
+    return Job.objects.filter(key=job_key(kind, **args),
+                              state__in=[Job.STATE_QUEUED, Job.STATE_RUNNING]).exists()
+
+
+def worker_name() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def claim(worker: str) -> Optional[Job]:
+    """Забирает одну готовую задачу (или задачу с истёкшим таймаутом) либо None."""
+    now = timezone.now()
+    visibility = timedelta(seconds=_setting("JOBS_VISIBILITY_TIMEOUT", 300))
+    # воркер погиб или не уложился в таймаут на последней попытке — больше не берём
+    Job.objects.filter(state=Job.STATE_RUNNING, locked_until__lt=now, attempts__gte=F("max_attempts")).update(
+        state=Job.STATE_FAILED, locked_until=None,
+        last_error="Истёк таймаут видимости (visibility timeout) на последней попытке",
+    )
+    candidates = (
+        Job.objects
+        .filter(Q(state=Job.STATE_QUEUED, run_after__lte=now)
+                | Q(state=Job.STATE_RUNNING, locked_until__lt=now, attempts__lt=F("max_attempts")))
+        .order_by("run_after", "id")
+        .values_list("id", "state", "locked_until")[:10]
+    )
+    for pk, state, locked_until in candidates:
+        taken = Job.objects.filter(pk=pk, state=state, locked_until=locked_until).update(
+            state=Job.STATE_RUNNING, locked_by=worker, locked_until=now + visibility,
+            attempts=F("attempts") + 1,
+        )
+        if taken:
+            return Job.objects.get(pk=pk)
+    return None
+
+
+def _finish(job: Job, worker: str) -> None:
+    # таймаут истёк и задачу забрал другой воркер — его строку не трогаем
+    Job.objects.filter(pk=job.pk, locked_by=worker, attempts=job.attempts).delete()
+
+
+def _fail(job: Job, worker: str, error: str, retry: bool = True) -> None:
+    mine = Job.objects.filter(pk=job.pk, locked_by=worker, attempts=job.attempts)
+    if not retry or job.attempts >= job.max_attempts:
+        mine.update(state=Job.STATE_FAILED, locked_until=None, last_error=error)
+        return
+    delay = min(_setting("JOBS_RETRY_DELAY", 30) * 2 ** (job.attempts - 1), MAX_RETRY_DELAY)
+    try:
+        with transaction.atomic():
+            mine.update(state=Job.STATE_QUEUED, locked_until=None, last_error=error,
+                        run_after=timezone.now() + timedelta(seconds=delay))
+    except IntegrityError:
+        # пока выполнялась, поставили такую же — повтор сделает она
+        mine.delete()
+
+
+def run_job(job: Job, worker: str) -> bool:
+    func = HANDLERS.get(job.kind)
+    if func is None:
+        _fail(job, worker, f"Неизвестный вид задачи: {job.kind}", retry=False)
+        return False
+    try:
+        with transaction.atomic():
+            func(**job.args)
+    except Exception:
+        logger.exception("Задача %s, попытка %s/%s", job.key, job.attempts, job.max_attempts)
+        _fail(job, worker, traceback.format_exc())
+        return False
+    _finish(job, worker)
+    return True
+
+
+def run_pending(worker: Optional[str] = None, limit: Optional[int] = None) -> int:
+    """Выполняет готовые задачи (не больше limit); возвращает, сколько взято."""
+    worker = worker or worker_name()
+    done = 0
+    while limit is None or done < limit:
+        job = claim(worker)
+        if job is None:
+            break
+        run_job(job, worker)
+        done += 1
+    return done
+
+
+# ---------------- обработчики ----------------
+
+@handler("rescore_event")
+def rescore_event(event_id):
+    apply_changes(diff_events([event_id]))
+    enqueue("snapshot_standings", event_id=event_id)
+
+
+@handler("snapshot_standings")
+def snapshot_standings(event_id):
+    # снимок делается, только если его нет или хвост журнала длинный
+    if Event.objects.filter(pk=event_id).exists():
+        journal.standings_at(event_id)
+
+
+@handler("rebuild_rollups")
+def rebuild_rollups(puppy_id=None):
+    rollups.rebuild(puppy_id)
+
+
+# ---------------- постановка при изменениях ----------------
+
+def enqueue_rescore(event_id) -> bool:
+    return enqueue("rescore_event", event_id=event_id)
+
+
+@receiver(post_save, sender=Athlete)
+def athlete_changed(sender, instance, created=False, raw=False, **kwargs):
+    if raw:
+        return
+    old = getattr(instance, "_journal_old", None)  # снят журналом в pre_save
+    if (not created and old and instance.is_champion
+            and (old["champion"], old["category"]) != (True, instance.growth_category)):
+        # очки чемпиона зависят только от его категории — пересчитываем сразу;
+        # места остальных (и очки бывшего чемпиона) — в фоновом пересчёте события
+        apply_changes(champion_changes(athlete_ids=[instance.pk]))
+    enqueue_rescore(instance.event_id)
+
+
+@receiver(post_delete, sender=Athlete)
+def athlete_deleted(sender, instance, **kwargs):
+    enqueue_rescore(instance.event_id)
+
+
+@receiver(post_save, sender=DisciplineResult)
+def result_changed(sender, instance, raw=False, update_fields=None, **kwargs):
+    # пересчёт сам пишет очки — из-за него повторно не ставим
+    if raw or (update_fields is not None and set(update_fields) <= {"points"}):
+        return
+    enqueue_rescore(instance.athlete.event_id)
+
+
+@receiver(post_delete, sender=DisciplineResult)
+def result_deleted(sender, instance, **kwargs):
+    # событие берём из журнала: при каскадном удалении спортсмена его строки уже нет
+    event_id = getattr(instance, "_journal_old", (None, None))[0]
+    if event_id is not None:
+        enqueue_rescore(event_id)
@@ -0,0 +1,267 @@
+# -*- coding: utf-8 -*-
+"""
+Журнал результатов, снимки мест и воспроизведение.
+
+Каждое создание/изменение/удаление спортсмена или результата дописывает
+ResultJournalEntry со старым и новым состоянием (сигналы ниже, в той же
+транзакции, что и само изменение). Пересчёт очков (save(update_fields=
+['points']), bulk_update в rescoring) не журналируется — очки выводятся.
+
+Состояние события (state) — JSON:
+    {"athletes": {"<id>": {"name", "champion", "category"}},
+     "results":  {"<id>": {"athlete", "discipline", "result"}}}
+
+standings_at(event_id, at) берёт последний снимок не позже at и применяет
+хвост журнала после него, поэтому стоимость пропорциональна хвосту, а не
+истории события. Применение записи идемпотентно (кладём новое состояние
+целиком), так что повторно применённая запись ничего не портит.
+
+bulk_create/update() в обход save() журнал не видят: после seed_data и
+подобного — manage.py snapshot_standings. Пакетные пути, которым журнал
+нужен (офлайн-синхронизация, results/sync.py), пишут его сами — write_many().
+"""
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.db import transaction
+from django.db.models import Max
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from .models import Athlete, DisciplineResult, DisciplineType, Event, ResultJournalEntry, StandingsSnapshot
+from .scoring import GROWTH_GROUPS, _competition_rank, event_expected_points
+
+# после стольких записей хвоста standings_at() сам сохраняет новый снимок
+SNAPSHOT_EVERY = 200
+
+CHAMPIONS = "C"
+
+
+def empty_state() -> dict:
+    return {"athletes": {}, "results": {}}
+
+
+def athlete_state(athlete) -> dict:
+    return {"name": athlete.name, "champion": athlete.is_champion, "category": athlete.growth_category}
+
+
+def current_state(event_id: int) -> dict:
+    """Состояние события по таблицам — два SELECT."""
+    state = empty_state()
+    for pk, name, champion, category in Athlete.objects.filter(event_id=event_id).values_list(
+            "id", "name", "is_champion", "growth_category"):
+        state["athletes"][str(pk)] = {"name": name, "champion": champion, "category": category}
+    for pk, athlete_id, discipline_id, result in DisciplineResult.objects.filter(
+            athlete__event_id=event_id).values_list("id", "athlete_id", "discipline_id", "result"):
+        state["results"][str(pk)] = {"athlete": athlete_id, "discipline": discipline_id, "result": result}
+    return state
+
+
+def apply(state: dict, entries: Iterable[Tuple[str, str, int, Optional[dict]]]) -> dict:
+    """Применяет записи (kind, op, object_id, new) к state на месте."""
+    for kind, op, object_id, new in entries:
+        bucket = state["athletes"] if kind == ResultJournalEntry.KIND_ATHLETE else state["results"]
+        if op == ResultJournalEntry.OP_DELETE:
+            bucket.pop(str(object_id), None)
+        else:
+            bucket[str(object_id)] = new
+    return state
+
+
+def compute_standings(state: dict, discipline_codes: Dict[int, str], event_codes: Iterable[str]) -> Dict[str, List[dict]]:
+    """
+    Места по состоянию — без запросов. Очки как в scoring.event_expected_points,
+    места и порядок — как на странице события: чемпионы отдельной группой "C",
+    остальные по ростовым категориям; сортировка (сумма, имя) по убыванию,
+    competition ranking.
+    """
+    athletes = state["athletes"]
+    rows = []
+    for result_id, r in state["results"].items():
+        a = athletes.get(str(r["athlete"]))
+        if a is not None:
+            rows.append((result_id, discipline_codes.get(r["discipline"]), a["champion"], a["category"], r["result"]))
+    expected = event_expected_points(rows, event_codes)
+
+    totals = {athlete_id: 0 for athlete_id in athletes}
+    for result_id, r in state["results"].items():
+        if str(r["athlete"]) in totals:
+            totals[str(r["athlete"])] += int(expected.get(result_id, 0))
+
+    groups: Dict[str, List[Tuple[str, dict]]] = {}
+    for athlete_id, a in athletes.items():
+        group = CHAMPIONS if a["champion"] else a["category"]
+        if group == CHAMPIONS or group in GROWTH_GROUPS:
+            groups.setdefault(group, []).append((athlete_id, a))
+
+    out = {}
+    for group in [CHAMPIONS] + GROWTH_GROUPS:
+        if group not in groups:
+            continue
+        pairs = sorted(((a, totals[a[0]]) for a in groups[group]),
+                       key=lambda p: (p[1], p[0][1]["name"]), reverse=True)
+        out[group] = [
+            {"athlete_id": int(athlete_id), "athlete": a["name"], "total": total, "place": place}
+            for (athlete_id, a), total, place in _competition_rank(pairs)
+        ]
+    return out
+
+
+def _codes(event_id: int) -> Tuple[Dict[int, str], List[str]]:
+    codes = dict(DisciplineType.objects.values_list("id", "code"))
+    event_codes = list(Event.disciplines.through.objects.filter(event_id=event_id)
+                       .values_list("disciplinetype__code", flat=True))
+    return codes, event_codes
+
+
+@dataclass
+class Replay:
+    event_id: int
+    state: dict
+    standings: Dict[str, List[dict]]
+    last_entry_id: int
+    snapshot: Optional[StandingsSnapshot]
+    tail: int  # сколько записей журнала применено поверх снимка
+
+
+def take_snapshot(event_id: int) -> StandingsSnapshot:
+    """Снимок по текущим таблицам (а не по журналу) — годится и как исходная точка."""
+    with transaction.atomic():
+        # позицию читаем ДО состояния: запись, попавшая между ними, при
+        # воспроизведении применится повторно — это безопасно
+        last = ResultJournalEntry.objects.filter(event_id=event_id).aggregate(m=Max("id"))["m"] or 0
+        state = current_state(event_id)
+        return StandingsSnapshot.objects.create(
+            event_id=event_id, last_entry_id=last, state=state,
+            standings=compute_standings(state, *_codes(event_id)),
+        )
+
+
+def tail(event_id: int, after_id: int, at=None):
+    """Записи события после позиции after_id (и не позже at): (id, kind, op, object_id, new)."""
+    qs = ResultJournalEntry.objects.filter(event_id=event_id, id__gt=after_id)
+    if at is not None:
+        qs = qs.filter(created_at__lte=at)
+    return qs.order_by("id").values_list("id", "kind", "op", "object_id", "new")
+
+
+def standings_at(event_id: int, at=None) -> Replay:
+    """
+    Места события на момент at (None — сейчас): снимок + хвост журнала.
+
+    Если снимка не позже at нет, история воспроизводится с пустого состояния —
+    это верно только для событий, созданных уже при журнале. Для at=None без
+    снимков сначала делается снимок по таблицам.
+    """
+    snapshots = StandingsSnapshot.objects.filter(event_id=event_id)
+    if at is not None:
+        snapshots = snapshots.filter(created_at__lte=at)
+    snapshot = snapshots.order_by("-last_entry_id", "-id").first()
+    if snapshot is None and at is None:
+        snapshot = take_snapshot(event_id)
+        return Replay(event_id, snapshot.state, snapshot.standings, snapshot.last_entry_id, snapshot, 0)
+
+    state = snapshot.state if snapshot else empty_state()
+    last = snapshot.last_entry_id if snapshot else 0
+    entries = list(tail(event_id, last, at))
+    if not entries and snapshot is not None:
+        return Replay(event_id, state, snapshot.standings, last, snapshot, 0)
+
+    apply(state, (e[1:] for e in entries))
+    if entries:
+        last = entries[-1][0]
+    standings = compute_standings(state, *_codes(event_id))
+
+    if at is None and len(entries) >= SNAPSHOT_EVERY:
+        snapshot = StandingsSnapshot.objects.create(
+            event_id=event_id, last_entry_id=last, state=state, standings=standings)
+    return Replay(event_id, state, standings, last, snapshot, len(entries))
+
+
+# ---------------- запись журнала ----------------
+
+def _write(event_id, kind, op, object_id, old, new):
+    ResultJournalEntry.objects.create(event_id=event_id, kind=kind, op=op, object_id=object_id, old=old, new=new)
+
+
+def write_many(event_id, kind, rows):
+    """Пакетная запись одним INSERT: rows — (op, object_id, old, new)."""
+    ResultJournalEntry.objects.bulk_create([
+        ResultJournalEntry(event_id=event_id, kind=kind, op=op, object_id=object_id, old=old, new=new)
+        for op, object_id, old, new in rows
+    ])
+
+
+def _result_row(pk):
+    row = (DisciplineResult.objects.filter(pk=pk)
+           .values_list("athlete__event_id", "athlete_id", "discipline_id", "result").first())
+    if row is None:
+        return None, None
+    event_id, athlete_id, discipline_id, result = row
+    return event_id, {"athlete": athlete_id, "discipline": discipline_id, "result": result}
+
+
+def _points_only(update_fields):
+    return update_fields is not None and set(update_fields) <= {"points"}
+
+
+@receiver(pre_save, sender=Athlete)
+def remember_athlete(sender, instance, raw=False, **kwargs):
+    instance._journal_old = None
+    if raw or instance.pk is None:
+        return
+    row = Athlete.objects.filter(pk=instance.pk).values_list("name", "is_champion", "growth_category").first()
+    if row is not None:
+        instance._journal_old = {"name": row[0], "champion": row[1], "category": row[2]}
+
+
+@receiver(post_save, sender=Athlete)
+def journal_athlete(sender, instance, created=False, raw=False, **kwargs):
+    if raw:
+        return
+    old, new = getattr(instance, "_journal_old", None), athlete_state(instance)
+    if created or old is None:
+        _write(instance.event_id, ResultJournalEntry.KIND_ATHLETE, ResultJournalEntry.OP_CREATE, instance.pk, None, new)
+    elif old != new:
+        _write(instance.event_id, ResultJournalEntry.KIND_ATHLETE, ResultJournalEntry.OP_UPDATE, instance.pk, old, new)
+
+
+@receiver(post_delete, sender=Athlete)
+def journal_athlete_delete(sender, instance, **kwargs):
+    _write(instance.event_id, ResultJournalEntry.KIND_ATHLETE, ResultJournalEntry.OP_DELETE, instance.pk,
+           athlete_state(instance), None)
+
+
+@receiver(pre_save, sender=DisciplineResult)
+def remember_result(sender, instance, raw=False, update_fields=None, **kwargs):
+    instance._journal_old = None
+    if raw or instance.pk is None or _points_only(update_fields):
+        return
+    instance._journal_old = _result_row(instance.pk)[1]
+
+
+@receiver(post_save, sender=DisciplineResult)
+def journal_result(sender, instance, created=False, raw=False, update_fields=None, **kwargs):
+    if raw or _points_only(update_fields):
+        return
+    old = getattr(instance, "_journal_old", None)
+    new = {"athlete": instance.athlete_id, "discipline": instance.discipline_id, "result": instance.result}
+    # save() уже загрузил athlete — event_id без запроса
+    event_id = instance.athlete.event_id
+    if created or old is None:
+        _write(event_id, ResultJournalEntry.KIND_RESULT, ResultJournalEntry.OP_CREATE, instance.pk, None, new)
+    elif old != new:
+        _write(event_id, ResultJournalEntry.KIND_RESULT, ResultJournalEntry.OP_UPDATE, instance.pk, old, new)
+
+
+@receiver(pre_delete, sender=DisciplineResult)
+def remember_deleted_result(sender, instance, **kwargs):
+    # при каскадном удалении спортсмена/события строки ещё на месте только здесь
+    instance._journal_old = _result_row(instance.pk)
+
+
+@receiver(post_delete, sender=DisciplineResult)
+def journal_result_delete(sender, instance, **kwargs):
+    event_id, old = getattr(instance, "_journal_old", (None, None))
+    if event_id is not None:
+        _write(event_id, ResultJournalEntry.KIND_RESULT, ResultJournalEntry.OP_DELETE, instance.pk, old, None)
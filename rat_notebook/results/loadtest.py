@@ -0,0 +1,288 @@
+# -*- coding: utf-8 -*-
+"""
+Нагрузочный прогон «дня соревнований» без внешних сервисов.
+
+Приложение поднимается в этом же процессе на ThreadedWSGIServer (как
+runserver), виртуальные пользователи — потоки с http.client. Смесь
+сценариев: зрители открывают событие/список/поиск, судьи вносят
+результаты, владельцы пишут дневник. Ошибки сервера ловим сигналом
+got_request_exception, поэтому «database is locked» видно отдельной
+строкой, а не просто как 500.
+
+Запуск: manage.py loadtest (см. команду); данные — из текущей БД,
+для объёма сначала manage.py seed_data. Судейские сценарии ПИШУТ в БД.
+"""
+import http.client
+import math
+import random
+import re
+import secrets
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from importlib import import_module
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlencode, urlsplit
+
+from django.conf import settings
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY
+from django.core.signals import got_request_exception
+from django.urls import reverse
+
+from .forms import VALIDATION_RULES
+from .models import Athlete, DisciplineResult, DisciplineType, Event, Exercise, Puppy
+
+DEFAULT_MIX = {
+    "event_detail": 55,
+    "event_list": 10,
+    "athlete_search": 10,
+    "add_result": 15,
+    "diary_session": 10,
+}
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank перцентиль по отсортированному списку."""
+    if not sorted_values:
+        return 0.0
+    k = max(0, min(len(sorted_values) - 1, math.ceil(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[k]
+
+
+@dataclass
+class Targets:
+    """Что дёргать: выбирается из БД один раз до старта."""
+    events: List[Tuple[int, List[int]]]                 # (event_id, [discipline_id])
+    missing: List[Tuple[int, int, int, str]]            # (event_id, athlete_id, discipline_id, code) без результата
+    puppies: List[int]
+    exercises: List[int]
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+    @classmethod
+    def load(cls, events: int = 30, puppies: int = 20, missing: int = 5000) -> "Targets":
+        event_ids = list(Event.objects.filter(athletes__isnull=False).distinct()
+                         .order_by("-date", "-id").values_list("id", flat=True)[:events])
+        discs = defaultdict(list)
+        for ev, disc in Event.disciplines.through.objects.filter(event_id__in=event_ids).values_list(
+                "event_id", "disciplinetype_id"):
+            discs[ev].append(disc)
+
+        pairs = []
+        athletes = Athlete.objects.filter(event_id__in=event_ids).values_list("event_id", "id")
+        done = set(DisciplineResult.objects.filter(athlete__event_id__in=event_ids)
+                   .values_list("athlete_id", "discipline_id"))
+        codes = dict(DisciplineType.objects.values_list("id", "code"))
+        for ev, athlete in athletes:
+            pairs += [(ev, athlete, d, codes[d]) for d in discs[ev] if (athlete, d) not in done]
+        random.Random(0).shuffle(pairs)
+
+        return cls(
+            events=[(ev, discs[ev]) for ev in event_ids],
+            missing=pairs[:missing],
+            puppies=list(Puppy.objects.order_by("id").values_list("id", flat=True)[:puppies]),
+            exercises=list(Exercise.objects.order_by("id").values_list("id", flat=True)[:50]),
+        )
+
+    def take_missing(self):
+        with self.lock:
+            return self.missing.pop() if self.missing else None
+
+
+class VirtualUser:
+    """Один клиент: своя сессия (вход без пароля) и свой CSRF-токен."""
+
+    def __init__(self, base_url: str, session_cookie: str):
+        parts = urlsplit(base_url)
+        self.host, self.port = parts.hostname, parts.port or 80
+        self.csrf = secrets.token_hex(16)  # 32 символа — формат секрета CSRF Django
+        self.cookie = f"{settings.SESSION_COOKIE_NAME}={session_cookie}; {settings.CSRF_COOKIE_NAME}={self.csrf}"
+
+    def request(self, method: str, path: str, data: Optional[dict] = None) -> Tuple[int, bytes]:
+        headers = {"Cookie": self.cookie}
+        body = None
+        if data is not None:
+            body = urlencode({**data, "csrfmiddlewaretoken": self.csrf}, doseq=True)
+            headers["Content-Type"] = "application/x-www-form-urlencoded"
+        conn = http.client.HTTPConnection(self.host, self.port, timeout=60)
+        try:
+            conn.request(method, path, body=body, headers=headers)
+            resp = conn.getresponse()
+            payload = resp.read()
+            status, location = resp.status, resp.getheader("Location")
+        finally:
+            conn.close()
+        # после POST форма редиректит на страницу — её загрузка входит во время сценария
+        if method == "POST" and status in (301, 302, 303) and location:
+            return self.request("GET", urlsplit(location)._replace(scheme="", netloc="").geturl())
+        return status, payload
+
+
+def _random_result(rng, code):
+    rules = VALIDATION_RULES[code]
+    steps = int((rules["max"] - rules["min"]) / rules["step"])
+    return round(rules["min"] + rng.randint(1, steps) * rules["step"], 2)
+
+
+# ---------------- сценарии: (user, targets, rng) -> (имя, статус) ----------------
+
+def event_detail(user, targets, rng):
+    ev, _ = rng.choice(targets.events)
+    return "event_detail", user.request("GET", reverse("event_detail", args=[ev]))[0]
+
+
+def event_list(user, targets, rng):
+    return "event_list", user.request("GET", reverse("event_list"))[0]
+
+
+def athlete_search(user, targets, rng):
+    ev, _ = rng.choice(targets.events)
+    query = urlencode({"q": rng.choice("АБВГДЕЖЗИКЛМНОПРСТУФХЦШЭЮЯ")})
+    return "athlete_search", user.request("GET", f"{reverse('event_athlete_search', args=[ev])}?{query}")[0]
+
+
+def add_result(user, targets, rng):
+    target = targets.take_missing()
+    if target is None:
+        # все пары заполнены (например, после seed_data) — судья регистрирует нового спортсмена
+        ev, _ = rng.choice(targets.events)
+        status, _ = user.request("POST", reverse("event_detail", args=[ev]), {
+            "add_athlete": "1", "ath-name": f"Нагрузка {uuid.uuid4().hex[:10]}", "ath-growth_category": "M",
+        })
+        return "add_athlete", status
+    ev, athlete, disc, code = target
+    status, _ = user.request("POST", reverse("event_detail", args=[ev]), {
+        "add_result": "1", "res-athlete": athlete, "res-discipline": disc, "res-result": _random_result(rng, code),
+    })
+    return "add_result", status
+
+
+def diary_session(user, targets, rng):
+    puppy = rng.choice(targets.puppies)
+    hour = rng.randint(7, 20)
+    status, _ = user.request("POST", reverse("puppy_diary", args=[puppy]), {
+        "date": f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+        "start_time": f"{hour:02d}:00", "end_time": f"{hour:02d}:40", "notes": "нагрузочный прогон",
+        "exercises-TOTAL_FORMS": "1", "exercises-INITIAL_FORMS": "0",
+        "exercises-0-exercise": rng.choice(targets.exercises), "exercises-0-planned_reps": "5",
+        "exercises-0-actual_reps": str(rng.randint(2, 5)),
+    })
+    return "diary_session", status
+
+
+SCENARIOS = {
+    "event_detail": event_detail,
+    "event_list": event_list,
+    "athlete_search": athlete_search,
+    "add_result": add_result,
+    "diary_session": diary_session,
+}
+
+
+def _error_key(exc) -> str:
+    """Группировка ошибок: id и прочие числа в сообщении не различаем."""
+    return re.sub(r"\d+", "N", f"{type(exc).__name__}: {exc}")[:200]
+
+
+@dataclass
+class Report:
+    duration: float
+    latencies: Dict[str, List[float]]
+    statuses: Dict[str, Counter]
+    errors: Counter
+
+    @property
+    def total(self) -> int:
+        return sum(len(v) for v in self.latencies.values())
+
+    def as_dict(self) -> dict:
+        scenarios = {}
+        for name, values in sorted(self.latencies.items()):
+            values = sorted(values)
+            failed = sum(n for status, n in self.statuses[name].items() if status == 0 or status >= 500)
+            scenarios[name] = {
+                "requests": len(values),
+                "errors": failed,
+                "error_rate": round(failed / len(values), 4) if values else 0,
+                "p50_ms": round(percentile(values, 50) * 1000, 1),
+                "p95_ms": round(percentile(values, 95) * 1000, 1),
+                "p99_ms": round(percentile(values, 99) * 1000, 1),
+                "max_ms": round(values[-1] * 1000, 1) if values else 0,
+                "statuses": {str(k): v for k, v in sorted(self.statuses[name].items())},
+            }
+        return {
+            "duration_s": round(self.duration, 2),
+            "requests": self.total,
+            "throughput_rps": round(self.total / self.duration, 1) if self.duration else 0,
+            "scenarios": scenarios,
+            "errors": dict(self.errors.most_common()),
+        }
+
+
+def run(base_url: str, session_cookies: List[str], targets: Targets, mix: Dict[str, int],
+        duration: float, max_requests: Optional[int] = None, seed: int = 0) -> Report:
+    """Гоняет len(session_cookies) пользователей параллельно до истечения duration или max_requests."""
+    names = [n for n in mix if mix[n] > 0]
+    weights = [mix[n] for n in names]
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    statuses: Dict[str, Counter] = defaultdict(Counter)
+    errors: Counter = Counter()
+    lock = threading.Lock()
+    issued = [0]
+
+    def on_exception(sender, request=None, **kwargs):
+        exc = sys.exc_info()[1]
+        if exc is not None:
+            with lock:
+                errors[_error_key(exc)] += 1
+
+    got_request_exception.connect(on_exception, weak=False)
+    started = time.perf_counter()
+    deadline = started + duration
+
+    def worker(i: int, cookie: str):
+        rng = random.Random(seed * 1000 + i)
+        user = VirtualUser(base_url, cookie)
+        while time.perf_counter() < deadline:
+            with lock:
+                if max_requests is not None and issued[0] >= max_requests:
+                    return
+                issued[0] += 1
+            scenario = SCENARIOS[rng.choices(names, weights)[0]]
+            t0 = time.perf_counter()
+            try:
+                name, status = scenario(user, targets, rng)
+            except (OSError, http.client.HTTPException) as exc:
+                name, status = scenario.__name__, 0
+                with lock:
+                    errors["client " + _error_key(exc)] += 1
+            elapsed = time.perf_counter() - t0
+            with lock:
+                latencies[name].append(elapsed)
+                statuses[name][status] += 1
+
+    threads = [threading.Thread(target=worker, args=(i, c), daemon=True) for i, c in enumerate(session_cookies)]
+    try:
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    finally:
+        got_request_exception.disconnect(on_exception)
+    return Report(time.perf_counter() - started, latencies, statuses, errors)
+
+
+def login_cookies(user, count: int) -> List[str]:
+    """Отдельная сессия на каждого виртуального пользователя (вход без пароля, как Client.force_login)."""
+    store = import_module(settings.SESSION_ENGINE).SessionStore
+    cookies = []
+    for _ in range(count):
+        session = store()
+        session[SESSION_KEY] = user._meta.pk.value_to_string(user)
+        session[BACKEND_SESSION_KEY] = settings.AUTHENTICATION_BACKENDS[0]
+        session[HASH_SESSION_KEY] = user.get_session_auth_hash()
+        session.save()
+        cookies.append(session.session_key)
+    return cookies
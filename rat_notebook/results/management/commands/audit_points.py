@@ -0,0 +1,46 @@
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand
+
+from results.models import Event
+from results.rescoring import apply_changes, audit
+
+
+class Command(BaseCommand):
+    help = (
+        "Сверка хранимых очков с тем, что дал бы пересчёт (смена флага «чемпион», "
+        "категории и т.п.). Идёт потоково пачками values_list; --repair исправляет."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--event", type=int, action="append", dest="events", help="id события (можно несколько)")
+        parser.add_argument("--batch-size", type=int, default=2000, help="Строк в одной пачке чтения")
+        parser.add_argument("--repair", action="store_true", help="Записать правильные очки (bulk_update по пачкам)")
+
+    def handle(self, *args, **options):
+        checked = events_seen = mismatched = repaired = 0
+        verbose = options["verbosity"] >= 2
+
+        for rows, events, changes in audit(options["events"], max(1, options["batch_size"])):
+            checked += rows
+            events_seen += events
+            mismatched += len(changes)
+            if not changes:
+                continue
+
+            by_event = defaultdict(list)
+            for c in changes:
+                by_event[c.event_id].append(c)
+            names = Event.objects.in_bulk(list(by_event))
+            for event_id, items in by_event.items():
+                self.stdout.write(self.style.WARNING(f"{names[event_id]} [#{event_id}]: расхождений {len(items)}"))
+                if verbose:
+                    for c in items:
+                        self.stdout.write(f"  {c.athlete} / {c.discipline}: хранится {c.old:g}, должно быть {c.new}")
+
+            if options["repair"]:
+                repaired += apply_changes(changes)
+
+        self.stdout.write(f"Проверено результатов: {checked}, событий: {events_seen}, расхождений: {mismatched}")
+        if options["repair"]:
+            self.stdout.write(self.style.SUCCESS(f"Исправлено: {repaired}"))
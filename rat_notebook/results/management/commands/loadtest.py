@@ -0,0 +1,114 @@
+import json
+import logging
+import threading
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.core.servers.basehttp import ThreadedWSGIServer, WSGIRequestHandler
+from django.core.wsgi import get_wsgi_application
+from django.db import connections
+
+from results.loadtest import DEFAULT_MIX, SCENARIOS, Targets, login_cookies, run
+
+
+class _QuietHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def _parse_mix(value):
+    mix = {name: 0 for name in DEFAULT_MIX} if value else dict(DEFAULT_MIX)
+    for part in filter(None, (value or "").split(",")):
+        name, _, weight = part.partition("=")
+        if name not in SCENARIOS:
+            raise CommandError(f"Неизвестный сценарий {name!r}; есть: {', '.join(SCENARIOS)}")
+        mix[name] = int(weight or 1)
+    return mix
+
+
+class Command(BaseCommand):
+    help = (
+        "Нагрузочный прогон: поднимает приложение на локальном порту и гоняет смесь "
+        "зрителей/судей/дневника. Отчёт: p50/p95/p99, пропускная способность, ошибки "
+        "(в т.ч. SQLite «database is locked»). Судейские сценарии пишут в текущую БД."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=8, help="Параллельных пользователей")
+        parser.add_argument("--duration", type=float, default=30, help="Секунд нагрузки")
+        parser.add_argument("--requests", type=int, default=None, help="Остановиться после N запросов")
+        parser.add_argument("--mix", default=None,
+                            help="Веса сценариев, напр. event_detail=60,add_result=20 (по умолчанию %s)"
+                                 % ",".join(f"{k}={v}" for k, v in DEFAULT_MIX.items()))
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--user", default="loadtest", help="Пользователь, от имени которого ходят клиенты")
+        parser.add_argument("--url", default=None,
+                            help="Бить по уже запущенному серверу (gunicorn и т.п.) вместо встроенного; "
+                                 "ошибки сервера тогда видны только по статусам")
+        parser.add_argument("--json", dest="json_path", default=None, help="Сохранить отчёт в JSON (для сравнения)")
+
+    def handle(self, *args, **options):
+        mix = _parse_mix(options["mix"])
+        targets = Targets.load()
+        if not targets.events:
+            raise CommandError("Нет событий со спортсменами — сначала manage.py seed_data")
+        if mix.get("diary_session") and not (targets.puppies and targets.exercises):
+            mix["diary_session"] = 0
+
+        user, created = get_user_model().objects.get_or_create(
+            username=options["user"], defaults={"is_staff": True, "is_superuser": True})
+        if created:
+            user.set_unusable_password()
+            user.save(update_fields=["password"])
+        cookies = login_cookies(user, options["users"])
+
+        server = None
+        base_url = options["url"]
+        if base_url is None:
+            server, base_url = self._start_server()
+        self.stdout.write(f"{base_url}: {options['users']} польз., {options['duration']:g} с, смесь {mix}")
+
+        # трейсбеки 500-х не печатаем — ошибки сведены в отчёт
+        request_logger = logging.getLogger("django.request")
+        level = request_logger.level
+        request_logger.setLevel(logging.CRITICAL)
+        try:
+            report = run(base_url, cookies, targets, mix, options["duration"], options["requests"], options["seed"])
+        finally:
+            request_logger.setLevel(level)
+            if server is not None:
+                server.shutdown()
+                server.server_close()
+
+        data = report.as_dict()
+        self._print(data)
+        if options["json_path"]:
+            with open(options["json_path"], "w", encoding="utf-8") as fh:
+                json.dump(data, fh, ensure_ascii=False, indent=2)
+
+    def _start_server(self):
+        # in-memory SQLite (тесты) видна только через то же соединение — делим его, как LiveServerTestCase
+        overrides = {}
+        for conn in connections.all():
+            if conn.vendor == "sqlite" and conn.is_in_memory_db():
+                conn.inc_thread_sharing()
+                overrides[conn.alias] = conn
+        server = ThreadedWSGIServer(("127.0.0.1", 0), _QuietHandler, allow_reuse_address=True,
+                                    connections_override=overrides or None)
+        server.set_app(get_wsgi_application())
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        host, port = server.server_address[:2]
+        return server, f"http://{host}:{port}"
+
+    def _print(self, data):
+        self.stdout.write("")
+        self.stdout.write(f"{'сценарий':<16} {'запр.':>6} {'ошибок':>7} {'p50, мс':>9} {'p95, мс':>9} "
+                          f"{'p99, мс':>9} {'макс., мс':>10}")
+        for name, s in data["scenarios"].items():
+            self.stdout.write(f"{name:<16} {s['requests']:>6} {s['errors']:>7} {s['p50_ms']:>9} {s['p95_ms']:>9} "
+                              f"{s['p99_ms']:>9} {s['max_ms']:>10}")
+        self.stdout.write("")
+        self.stdout.write(self.style.SUCCESS(
+            f"Всего {data['requests']} запросов за {data['duration_s']} с — {data['throughput_rps']} запр./с"))
+        for message, count in data["errors"].items():
+            self.stdout.write(self.style.ERROR(f"  {count} × {message}"))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from results.rollups import rebuild
+
+
+class Command(BaseCommand):
+    help = "Полная пересборка сводок прогресса щенков (день/неделя) из дневника."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--puppy", type=int, default=None, help="Пересобрать только для щенка с этим id")
+
+    def handle(self, *args, **options):
+        count = rebuild(puppy_id=options["puppy"])
+        self.stdout.write(self.style.SUCCESS(f"Сводок записано: {count}"))
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from results.journal import CHAMPIONS, standings_at
+
+
+def _moment(value):
+    moment = parse_datetime(value)
+    if moment is None:
+        raise CommandError(f"Не понял момент времени {value!r}; нужен ISO, напр. 2025-06-01T12:30")
+    return timezone.make_aware(moment) if timezone.is_naive(moment) else moment
+
+
+class Command(BaseCommand):
+    help = (
+        "Места события на момент времени: последний снимок + хвост журнала "
+        "результатов. Без --at — текущие."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("event", type=int, help="id события")
+        parser.add_argument("--at", type=_moment, default=None, help="Момент времени (ISO)")
+
+    def handle(self, *args, **options):
+        replay = standings_at(options["event"], options["at"])
+        origin = f"снимок #{replay.snapshot.pk}" if replay.snapshot else "пустое состояние"
+        self.stdout.write(f"Событие #{replay.event_id}: {origin} + {replay.tail} записей журнала "
+                          f"(до #{replay.last_entry_id})")
+
+        for group, rows in replay.standings.items():
+            self.stdout.write(self.style.MIGRATE_HEADING("Чемпионы" if group == CHAMPIONS else group))
+            for row in rows:
+                self.stdout.write(f"  {row['place']:>3}. {row['athlete']:<30} {row['total']:>5}")
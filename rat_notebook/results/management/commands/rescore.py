@@ -0,0 +1,94 @@
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.utils.dateparse import parse_date
+
+from results.models import Event
+from results.rescoring import apply_changes, diff_events
+
+
+def _init_worker():
+    import django
+    django.setup()
+
+
+def _diff_chunk(event_ids):
+    # в отдельном процессе: только чтение, запись делает родитель
+    return event_ids, diff_events(event_ids)
+
+
+class Command(BaseCommand):
+    help = (
+        "Пересчёт очков всех (или выбранных) событий пачками в пуле процессов. "
+        "Рабочие процессы только считают расхождения, запись — в основном процессе."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--event", type=int, action="append", dest="events", help="id события (можно несколько)")
+        parser.add_argument("--since", type=parse_date, help="События с этой даты (YYYY-MM-DD)")
+        parser.add_argument("--until", type=parse_date, help="События по эту дату включительно")
+        parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Число процессов (1 — без пула)")
+        parser.add_argument("--chunk-size", type=int, default=50, help="Событий в одной пачке")
+        parser.add_argument("--dry-run", action="store_true", help="Только показать расхождения, ничего не писать")
+        parser.add_argument("--resume", action="store_true", help="Пропустить события, уже обработанные прошлым запуском")
+        parser.add_argument("--state", default=None, help="Файл прогресса (по умолчанию BASE_DIR/rescore.state.json)")
+
+    def handle(self, *args, **options):
+        qs = Event.objects.order_by("id")
+        if options["events"]:
+            qs = qs.filter(id__in=options["events"])
+        if options["since"]:
+            qs = qs.filter(date__gte=options["since"])
+        if options["until"]:
+            qs = qs.filter(date__lte=options["until"])
+        event_ids = list(qs.values_list("id", flat=True))
+
+        dry_run = options["dry_run"]
+        state_path = Path(options["state"] or Path(settings.BASE_DIR) / "rescore.state.json")
+        done = set()
+        if options["resume"] and state_path.exists():
+            done = set(json.loads(state_path.read_text())["done"])
+            event_ids = [e for e in event_ids if e not in done]
+
+        size = max(1, options["chunk_size"])
+        chunks = [event_ids[i:i + size] for i in range(0, len(event_ids), size)]
+        self.stdout.write(f"Событий: {len(event_ids)}, пачек: {len(chunks)}" + (" (пропущено: %d)" % len(done) if done else ""))
+
+        total_changed = 0
+        for n, (chunk, changes) in enumerate(self._diffs(chunks, options["workers"]), start=1):
+            if dry_run:
+                self._report(changes)
+            else:
+                apply_changes(changes)
+                done.update(chunk)
+                state_path.write_text(json.dumps({"done": sorted(done)}))
+            total_changed += len(changes)
+            self.stdout.write(f"[{n}/{len(chunks)}] событий: {len(chunk)}, изменений: {len(changes)}")
+
+        if not dry_run and state_path.exists():
+            state_path.unlink()
+        verb = "Будет изменено" if dry_run else "Изменено"
+        self.stdout.write(self.style.SUCCESS(f"{verb} результатов: {total_changed}"))
+
+    def _diffs(self, chunks, workers):
+        """(пачка, расхождения) по мере готовности."""
+        if workers <= 1 or len(chunks) <= 1:
+            for chunk in chunks:
+                yield chunk, diff_events(chunk)
+            return
+
+        # соединения родителя не должны достаться дочерним процессам
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            futures = [pool.submit(_diff_chunk, chunk) for chunk in chunks]
+            for future in as_completed(futures):
+                yield future.result()
+
+    def _report(self, changes):
+        for c in changes:
+            self.stdout.write(f"  событие {c.event_id}: {c.athlete} / {c.discipline}: {c.old:g} -> {c.new}")
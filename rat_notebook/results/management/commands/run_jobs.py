@@ -0,0 +1,49 @@
+import signal
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from results.jobs import run_pending, worker_name
+
+
+class Command(BaseCommand):
+    help = (
+        "Воркер очереди фоновых задач (results/jobs.py). Без ключей работает "
+        "постоянно (always-on task); --once — выполнить готовые задачи и выйти (cron)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Выполнить готовые задачи и выйти")
+        parser.add_argument("--sleep", type=float, default=2.0, help="Пауза опроса, когда очередь пуста, сек")
+        parser.add_argument("--max-jobs", type=int, default=None,
+                            help="Выйти после стольких задач (хостинг перезапустит процесс)")
+
+    def handle(self, *args, **options):
+        self._stop = False
+        # SIGTERM от хостинга: доделываем текущую задачу и выходим
+        previous = {sig: signal.signal(sig, self._request_stop) for sig in (signal.SIGTERM, signal.SIGINT)}
+        try:
+            total = self._loop(options)
+        finally:
+            for sig, old in previous.items():
+                signal.signal(sig, old)
+        self.stdout.write(self.style.SUCCESS(f"Задач выполнено: {total}"))
+
+    def _loop(self, options):
+        worker = worker_name()
+        limit = options["max_jobs"]
+        total = 0
+        while not self._stop and (limit is None or total < limit):
+            # долгоживущий процесс: соединение могло устареть между итерациями
+            close_old_connections()
+            done = run_pending(worker, limit=1)
+            total += done
+            if not done:
+                if options["once"]:
+                    break
+                time.sleep(options["sleep"])
+        return total
+
+    def _request_stop(self, signum, frame):
+        self._stop = True
@@ -0,0 +1,225 @@
+import random
+import time
+from datetime import date, datetime, timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils.dateparse import parse_date
+
+from results.forms import VALIDATION_RULES
+from results.models import (
+    Athlete, DisciplineResult, DisciplineType, Event, Exercise, Puppy, PuppyTrainingExercise, PuppyTrainingSession,
+)
+from results.rollups import rebuild
+from results.scoring import GROWTH_GROUPS, QUALIFYING_NORMS, event_expected_points
+from results.search import index_exercises, index_sessions
+
+NAMES = [
+    "Тыква", "Тайга", "Кока", "Тор", "Фиджи", "Хатори", "Бублик", "Жужа", "Марта", "Гром", "Вега", "Лис",
+    "Ника", "Рокки", "Сора", "Шанс", "Юки", "Арчи", "Бэлла", "Дэйзи", "Зефир", "Кекс", "Луна", "Оскар",
+]
+ACTIONS = ["Подзыв", "Апорт", "Сидеть", "Лежать", "Стоять", "Место", "Рядом", "Барьер", "Слалом", "Туннель",
+           "Прыжок", "Выдержка", "Фокус", "Поворот", "Змейка", "Фристайл", "Качели", "Стойка", "Обход", "Трюк"]
+OBJECTS = ["с игрушкой", "с лакомством", "на площадке", "в парке", "с отвлечением", "на дистанции",
+           "без поводка", "на поводке", "с хендлером", "в помещении", "с кликером", "по жесту", "по команде",
+           "с выдержкой", "в движении", "на время", "с мячом", "у стены", "с ускорением", "на скорость"]
+NOTES = ["уверенно держала выдержку", "отвлекалась на птиц", "хорошая мотивация на игрушку",
+         "устала к концу", "ровный темп", "нужно больше лакомства", "быстро схватила новое",
+         "жарко, сократили занятие", "отлично работала на дистанции", "сбивалась на барьере"]
+
+# доли категорий среди ростовых (S/M/L чаще)
+GROUP_WEIGHTS = [4, 10, 12, 10, 5, 3, 3, 2, 3, 2]
+ABSENT_SHARE = 0.04
+CHAMPION_SHARE = 0.1
+
+
+def _quantize(value, rules):
+    step = rules["step"]
+    value = round(round(value / step) * step, 2)
+    return min(max(value, rules["min"] + step), rules["max"])
+
+
+def make_result(rng, code, category):
+    """Результат вокруг норматива категории в пределах VALIDATION_RULES; иногда неявка (0/None)."""
+    if rng.random() < ABSENT_SHARE:
+        return rng.choice([None, 0])
+    norm = QUALIFYING_NORMS[category][code]
+    if code == "treadmill":
+        value = rng.gauss(norm * 1.05, norm * 0.08)  # секунды: меньше — лучше
+    else:
+        value = rng.gauss(norm * 0.95, norm * 0.1)
+    return _quantize(value, VALIDATION_RULES[code])
+
+
+class Command(BaseCommand):
+    help = (
+        "Синтетические данные для нагрузочных тестов и бенчмарков: события со спортсменами "
+        "и результатами, щенки с многолетним дневником, каталог упражнений. "
+        "Детерминированно по --seed, всё через bulk_create пачками."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--events", type=int, default=2000)
+        parser.add_argument("--athletes", type=int, default=30, help="Спортсменов на событие")
+        parser.add_argument("--exercises", type=int, default=300, help="Размер каталога упражнений")
+        parser.add_argument("--puppies", type=int, default=60)
+        parser.add_argument("--years", type=int, default=3, help="Глубина дневника щенка, лет")
+        parser.add_argument("--sessions-per-week", type=float, default=4)
+        parser.add_argument("--until", type=parse_date, default=date(2025, 6, 30),
+                            help="Последняя дата данных (фиксирована ради детерминизма)")
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument("--no-rollups", action="store_true", help="Не пересобирать сводки прогресса")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        rng = random.Random(options["seed"])
+        self.batch_size = options["batch_size"]
+        self.until = options["until"]
+
+        disciplines = self._disciplines()
+        n_results = self._events(rng, disciplines, options["events"], options["athletes"])
+        exercises = self._exercises(rng, options["exercises"])
+        n_sessions, n_entries = self._diary(rng, exercises, options["puppies"], options["years"],
+                                            options["sessions_per_week"])
+        if not options["no_rollups"]:
+            rebuild()
+
+        total = options["events"] * (1 + options["athletes"]) + n_results + n_sessions + n_entries
+        self.stdout.write(self.style.SUCCESS(
+            f"Событий: {options['events']}, результатов: {n_results}, упражнений в каталоге: {len(exercises)}, "
+            f"тренировок: {n_sessions}, подходов: {n_entries}. Всего строк ~{total} "
+            f"за {time.perf_counter() - started:.1f} с"
+        ))
+
+    # ---------------- соревнования ----------------
+
+    def _disciplines(self):
+        out = []
+        for code, verbose in DisciplineType._meta.get_field("code").choices:
+            obj, _ = DisciplineType.objects.get_or_create(code=code, defaults={"verbose": verbose})
+            out.append(obj)
+        return out
+
+    def _events(self, rng, disciplines, count, per_event):
+        start = self.until - timedelta(days=365 * 10)
+        chunk = max(1, self.batch_size // max(1, per_event * len(disciplines)))
+        n_results = 0
+        for offset in range(0, count, chunk):
+            with transaction.atomic():
+                n_results += self._event_chunk(rng, disciplines, min(chunk, count - offset), per_event, start, offset)
+            self.stdout.write(f"  события: {min(offset + chunk, count)}/{count}")
+        return n_results
+
+    def _event_chunk(self, rng, disciplines, count, per_event, start, offset):
+        events = Event.objects.bulk_create([
+            Event(name=f"Этап {offset + i + 1}", date=start + timedelta(days=rng.randrange(365 * 10)))
+            for i in range(count)
+        ])
+        event_disc = {ev: rng.sample(disciplines, rng.randint(4, len(disciplines))) for ev in events}
+        Event.disciplines.through.objects.bulk_create([
+            Event.disciplines.through(event_id=ev.pk, disciplinetype_id=d.pk)
+            for ev, discs in event_disc.items() for d in discs
+        ], batch_size=self.batch_size)
+
+        athletes = Athlete.objects.bulk_create([
+            Athlete(
+                event=ev, name=f"{rng.choice(NAMES)} {i + 1}",
+                growth_category=rng.choices(GROWTH_GROUPS, GROUP_WEIGHTS)[0],
+                is_champion=rng.random() < CHAMPION_SHARE,
+            )
+            for ev in events for i in range(per_event)
+        ], batch_size=self.batch_size)
+
+        results = []
+        for k, ev in enumerate(events):
+            discs = event_disc[ev]
+            event_results = [
+                DisciplineResult(athlete=a, discipline=d, result=make_result(rng, d.code, a.growth_category))
+                for a in athletes[k * per_event:(k + 1) * per_event] for d in discs
+            ]
+            # очки считаем заранее: bulk_create не вызывает save()/assign_growth_scores
+            expected = event_expected_points(
+                ((i, r.discipline.code, r.athlete.is_champion, r.athlete.growth_category, r.result)
+                 for i, r in enumerate(event_results)),
+                [d.code for d in discs],
+            )
+            for i, r in enumerate(event_results):
+                r.points = expected.get(i, 0)
+            results += event_results
+        DisciplineResult.objects.bulk_create(results, batch_size=self.batch_size)
+        return len(results)
+
+    # ---------------- дневник ----------------
+
+    def _exercises(self, rng, count):
+        names = [f"{a} {o}" for a in ACTIONS for o in OBJECTS]
+        rng.shuffle(names)
+        names = [names[i % len(names)] + (f" ({i // len(names) + 1})" if i >= len(names) else "") for i in range(count)]
+        Exercise.objects.bulk_create([
+            Exercise(name=name, description=f"{name}: {rng.choice(NOTES)}.", default_reps=rng.choice([0, 3, 5, 5, 8, 10]))
+            for name in names
+        ], batch_size=self.batch_size, ignore_conflicts=True)
+        by_name = Exercise.objects.in_bulk(names, field_name="name")
+        return [by_name[name] for name in names]
+
+    def _diary(self, rng, exercises, count, years, per_week):
+        puppies = Puppy.objects.bulk_create([
+            Puppy(
+                pet_name=rng.choice(NAMES), sex=rng.choice("MF"),
+                birth_date=self.until - timedelta(days=rng.randint(120, 365 * (years + 2))),
+            )
+            for _ in range(count)
+        ])
+        n_sessions = n_entries = 0
+        pending = []
+        for puppy in puppies:
+            program = rng.sample(exercises, min(len(exercises), 40))
+            day = max(puppy.birth_date + timedelta(days=60), self.until - timedelta(days=365 * years))
+            while day <= self.until:
+                if rng.random() < per_week / 7:
+                    pending.append(self._session(rng, puppy, day, program))
+                day += timedelta(days=1)
+                if sum(len(ex) for _, ex in pending) >= self.batch_size:
+                    n_sessions, n_entries = self._flush(pending, n_sessions, n_entries)
+        return self._flush(pending, n_sessions, n_entries)
+
+    def _session(self, rng, puppy, day, program):
+        start = datetime.combine(day, datetime.min.time()) + timedelta(hours=rng.randint(7, 20),
+                                                                       minutes=rng.choice([0, 15, 30, 45]))
+        end = start + timedelta(minutes=rng.randint(15, 60))
+        session = PuppyTrainingSession(
+            puppy=puppy, date=day, start_time=start.time(), end_time=end.time(),
+            notes=rng.choice(NOTES) if rng.random() < 0.3 else "",
+        )
+        entries = []
+        for position, ex in enumerate(rng.sample(program, rng.randint(2, 6)), start=1):
+            planned = ex.default_reps or rng.randint(3, 10)
+            entries.append(PuppyTrainingExercise(
+                exercise=ex, position=position, planned_reps=planned,
+                actual_reps=max(0, planned - rng.choice([0, 0, 0, 1, 1, 2, 3])),
+                pros=rng.choice(NOTES) if rng.random() < 0.15 else "",
+                cons=rng.choice(NOTES) if rng.random() < 0.15 else "",
+            ))
+        return session, entries
+
+    def _flush(self, pending, n_sessions, n_entries):
+        """Сохраняет накопленные тренировки и подходы; pending очищается."""
+        if not pending:
+            return n_sessions, n_entries
+        with transaction.atomic():
+            sessions = PuppyTrainingSession.objects.bulk_create([s for s, _ in pending], batch_size=self.batch_size)
+            entries = []
+            for session, items in pending:
+                for item in items:
+                    item.session = session
+                entries += items
+            PuppyTrainingExercise.objects.bulk_create(entries, batch_size=self.batch_size)
+            # bulk_create не шлёт сигналов — поисковый индекс дополняем сами
+            index_sessions(sessions)
+            index_exercises(entries)
+        n_sessions += len(sessions)
+        n_entries += len(entries)
+        pending.clear()
+        self.stdout.write(f"  тренировок: {n_sessions}")
+        return n_sessions, n_entries
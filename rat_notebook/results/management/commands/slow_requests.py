@@ -0,0 +1,57 @@
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from results.slowlog import read_records
+
+
+class Command(BaseCommand):
+    help = "Сводка журнала медленных запросов: топ URL и SQL-отпечатков по суммарному времени."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--top", type=int, default=10, help="Сколько строк в каждом топе")
+        parser.add_argument("--log", default=None, help="Путь к журналу (по умолчанию SLOW_REQUEST_LOG)")
+        parser.add_argument("--view", default=None, help="Только запросы к этому имени URL")
+
+    def handle(self, *args, **options):
+        top = options["top"]
+        views = defaultdict(lambda: {"requests": 0, "ms": 0.0, "max_ms": 0.0, "queries": 0})
+        sql = defaultdict(lambda: {"requests": 0, "count": 0, "ms": 0.0, "views": set()})
+
+        for rec in read_records(options["log"] or settings.SLOW_REQUEST_LOG):
+            view = rec.get("view") or rec.get("path")
+            if options["view"] and view != options["view"]:
+                continue
+            v = views[view]
+            v["requests"] += 1
+            v["ms"] += rec.get("duration_ms", 0)
+            v["max_ms"] = max(v["max_ms"], rec.get("duration_ms", 0))
+            v["queries"] += rec.get("db_queries", 0)
+            for q in rec.get("sql", ()):
+                s = sql[q["fingerprint"]]
+                s["requests"] += 1
+                s["count"] += q["count"]
+                s["ms"] += q["ms"]
+                s["views"].add(view)
+
+        if not views:
+            self.stdout.write("Журнал пуст.")
+            return
+
+        self.stdout.write(self.style.MIGRATE_HEADING(f"Топ-{top} URL по суммарному времени"))
+        self.stdout.write(f"{'всего, мс':>11} {'запр.':>6} {'сред., мс':>10} {'макс., мс':>10} {'SQL/запр.':>9}  URL")
+        for view, v in sorted(views.items(), key=lambda kv: kv[1]["ms"], reverse=True)[:top]:
+            n = v["requests"]
+            self.stdout.write(
+                f"{v['ms']:>11.1f} {n:>6} {v['ms'] / n:>10.1f} {v['max_ms']:>10.1f} {v['queries'] / n:>9.1f}  {view}"
+            )
+
+        self.stdout.write("")
+        self.stdout.write(self.style.MIGRATE_HEADING(f"Топ-{top} SQL-отпечатков по суммарному времени"))
+        self.stdout.write(f"{'всего, мс':>11} {'раз':>7} {'раз/запр.':>9}  SQL")
+        for fp, s in sorted(sql.items(), key=lambda kv: kv[1]["ms"], reverse=True)[:top]:
+            self.stdout.write(
+                f"{s['ms']:>11.1f} {s['count']:>7} {s['count'] / s['requests']:>9.1f}  {fp}"
+            )
+            self.stdout.write(f"{'':>30}  ← {', '.join(sorted(s['views']))}")
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Max
+
+from results.journal import take_snapshot
+from results.models import Event, ResultJournalEntry, StandingsSnapshot
+
+
+class Command(BaseCommand):
+    help = (
+        "Снимки мест событий для журнала результатов (см. results/journal.py). "
+        "Без --min-tail снимаются все события; для cron — только те, у которых "
+        "хвост журнала после последнего снимка не короче --min-tail."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--event", type=int, action="append", dest="events", help="id события (можно несколько)")
+        parser.add_argument("--min-tail", type=int, default=0,
+                            help="Снимать, только если после последнего снимка столько записей журнала")
+
+    def handle(self, *args, **options):
+        event_ids = options["events"] or list(Event.objects.order_by("id").values_list("id", flat=True))
+        positions = dict(
+            StandingsSnapshot.objects.filter(event_id__in=event_ids)
+            .values("event_id").annotate(last=Max("last_entry_id")).values_list("event_id", "last")
+        )
+
+        taken = 0
+        for event_id in event_ids:
+            if event_id in positions and options["min_tail"] > 0:
+                pending = ResultJournalEntry.objects.filter(event_id=event_id, id__gt=positions[event_id]).count()
+                if pending < options["min_tail"]:
+                    continue
+            snapshot = take_snapshot(event_id)
+            taken += 1
+            if options["verbosity"] >= 2:
+                self.stdout.write(f"  событие #{event_id}: снимок на запись #{snapshot.last_entry_id}")
+
+        self.stdout.write(self.style.SUCCESS(f"Снимков: {taken} из {len(event_ids)} событий"))
@@ -0,0 +1,221 @@
+# -*- coding: utf-8 -*-
+"""
+Метрики в формате Prometheus (text exposition 0.0.4).
+
+  * Счётчики и гистограммы копятся в памяти процесса и раз в
+    METRICS_FLUSH_INTERVAL секунд сбрасываются дельтами в общий SQLite-файл
+    METRICS_STORE (UPSERT value = value + delta). Так несколько воркеров
+    (gunicorn/uwsgi) складываются в одну картину; чужие несброшенные
+    дельты видны с задержкой не больше интервала.
+  * MetricsMiddleware (включается METRICS_ENABLED) пишет латентность и число
+    SQL-запросов по имени URL, а также длительность пересчёта очков
+    (участки scoring.* из results.perf).
+  * /metrics/ — только для staff, см. views.metrics_view.
+"""
+import json
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, Iterable, List, Tuple
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from .perf import RequestTimings, request_timings
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+Key = Tuple[str, str, str]  # (имя метрики, метки JSON, ключ: '' | le | 'sum' | 'count')
+
+
+class MetricsStore:
+    """Буфер дельт процесса + общий SQLite-файл."""
+
+    def __init__(self, path):
+        self.path = str(path)
+        self._pending: Dict[Key, float] = defaultdict(float)
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=5)
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS samples ("
+            " name TEXT NOT NULL, labels TEXT NOT NULL, key TEXT NOT NULL,"
+            " value REAL NOT NULL, PRIMARY KEY (name, labels, key))"
+        )
+        return conn
+
+    def add(self, name: str, labels: str, key: str, amount: float) -> None:
+        with self._lock:
+            self._pending[(name, labels, key)] += amount
+
+    def flush(self) -> None:
+        with self._lock:
+            pending, self._pending = self._pending, defaultdict(float)
+            self._last_flush = time.monotonic()
+        if not pending:
+            return
+        conn = self._connect()
+        try:
+            with conn:
+                conn.executemany(
+                    "INSERT INTO samples (name, labels, key, value) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT (name, labels, key) DO UPDATE SET value = value + excluded.value",
+                    [(*k, v) for k, v in pending.items()],
+                )
+        finally:
+            conn.close()
+
+    def maybe_flush(self, interval: float) -> None:
+        if time.monotonic() - self._last_flush >= interval:
+            self.flush()
+
+    def read(self) -> Dict[Key, float]:
+        self.flush()
+        conn = self._connect()
+        try:
+            return {(n, l, k): v for n, l, k, v in conn.execute("SELECT name, labels, key, value FROM samples")}
+        finally:
+            conn.close()
+
+
+_stores: Dict[str, MetricsStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_store() -> MetricsStore:
+    path = str(settings.METRICS_STORE)
+    with _stores_lock:
+        if path not in _stores:
+            _stores[path] = MetricsStore(path)
+        return _stores[path]
+
+
+def _labels_key(labels: dict) -> str:
+    return json.dumps(sorted(labels.items()), ensure_ascii=False)
+
+
+class Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str):
+        self.name = name
+        self.documentation = documentation
+        REGISTRY.append(self)
+
+    def samples(self, rows: Dict[str, Dict[str, float]]) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        get_store().add(self.name, _labels_key(labels), "", amount)
+
+    def samples(self, rows):
+        return [f"{self.name}{_fmt_labels(labels)} {_fmt(v[''])}" for labels, v in rows.items()]
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, buckets: Iterable[float]):
+        super().__init__(name, documentation)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, **labels) -> None:
+        store = get_store()
+        key = _labels_key(labels)
+        le = next((b for b in self.buckets if value <= b), None)
+        store.add(self.name, key, _fmt(le) if le is not None else "+Inf", 1)
+        store.add(self.name, key, "sum", value)
+        store.add(self.name, key, "count", 1)
+
+    def samples(self, rows):
+        out = []
+        for labels, v in rows.items():
+            cumulative = 0.0
+            for le in [_fmt(b) for b in self.buckets] + ["+Inf"]:
+                cumulative += v.get(le, 0)
+                out.append(f"{self.name}_bucket{_fmt_labels(labels, le=le)} {_fmt(cumulative)}")
+            out.append(f"{self.name}_sum{_fmt_labels(labels)} {_fmt(v.get('sum', 0))}")
+            out.append(f"{self.name}_count{_fmt_labels(labels)} {_fmt(v.get('count', 0))}")
+        return out
+
+
+def _fmt(value) -> str:
+    value = float(value)
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _fmt_labels(labels: str, **extra) -> str:
+    pairs = [*json.loads(labels), *extra.items()]
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+REGISTRY: List[Metric] = []
+
+REQUEST_LATENCY = Histogram(
+    "ratnote_request_duration_seconds", "Время обработки запроса по имени URL.", LATENCY_BUCKETS)
+REQUEST_QUERIES = Histogram(
+    "ratnote_request_db_queries", "Число SQL-запросов на HTTP-запрос по имени URL.", QUERY_COUNT_BUCKETS)
+SCORING_DURATION = Histogram(
+    "ratnote_scoring_duration_seconds", "Длительность пересчёта очков по функции.", LATENCY_BUCKETS)
+CACHE_LOOKUPS = Counter(
+    "ratnote_cache_lookups_total", "Обращения к кэшам: result=hit|miss.")
+
+
+def record_cache(cache: str, hit: bool) -> None:
+    """Попадание/промах кэша; доля попаданий = hit / (hit + miss)."""
+    CACHE_LOOKUPS.inc(cache=cache, result="hit" if hit else "miss")
+
+
+def exposition() -> str:
+    """Все метрики всех воркеров в текстовом формате Prometheus."""
+    data = get_store().read()
+    by_metric: Dict[str, Dict[str, Dict[str, float]]] = defaultdict(lambda: defaultdict(dict))
+    for (name, labels, key), value in data.items():
+        by_metric[name][labels][key] = value
+
+    lines = []
+    for metric in REGISTRY:
+        lines.append(f"# HELP {metric.name} {metric.documentation}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        lines.extend(metric.samples(dict(sorted(by_metric.get(metric.name, {}).items()))))
+    return "\n".join(lines) + "\n"
+
+
+def observe_request(view: str, timings: RequestTimings) -> None:
+    REQUEST_LATENCY.observe(timings.total, view=view)
+    REQUEST_QUERIES.observe(timings.db_count, view=view)
+    for name, (duration, _) in timings.spans.items():
+        if name.startswith("scoring."):
+            SCORING_DURATION.observe(duration, function=name[len("scoring."):])
+
+
+class MetricsMiddleware:
+    """Латентность/SQL по имени URL; замеры берёт у ServerTimingMiddleware или делает сам."""
+
+    def __init__(self, get_response):
+        if not getattr(settings, "METRICS_ENABLED", False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with request_timings() as timings:
+            response = self.get_response(request)
+
+        match = getattr(request, "resolver_match", None)
+        observe_request(match.view_name if match else "<unresolved>", timings)
+        get_store().maybe_flush(getattr(settings, "METRICS_FLUSH_INTERVAL", 5))
+        return response
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-19 16:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('results', '0007_puppy_owner'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='puppytrainingsession',
+            name='order_version',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.4 on 2026-10-19 16:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('results', '0008_puppytrainingsession_order_version'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='puppytrainingsession',
+            index=models.Index(fields=['puppy', 'date'], name='puppy_session_puppy_date_idx'),
+        ),
+    ]
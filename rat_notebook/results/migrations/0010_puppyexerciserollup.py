@@ -0,0 +1,35 @@
+# Generated by Django 5.2.4 on 2026-10-19 16:19
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('results', '0009_puppytrainingsession_puppy_date_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PuppyExerciseRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.CharField(choices=[('day', 'День'), ('week', 'Неделя')], max_length=4, verbose_name='Период')),
+                ('period_start', models.DateField(verbose_name='Начало периода')),
+                ('sessions', models.PositiveIntegerField(default=0, verbose_name='Тренировок')),
+                ('entries', models.PositiveIntegerField(default=0, verbose_name='Подходов')),
+                ('planned_reps', models.PositiveIntegerField(default=0, verbose_name='План (сумма)')),
+                ('actual_reps', models.PositiveIntegerField(default=0, verbose_name='Факт (сумма)')),
+                ('success_rate', models.FloatField(blank=True, null=True, verbose_name='Успешность')),
+                ('exercise', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rollups', to='results.exercise')),
+                ('puppy', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rollups', to='results.puppy')),
+            ],
+            options={
+                'verbose_name': 'Сводка по упражнению',
+                'verbose_name_plural': 'Сводки по упражнениям',
+                'ordering': ['puppy', 'exercise', 'period', 'period_start'],
+                'constraints': [models.UniqueConstraint(fields=('puppy', 'period', 'exercise', 'period_start'), name='puppy_rollup_unique_bucket')],
+            },
+        ),
+    ]
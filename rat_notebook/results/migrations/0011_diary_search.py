@@ -0,0 +1,59 @@
+from django.db import migrations
+
+
+def forwards(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+
+    if vendor == "sqlite":
+        # FTS5 есть не во всех сборках SQLite — без него поиск работает через icontains
+        with schema_editor.connection.cursor() as cur:
+            cur.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+            if not cur.fetchone()[0]:
+                return
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE results_diary_fts USING fts5("
+            "body, kind UNINDEXED, object_id UNINDEXED, session_id UNINDEXED, "
+            "tokenize = 'unicode61 remove_diacritics 2')"
+        )
+        # переносим уже существующие записи дневника
+        schema_editor.execute(
+            "INSERT INTO results_diary_fts (rowid, body, kind, object_id, session_id) "
+            "SELECT id * 2, notes, 'session', id, id FROM results_puppytrainingsession "
+            "WHERE notes <> ''"
+        )
+        schema_editor.execute(
+            "INSERT INTO results_diary_fts (rowid, body, kind, object_id, session_id) "
+            "SELECT id * 2 + 1, trim(pros || char(10) || cons), 'exercise', id, session_id "
+            "FROM results_puppytrainingexercise WHERE pros <> '' OR cons <> ''"
+        )
+
+    elif vendor == "postgresql":
+        # выражения должны совпадать с results/search.py, иначе индексы не будут использоваться
+        schema_editor.execute(
+            "CREATE INDEX results_session_notes_fts ON results_puppytrainingsession "
+            "USING gin (to_tsvector('russian', notes))"
+        )
+        schema_editor.execute(
+            "CREATE INDEX results_exercise_proscons_fts ON results_puppytrainingexercise "
+            "USING gin (to_tsvector('russian', pros || ' ' || cons))"
+        )
+
+
+def backwards(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "sqlite":
+        schema_editor.execute("DROP TABLE IF EXISTS results_diary_fts")
+    elif vendor == "postgresql":
+        schema_editor.execute("DROP INDEX IF EXISTS results_session_notes_fts")
+        schema_editor.execute("DROP INDEX IF EXISTS results_exercise_proscons_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("results", "0010_puppyexerciserollup"),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, backwards),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.4 on 2026-10-19 16:24
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('results', '0011_diary_search'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['date', 'id'], name='event_date_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='puppy',
+            index=models.Index(fields=['pet_name', 'id'], name='puppy_name_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='puppy',
+            index=models.Index(fields=['owner', 'pet_name', 'id'], name='puppy_owner_name_id_idx'),
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.4 on 2026-10-19 17:01
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('results', '0013_exercise_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResultJournalEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event_id', models.BigIntegerField(verbose_name='Событие')),
+                ('kind', models.CharField(choices=[('athlete', 'Спортсмен'), ('result', 'Результат')], max_length=8)),
+                ('op', models.CharField(choices=[('create', 'Создание'), ('update', 'Изменение'), ('delete', 'Удаление')], max_length=8)),
+                ('object_id', models.BigIntegerField()),
+                ('old', models.JSONField(blank=True, null=True)),
+                ('new', models.JSONField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name': 'Запись журнала результатов',
+                'verbose_name_plural': 'Журнал результатов',
+                'indexes': [models.Index(fields=['event_id', 'id'], name='journal_event_id_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='StandingsSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event_id', models.BigIntegerField(verbose_name='Событие')),
+                ('last_entry_id', models.BigIntegerField(default=0, verbose_name='Последняя учтённая запись журнала')),
+                ('state', models.JSONField()),
+                ('standings', models.JSONField()),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name': 'Снимок мест',
+                'verbose_name_plural': 'Снимки мест',
+                'indexes': [models.Index(fields=['event_id', 'created_at'], name='snapshot_event_time_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.4 on 2026-10-19 17:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('results', '0014_result_journal'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='disciplineresult',
+            name='version',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Версия'),
+        ),
+        migrations.AddField(
+            model_name='puppytrainingsession',
+            name='version',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Версия'),
+        ),
+    ]
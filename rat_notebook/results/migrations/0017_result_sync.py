@@ -0,0 +1,29 @@
+# Generated by Django 5.2.4 on 2026-10-19 17:14
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('results', '0016_jobs'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResultSyncEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('client_id', models.CharField(max_length=64, unique=True, verbose_name='Id записи у клиента')),
+                ('event_id', models.BigIntegerField(verbose_name='Событие')),
+                ('result_id', models.BigIntegerField(blank=True, null=True, verbose_name='Результат')),
+                ('status', models.CharField(max_length=10, verbose_name='Статус')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name': 'Офлайн-запись судьи',
+                'verbose_name_plural': 'Офлайн-записи судей',
+            },
+        ),
+    ]
@@ -1,7 +1,8 @@
 from datetime import date
 import calendar
 
-from django.db import models
+from django.db import models, router, transaction
+from django.utils import timezone
 from django.conf import settings
 from .scoring import GROWTH_GROUPS, calculate_champion_points
 
@@ -17,6 +18,10 @@ class Event(models.Model):
     class Meta:
         verbose_name = "Событие"
         verbose_name_plural = "События"
+        indexes = [
+            # keyset-пагинация списка событий: ORDER BY date DESC, id DESC
+            models.Index(fields=["date", "id"], name="event_date_id_idx"),
+        ]
 
     def __str__(self):
         return f"{self.name} ({self.date})"
@@ -62,7 +67,52 @@ class Athlete(models.Model):
         return sum(r.points for r in self.results.all())
 
 
-class DisciplineResult(models.Model):
+class StaleObjectError(Exception):
+    """Строку успели изменить или удалить после того, как её загрузили в форму."""
+
+
+class VersionedModel(models.Model):
+    """
+    Оптимистичная блокировка: save() существующей строки пишет
+    UPDATE ... SET version = version + 1 ... WHERE id = ? AND version = <версия экземпляра>.
+    Ноль обновлённых строк — кто-то сохранил раньше: StaleObjectError вместо
+    молчаливой перезаписи (и вместо INSERT, который Django сделал бы сам).
+
+    save(update_fields=[...]) без "version" (например, пересчёт очков) версию
+    не проверяет и не двигает.
+    """
+    version = models.PositiveIntegerField("Версия", default=0, editable=False)
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields")
+        self._check_version = (
+            not self._state.adding and self.pk is not None
+            and (update_fields is None or "version" in update_fields)
+        )
+        if not self._check_version:
+            return super().save(*args, **kwargs)
+        self.version += 1
+        try:
+            # своя точка сохранения: конфликт откатывает только этот save(),
+            # а не внешнюю транзакцию (запроса, теста), в которой ещё отвечать 409
+            with transaction.atomic(using=kwargs.get("using") or router.db_for_write(type(self), instance=self)):
+                super().save(*args, **kwargs)
+        except StaleObjectError:
+            self.version -= 1
+            raise
+
+    def _do_update(self, base_qs, using, pk_val, values, update_fields, forced_update):
+        if not getattr(self, "_check_version", False):
+            return super()._do_update(base_qs, using, pk_val, values, update_fields, forced_update)
+        if not base_qs.filter(pk=pk_val, version=self.version - 1)._update(values):
+            raise StaleObjectError(f"{self._meta.verbose_name} #{pk_val}: версия {self.version - 1} устарела")
+        return True
+
+
+class DisciplineResult(VersionedModel):
     athlete = models.ForeignKey(Athlete, on_delete=models.CASCADE, related_name="results")
     discipline = models.ForeignKey(DisciplineType, on_delete=models.PROTECT)
     result = models.FloatField("Результат", null=True, blank=True)
@@ -74,11 +124,12 @@ class DisciplineResult(models.Model):
         unique_together = ("athlete", "discipline")
 
     def save(self, *args, **kwargs):
-        if self.athlete.is_champion:
+        athlete = self._scoring_athlete()
+        if athlete.is_champion:
             # начисляем сразу нормативы по ростовой группе чемпиона
             self.points = calculate_champion_points(
-                self.athlete.growth_category,
-                self.discipline.code,
+                athlete.growth_category,
+                self._discipline_code(),
                 self.result
             )
         else:
@@ -88,6 +139,18 @@ class DisciplineResult(models.Model):
             # при повторном save (после assign_growth_scores) points не меняется
         super().save(*args, **kwargs)
 
+    def _scoring_athlete(self):
+        # уже загруженный спортсмен (форма, select_related) — без запроса; иначе одна
+        # узкая выборка, которая остаётся в кэше связи для сигналов (журнал, очередь)
+        if not DisciplineResult.athlete.is_cached(self):
+            self.athlete = Athlete.objects.only("event_id", "is_champion", "growth_category").get(pk=self.athlete_id)
+        return self.athlete
+
+    def _discipline_code(self):
+        if DisciplineResult.discipline.is_cached(self):
+            return self.discipline.code
+        return DisciplineType.objects.filter(pk=self.discipline_id).values_list("code", flat=True).get()
+
     def __str__(self):
         return f"{self.athlete.name}: {self.discipline.verbose} — {self.points} очков"
 
@@ -117,6 +180,11 @@ class Puppy(models.Model):
         verbose_name = "Щенок"
         verbose_name_plural = "Щенки"
         ordering = ["pet_name", "id"]
+        indexes = [
+            # keyset-пагинация списка щенков (staff видит всех, остальные — своих)
+            models.Index(fields=["pet_name", "id"], name="puppy_name_id_idx"),
+            models.Index(fields=["owner", "pet_name", "id"], name="puppy_owner_name_id_idx"),
+        ]
 
     def __str__(self):
         return self.pet_name
@@ -152,7 +220,11 @@ class Puppy(models.Model):
 
     @property
     def age_display(self) -> str:
-        y, m, d = self.age_parts()
+        return self.age_display_on()
+
+    def age_display_on(self, on_date: date | None = None) -> str:
+        """Возраст строкой («1 г 2 мес 3 д») на дату; для списков передаём одну общую дату."""
+        y, m, d = self.age_parts(on_date)
 
         parts = []
         if y > 0:
@@ -165,7 +237,7 @@ class Puppy(models.Model):
         return " ".join(parts)
 
 
-class PuppyTrainingSession(models.Model):
+class PuppyTrainingSession(VersionedModel):
     puppy = models.ForeignKey(
         Puppy,
         on_delete=models.CASCADE,
@@ -179,10 +251,17 @@ class PuppyTrainingSession(models.Model):
     end_time = models.TimeField("Время конца")
     notes = models.TextField("Заметка к тренировке", blank=True)
 
+    # токен порядка упражнений: растёт при каждом reorder (оптимистичная блокировка)
+    order_version = models.PositiveIntegerField(default=0, editable=False)
+
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         ordering = ["-date", "-start_time", "-id"]
+        indexes = [
+            # дневник и календарь всегда фильтруют по щенку и дате/диапазону дат
+            models.Index(fields=["puppy", "date"], name="puppy_session_puppy_date_idx"),
+        ]
 
     def __str__(self):
         return f"{self.puppy.pet_name}: {self.date} {self.start_time}-{self.end_time}"
@@ -193,7 +272,11 @@ class Exercise(models.Model):
     description = models.TextField("Описание", blank=True)
     default_reps = models.PositiveIntegerField("План по умолчанию", default=0)
 
+    # версия строки: растёт при каждом save(), из неё ETag JSON-эндпоинтов упражнения
+    version = models.PositiveIntegerField(default=1, editable=False)
+
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ["name"]
@@ -203,6 +286,15 @@ class Exercise(models.Model):
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        # QuerySet.update() версию не трогает — меняйте упражнения через save()
+        if self.pk is not None:
+            self.version += 1
+            update_fields = kwargs.get("update_fields")
+            if update_fields is not None:
+                kwargs["update_fields"] = {*update_fields, "version", "updated_at"}
+        super().save(*args, **kwargs)
+
 
 class PuppyTrainingExercise(models.Model):
     session = models.ForeignKey(
@@ -240,3 +332,163 @@ class PuppyTrainingExercise(models.Model):
             ) or 0
             self.position = max_pos + 1
         super().save(*args, **kwargs)
+
+
+class PuppyExerciseRollup(models.Model):
+    """
+    Предрасчитанная сводка по упражнению щенка за день/неделю.
+    Поддерживается инкрементально (см. results/rollups.py), полная
+    пересборка — manage.py rebuild_rollups.
+    """
+    PERIOD_DAY = "day"
+    PERIOD_WEEK = "week"
+    PERIOD_CHOICES = [
+        (PERIOD_DAY, "День"),
+        (PERIOD_WEEK, "Неделя"),
+    ]
+
+    puppy = models.ForeignKey(Puppy, on_delete=models.CASCADE, related_name="rollups")
+    exercise = models.ForeignKey(Exercise, on_delete=models.CASCADE, related_name="rollups")
+    period = models.CharField("Период", max_length=4, choices=PERIOD_CHOICES)
+    period_start = models.DateField("Начало периода")
+
+    sessions = models.PositiveIntegerField("Тренировок", default=0)
+    entries = models.PositiveIntegerField("Подходов", default=0)
+    planned_reps = models.PositiveIntegerField("План (сумма)", default=0)
+    actual_reps = models.PositiveIntegerField("Факт (сумма)", default=0)
+    success_rate = models.FloatField("Успешность", null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Сводка по упражнению"
+        verbose_name_plural = "Сводки по упражнениям"
+        ordering = ["puppy", "exercise", "period", "period_start"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["puppy", "period", "exercise", "period_start"],
+                name="puppy_rollup_unique_bucket",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.puppy_id}/{self.exercise_id} {self.period} {self.period_start}"
+
+
+class ResultJournalEntry(models.Model):
+    """
+    Журнал изменений входных данных очков: спортсмены (имя, категория, флаг
+    чемпиона) и результаты. Только дописывается; event_id/object_id — без FK,
+    чтобы записи переживали удаление. Очки сюда не пишутся — они выводятся
+    из входных данных при воспроизведении (см. results/journal.py).
+    """
+    KIND_ATHLETE = "athlete"
+    KIND_RESULT = "result"
+    OP_CREATE = "create"
+    OP_UPDATE = "update"
+    OP_DELETE = "delete"
+
+    event_id = models.BigIntegerField("Событие")
+    kind = models.CharField(max_length=8, choices=[(KIND_ATHLETE, "Спортсмен"), (KIND_RESULT, "Результат")])
+    op = models.CharField(max_length=8, choices=[
+        (OP_CREATE, "Создание"), (OP_UPDATE, "Изменение"), (OP_DELETE, "Удаление"),
+    ])
+    object_id = models.BigIntegerField()
+    old = models.JSONField(null=True, blank=True)
+    new = models.JSONField(null=True, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        verbose_name = "Запись журнала результатов"
+        verbose_name_plural = "Журнал результатов"
+        indexes = [
+            # хвост журнала события после снимка: WHERE event_id = ? AND id > ?
+            models.Index(fields=["event_id", "id"], name="journal_event_id_idx"),
+        ]
+
+    def __str__(self):
+        return f"#{self.pk} {self.kind} {self.op} {self.object_id} (событие {self.event_id})"
+
+
+class StandingsSnapshot(models.Model):
+    """
+    Снимок состояния события на позицию журнала last_entry_id: входные данные
+    (state) и посчитанные по ним места (standings). Воспроизведение начинается
+    с последнего подходящего снимка и применяет только хвост журнала.
+    """
+    event_id = models.BigIntegerField("Событие")
+    last_entry_id = models.BigIntegerField("Последняя учтённая запись журнала", default=0)
+    state = models.JSONField()
+    standings = models.JSONField()
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        verbose_name = "Снимок мест"
+        verbose_name_plural = "Снимки мест"
+        indexes = [
+            models.Index(fields=["event_id", "created_at"], name="snapshot_event_time_idx"),
+        ]
+
+    def __str__(self):
+        return f"Событие {self.event_id} @ #{self.last_entry_id}"
+
+
+class Job(models.Model):
+    """
+    Фоновая задача в очереди на той же БД (см. results/jobs.py).
+
+    key — вид + аргументы: пока задача ждёт в очереди, повторная постановка с
+    тем же key ничего не добавляет (десять правок результатов события — один
+    пересчёт). Взятая воркером задача невидима до locked_until; не успел
+    отчитаться — её заберёт следующий. Успешно выполненные удаляются,
+    исчерпавшие попытки остаются со state=failed для разбора.
+    """
+    STATE_QUEUED = "queued"
+    STATE_RUNNING = "running"
+    STATE_FAILED = "failed"
+
+    kind = models.CharField("Вид", max_length=50)
+    key = models.CharField("Ключ склейки", max_length=200)
+    args = models.JSONField("Аргументы", default=dict)
+    state = models.CharField("Состояние", max_length=8, default=STATE_QUEUED, choices=[
+        (STATE_QUEUED, "В очереди"), (STATE_RUNNING, "Выполняется"), (STATE_FAILED, "Ошибка"),
+    ])
+    attempts = models.PositiveIntegerField("Попыток", default=0)
+    max_attempts = models.PositiveIntegerField("Максимум попыток", default=5)
+    run_after = models.DateTimeField("Не раньше", default=timezone.now)
+    locked_until = models.DateTimeField("Занята до", null=True, blank=True)
+    locked_by = models.CharField("Воркер", max_length=100, blank=True)
+    last_error = models.TextField("Последняя ошибка", blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        verbose_name = "Фоновая задача"
+        verbose_name_plural = "Фоновые задачи"
+        constraints = [
+            # склейка дубликатов: в очереди не больше одной задачи с данным ключом
+            models.UniqueConstraint(fields=["key"], condition=models.Q(state="queued"), name="job_one_queued_per_key"),
+        ]
+        indexes = [
+            models.Index(fields=["state", "run_after"], name="job_state_run_after_idx"),
+        ]
+
+    def __str__(self):
+        return f"#{self.pk} {self.key} ({self.state})"
+
+
+class ResultSyncEntry(models.Model):
+    """
+    Принятая запись офлайн-судейства (results/sync.py): client_id генерирует
+    браузер. Повторная отправка той же записи (ответ потерялся по дороге)
+    отвечает сохранённым статусом и ничего не пишет.
+    """
+    client_id = models.CharField("Id записи у клиента", max_length=64, unique=True)
+    event_id = models.BigIntegerField("Событие")
+    result_id = models.BigIntegerField("Результат", null=True, blank=True)
+    status = models.CharField("Статус", max_length=10)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        verbose_name = "Офлайн-запись судьи"
+        verbose_name_plural = "Офлайн-записи судей"
+
+    def __str__(self):
+        return f"{self.client_id} → {self.result_id} ({self.status})"
@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+"""
+Keyset-пагинация (по курсору) для длинных списков.
+
+В отличие от OFFSET, страница N стоит столько же, сколько первая:
+условие «после последней строки» идёт прямо в WHERE и обслуживается
+индексом по полям сортировки.
+"""
+import base64
+import json
+from dataclasses import dataclass
+from typing import List, Optional, Sequence
+
+from django.db.models import Q
+
+DEFAULT_PAGE_SIZE = 30
+
+
+@dataclass
+class KeysetPage:
+    rows: List[object]
+    next_cursor: Optional[str]
+    prev_cursor: Optional[str]
+
+
+def encode_cursor(values: Sequence) -> str:
+    raw = json.dumps(list(values), default=str, ensure_ascii=False).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[list]:
+    """Битый курсор считаем отсутствующим — просто отдаём первую страницу."""
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw.decode("utf-8"))
+    except (ValueError, UnicodeDecodeError):
+        return None
+    return values if isinstance(values, list) else None
+
+
+def _field(spec: str):
+    """'-date' -> ('date', True)."""
+    return (spec[1:], True) if spec.startswith("-") else (spec, False)
+
+
+def _after(ordering: Sequence[str], values: Sequence) -> Q:
+    """
+    Строки строго ПОСЛЕ values в порядке ordering:
+      (a > va) OR (a = va AND b > vb) OR ...
+    (для убывающих полей — «<»).
+    """
+    cond = Q()
+    for i, spec in enumerate(ordering):
+        name, desc = _field(spec)
+        step = Q(**{f"{name}__{'lt' if desc else 'gt'}": values[i]})
+        for prev_spec, prev_value in zip(ordering[:i], values[:i]):
+            step &= Q(**{_field(prev_spec)[0]: prev_value})
+        cond |= step
+    return cond
+
+
+def _reverse(ordering: Sequence[str]) -> List[str]:
+    return [spec[1:] if spec.startswith("-") else f"-{spec}" for spec in ordering]
+
+
+def _key(obj, ordering: Sequence[str]) -> list:
+    return [getattr(obj, _field(spec)[0]) for spec in ordering]
+
+
+def keyset_page(qs, ordering: Sequence[str], after: Optional[str] = None,
+                before: Optional[str] = None, size: int = DEFAULT_PAGE_SIZE) -> KeysetPage:
+    """
+    Одна страница qs в порядке ordering (последнее поле должно быть уникальным, обычно id).
+    after/before — курсоры из предыдущей страницы. Строки выбираются одним запросом
+    (size + 1, чтобы понять, есть ли продолжение).
+    """
+    after_values = decode_cursor(after)
+    before_values = None if after_values else decode_cursor(before)
+    if after_values is not None and len(after_values) != len(ordering):
+        after_values = None
+    if before_values is not None and len(before_values) != len(ordering):
+        before_values = None
+
+    if before_values is not None:
+        # идём назад: обратный порядок, потом разворачиваем
+        rows = list(qs.filter(_after(_reverse(ordering), before_values)).order_by(*_reverse(ordering))[:size + 1])
+        has_more = len(rows) > size
+        rows = rows[:size][::-1]
+        has_prev, has_next = has_more, True
+    else:
+        base = qs.filter(_after(ordering, after_values)) if after_values is not None else qs
+        rows = list(base.order_by(*ordering)[:size + 1])
+        has_next = len(rows) > size
+        rows = rows[:size]
+        has_prev = after_values is not None
+
+    return KeysetPage(
+        rows=rows,
+        next_cursor=encode_cursor(_key(rows[-1], ordering)) if rows and has_next else None,
+        prev_cursor=encode_cursor(_key(rows[0], ordering)) if rows and has_prev else None,
+    )
@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+"""
+Замеры времени запроса: общее время, число и время SQL, именованные участки (span).
+
+  * ServerTimingMiddleware включается настройкой PERF_TIMING. Выключенный
+    middleware Django вообще не подключает (MiddlewareNotUsed), а span()
+    вне замеряемого запроса — одна проверка ContextVar.
+  * Итог уходит в заголовок Server-Timing (виден в devtools браузера)
+    и одной JSON-строкой в лог "results.perf".
+
+Использование в коде:
+
+    with span("event_detail.standings"):
+        ...
+
+    @timed("scoring.assign_growth_scores")
+    def assign_growth_scores(event): ...
+"""
+import functools
+import json
+import logging
+import time
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger("results.perf")
+
+
+class RequestTimings:
+    """Накопитель замеров одного запроса."""
+
+    def __init__(self, capture_sql: bool = False):
+        self.started = time.perf_counter()
+        self.total = 0.0
+        self.db_count = 0
+        self.db_time = 0.0
+        # name -> [суммарное время, число вызовов]
+        self.spans: Dict[str, List[float]] = {}
+        # (sql, длительность) по каждому запросу — только если кому-то нужен текст SQL
+        self.queries: Optional[List[Tuple[str, float]]] = [] if capture_sql else None
+
+    def add_span(self, name: str, duration: float) -> None:
+        acc = self.spans.setdefault(name, [0.0, 0])
+        acc[0] += duration
+        acc[1] += 1
+
+    def finish(self) -> None:
+        self.total = time.perf_counter() - self.started
+
+    def server_timing(self) -> str:
+        parts = [
+            f"total;dur={self.total * 1000:.1f}",
+            f'db;dur={self.db_time * 1000:.1f};desc="{self.db_count} queries"',
+        ]
+        for name, (duration, count) in self.spans.items():
+            desc = f';desc="x{count}"' if count > 1 else ""
+            parts.append(f"{name};dur={duration * 1000:.1f}{desc}")
+        return ", ".join(parts)
+
+    def as_dict(self) -> dict:
+        return {
+            "total_ms": round(self.total * 1000, 1),
+            "db_ms": round(self.db_time * 1000, 1),
+            "db_queries": self.db_count,
+            "spans": {name: round(d * 1000, 1) for name, (d, _) in self.spans.items()},
+        }
+
+
+_current: ContextVar[Optional[RequestTimings]] = ContextVar("results_perf_timings", default=None)
+
+
+def current_timings() -> Optional[RequestTimings]:
+    return _current.get()
+
+
+@contextmanager
+def span(name: str):
+    """Замер участка кода; вне замеряемого запроса ничего не делает."""
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add_span(name, time.perf_counter() - started)
+
+
+def timed(name: str):
+    """Декоратор-версия span()."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _current.get() is None:
+                return func(*args, **kwargs)
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+@contextmanager
+def measure(timings: RequestTimings):
+    """Делает timings текущими и считает все SQL-запросы на всех подключениях."""
+    def db_wrapper(execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - started
+            timings.db_time += duration
+            timings.db_count += 1
+            if timings.queries is not None:
+                timings.queries.append((sql, duration))
+
+    token = _current.set(timings)
+    try:
+        with ExitStack() as stack:
+            for conn in connections.all():
+                stack.enter_context(conn.execute_wrapper(db_wrapper))
+            yield timings
+    finally:
+        _current.reset(token)
+        timings.finish()
+
+
+@contextmanager
+def request_timings(capture_sql: bool = False):
+    """
+    Замеры текущего запроса для middleware: если внешний middleware уже меряет,
+    берём его RequestTimings (total обновляется на выходе), иначе меряем сами.
+    """
+    timings = _current.get()
+    if timings is None:
+        with measure(RequestTimings(capture_sql)) as timings:
+            yield timings
+        return
+    if capture_sql and timings.queries is None:
+        timings.queries = []
+    try:
+        yield timings
+    finally:
+        timings.finish()
+
+
+class ServerTimingMiddleware:
+    """Server-Timing + структурированный лог на каждый запрос (при PERF_TIMING=True)."""
+
+    def __init__(self, get_response):
+        if not getattr(settings, "PERF_TIMING", False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timings = RequestTimings()
+        with measure(timings):
+            response = self.get_response(request)
+
+        response["Server-Timing"] = timings.server_timing()
+
+        match = getattr(request, "resolver_match", None)
+        user = getattr(request, "user", None)
+        record = {
+            "event": "request",
+            "method": request.method,
+            "path": request.path,
+            "view": match.view_name if match else None,
+            "status": response.status_code,
+            "user": user.pk if user is not None and user.is_authenticated else None,
+            **timings.as_dict(),
+        }
+        logger.info(json.dumps(record, ensure_ascii=False))
+        return response
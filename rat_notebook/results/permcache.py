@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+"""
+Кэш прав пользователя между запросами.
+
+ModelBackend кэширует права только на объекте user, т.е. в пределах одного
+запроса: каждая страница с @permission_required / perms.results.* заново
+делает два запроса (права пользователя и права его групп). CachedModelBackend
+кладёт готовое множество прав в общий кэш (settings.CACHES, общий для всех
+воркеров) на PERMISSION_CACHE_TIMEOUT секунд.
+
+Сброс:
+  * права/группы конкретного пользователя поменялись — удаляем его ключ;
+  * сохранили самого пользователя (мог смениться is_superuser, а суперпользователю
+    кэшируются все права) — тоже удаляем его ключ;
+  * поменялись права группы, состав группы со стороны группы, удалена группа
+    или право — меняем «поколение» ключей, и все записи разом устаревают.
+
+is_active не кэшируется — он читается с user, загруженного в этом запросе.
+"""
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.models import Group, Permission
+from django.core.cache import cache
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from .metrics import record_cache
+
+GENERATION_KEY = "perms:generation"
+CHANGES = ("post_add", "post_remove", "post_clear")
+
+
+def _generation():
+    # при вытеснении ключа берём новое значение — старые записи уже не совпадут
+    return cache.get_or_set(GENERATION_KEY, time.time_ns, None)
+
+
+def _key(user_id, generation=None):
+    return f"perms:{generation or _generation()}:{user_id}"
+
+
+def invalidate_users(user_ids):
+    generation = _generation()
+    cache.delete_many([_key(pk, generation) for pk in user_ids])
+
+
+def invalidate_all():
+    cache.set(GENERATION_KEY, time.time_ns(), None)
+
+
+class CachedModelBackend(ModelBackend):
+
+    def get_all_permissions(self, user_obj, obj=None):
+        if not user_obj.is_active or user_obj.is_anonymous or obj is not None:
+            return set()
+        if not hasattr(user_obj, "_perm_cache"):
+            key = _key(user_obj.pk)
+            perms = cache.get(key)
+            record_cache("permissions", hit=perms is not None)
+            if perms is None:
+                perms = super().get_all_permissions(user_obj)
+                cache.set(key, perms, getattr(settings, "PERMISSION_CACHE_TIMEOUT", 900))
+            user_obj._perm_cache = perms
+        return user_obj._perm_cache
+
+
+# ---------------- сброс ----------------
+
+User = get_user_model()
+
+
+def _user_side(action, instance, reverse, **kwargs):
+    if action not in CHANGES:
+        return
+    if reverse:
+        # со стороны группы/права: при clear затронутых пользователей уже не узнать
+        invalidate_all()
+    else:
+        invalidate_users([instance.pk])
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+def user_groups_changed(sender, action, instance, reverse, **kwargs):
+    _user_side(action, instance, reverse)
+
+
+@receiver(m2m_changed, sender=User.user_permissions.through)
+def user_permissions_changed(sender, action, instance, reverse, **kwargs):
+    _user_side(action, instance, reverse)
+
+
+@receiver(m2m_changed, sender=Group.permissions.through)
+def group_permissions_changed(sender, action, **kwargs):
+    if action in CHANGES:
+        invalidate_all()
+
+
+@receiver(post_delete, sender=Group)
+@receiver(post_delete, sender=Permission)
+@receiver(post_save, sender=Permission)
+def group_or_permission_changed(sender, **kwargs):
+    invalidate_all()
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created=False, update_fields=None, **kwargs):
+    # вход пользователя сохраняет только last_login — кэш не трогаем
+    if created or (update_fields is not None and "is_superuser" not in update_fields):
+        return
+    invalidate_users([instance.pk])
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+"""
+Профилирование запроса по требованию: staff добавляет к любому URL
+?_profile=1 (или ?_profile=tottime — ключ сортировки) и получает вместо
+страницы отчёт cProfile. Сырые данные сохраняются в PROFILE_DIR/*.prof
+(формат pstats — читают snakeviz, gprof2dot, flameprof).
+
+Для остальных пользователей параметр игнорируется; без параметра
+middleware — одна проверка словаря GET.
+"""
+import cProfile
+import io
+import pstats
+import re
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.http import HttpResponse
+
+PROFILE_PARAM = "_profile"
+SORT_KEYS = ("cumulative", "tottime", "ncalls")
+REPORT_LIMIT = 60
+
+
+def _profile_path(request) -> Path:
+    match = getattr(request, "resolver_match", None)
+    name = re.sub(r"[^\w.-]+", "_", match.view_name if match else request.path.strip("/")) or "root"
+    directory = Path(settings.PROFILE_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    return directory / f"{time.strftime('%Y%m%d-%H%M%S')}-{name}-{time.perf_counter_ns() % 10**6}.prof"
+
+
+class ProfileMiddleware:
+    """Должен стоять после AuthenticationMiddleware — нужен request.user."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if PROFILE_PARAM not in request.GET:
+            return self.get_response(request)
+        user = getattr(request, "user", None)
+        if user is None or not (user.is_active and user.is_staff):
+            return self.get_response(request)
+
+        sort = request.GET[PROFILE_PARAM]
+        if sort not in SORT_KEYS:
+            sort = SORT_KEYS[0]
+
+        profiler = cProfile.Profile()
+        started = time.perf_counter()
+        profiler.enable()
+        try:
+            response = self.get_response(request)
+        finally:
+            profiler.disable()
+        elapsed = time.perf_counter() - started
+
+        path = _profile_path(request)
+        profiler.dump_stats(str(path))
+
+        out = io.StringIO()
+        out.write(f"{request.method} {request.get_full_path()}\n")
+        out.write(f"status {response.status_code}, {elapsed * 1000:.1f} ms, pstats: {path}\n\n")
+        pstats.Stats(profiler, stream=out).sort_stats(sort).print_stats(REPORT_LIMIT)
+
+        report = HttpResponse(out.getvalue(), content_type="text/plain; charset=utf-8")
+        report["X-Profile-File"] = path.name
+        return report
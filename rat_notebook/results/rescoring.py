@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+"""
+Массовый пересчёт очков без открытия страниц событий.
+
+Расчёт идёт по кортежам values_list (без моделей и без запроса на каждую
+строку): один SELECT на пачку событий, ожидаемые очки —
+scoring.event_expected_points, запись — только изменившиеся строки
+одним bulk_update (UPDATE ... CASE) на пачку.
+
+Очки чемпионов от соседей не зависят (нормативы своей категории), поэтому
+для них есть отдельный узкий проход champion_changes() — по спортсменам,
+без ранжирования всего события.
+"""
+from dataclasses import dataclass
+from itertools import groupby
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from django.db import transaction
+from django.db.models import Count
+
+from .models import DisciplineResult, Event
+from .scoring import calculate_champion_points, event_expected_points
+
+ROW_FIELDS = (
+    "athlete__event_id", "id", "discipline__code", "athlete__is_champion",
+    "athlete__growth_category", "result", "points", "athlete__name",
+)
+
+
+@dataclass
+class PointsChange:
+    event_id: int
+    result_id: int
+    athlete: str
+    discipline: str
+    old: float
+    new: int
+
+
+def event_discipline_codes(event_ids: Iterable[int]) -> Dict[int, Set[str]]:
+    codes: Dict[int, Set[str]] = {}
+    pairs = Event.disciplines.through.objects.filter(event_id__in=event_ids).values_list(
+        "event_id", "disciplinetype__code")
+    for event_id, code in pairs:
+        codes.setdefault(event_id, set()).add(code)
+    return codes
+
+
+def changes_from_rows(rows: Iterable[tuple], codes: Dict[int, Set[str]]) -> List[PointsChange]:
+    """rows — кортежи ROW_FIELDS, отсортированные по событию."""
+    changes = []
+    for event_id, event_rows in groupby(rows, key=lambda r: r[0]):
+        event_rows = list(event_rows)
+        expected = event_expected_points((r[1:6] for r in event_rows), codes.get(event_id, ()))
+        for _, result_id, code, _, _, _, points, name in event_rows:
+            new = expected.get(result_id)
+            if new is not None and points != new:
+                changes.append(PointsChange(event_id, result_id, name, code, points, new))
+    return changes
+
+
+def diff_events(event_ids: List[int]) -> List[PointsChange]:
+    """Расхождения «хранится / должно быть» для пачки событий: два SELECT на пачку."""
+    rows = (
+        DisciplineResult.objects
+        .filter(athlete__event_id__in=event_ids)
+        .order_by("athlete__event_id", "id")
+        .values_list(*ROW_FIELDS)
+    )
+    return changes_from_rows(rows, event_discipline_codes(event_ids))
+
+
+CHAMPION_FIELDS = (
+    "athlete__event_id", "id", "discipline__code", "athlete__growth_category", "result", "points", "athlete__name",
+)
+
+
+def champion_changes(athlete_ids: Optional[Iterable[int]] = None,
+                     event_ids: Optional[Iterable[int]] = None) -> List[PointsChange]:
+    """
+    Расхождения очков чемпионов с calculate_champion_points — один SELECT
+    кортежей (выбранные спортсмены и/или события, без фильтров — все чемпионы).
+    """
+    qs = DisciplineResult.objects.filter(athlete__is_champion=True)
+    if athlete_ids is not None:
+        qs = qs.filter(athlete_id__in=list(athlete_ids))
+    if event_ids is not None:
+        qs = qs.filter(athlete__event_id__in=list(event_ids))
+    changes = []
+    for event_id, result_id, code, category, result, points, name in qs.values_list(*CHAMPION_FIELDS).iterator():
+        new = calculate_champion_points(category, code, result)
+        if points != new:
+            changes.append(PointsChange(event_id, result_id, name, code, points, new))
+    return changes
+
+
+def apply_changes(changes: List[PointsChange], batch_size: int = 500) -> int:
+    if not changes:
+        return 0
+    with transaction.atomic():
+        DisciplineResult.objects.bulk_update(
+            [DisciplineResult(pk=c.result_id, points=c.new) for c in changes],
+            ["points"], batch_size=batch_size,
+        )
+    return len(changes)
+
+
+def _event_rows(event_ids: List[int]) -> List[Tuple[int, List[tuple]]]:
+    rows = (
+        DisciplineResult.objects
+        .filter(athlete__event_id__in=event_ids)
+        .order_by("athlete__event_id", "id")
+        .values_list(*ROW_FIELDS)
+    )
+    return [(event_id, list(group)) for event_id, group in groupby(rows, key=lambda r: r[0])]
+
+
+def iter_event_batches(event_ids: Optional[Iterable[int]] = None,
+                       batch_size: int = 2000) -> Iterator[List[Tuple[int, List[tuple]]]]:
+    """
+    Потоковый обход результатов пачками ЦЕЛЫХ событий, примерно по batch_size
+    строк. Keyset — по Event.id (первичный ключ): страница id событий, число
+    строк каждого одним GROUP BY, события укладываются в пачки, строки пачки
+    читаются по athlete__event_id__in — сортируется только сама пачка, а не
+    весь остаток таблицы. Событие крупнее batch_size идёт отдельной пачкой.
+    В памяти одновременно одна пачка.
+    """
+    events = Event.objects.order_by("id")
+    if event_ids is not None:
+        events = events.filter(id__in=list(event_ids))
+
+    chunk: List[int] = []
+    size = 0
+    last = 0
+    while True:
+        page = list(events.filter(id__gt=last).values_list("id", flat=True)[:batch_size])
+        if not page:
+            break
+        last = page[-1]
+        counts = dict(
+            DisciplineResult.objects.filter(athlete__event_id__in=page).order_by()
+            .values("athlete__event_id").annotate(n=Count("id")).values_list("athlete__event_id", "n")
+        )
+        for event_id in page:
+            n = counts.get(event_id)
+            if not n:
+                continue
+            if chunk and size + n > batch_size:
+                yield _event_rows(chunk)
+                chunk, size = [], 0
+            chunk.append(event_id)
+            size += n
+    if chunk:
+        yield _event_rows(chunk)
+
+
+def audit(event_ids: Optional[Iterable[int]] = None, batch_size: int = 2000) -> Iterator[Tuple[int, int, List[PointsChange]]]:
+    """Потоковая сверка: по каждой пачке — (строк проверено, событий, расхождения)."""
+    for events in iter_event_batches(event_ids, batch_size):
+        codes = event_discipline_codes([event_id for event_id, _ in events])
+        changes = changes_from_rows((row for _, rows in events for row in rows), codes)
+        yield sum(len(rows) for _, rows in events), len(events), changes
@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+"""
+Сводки прогресса щенка по упражнениям (PuppyExerciseRollup).
+
+Ключ изменения — (puppy_id, exercise_id, date). На каждое изменение
+пересчитываем только затронутые «корзины» (день и неделю) агрегатом по
+ограниченному диапазону дат, поэтому стоимость не зависит от того,
+сколько лет ведётся дневник.
+"""
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from django.db import transaction
+from django.db.models import Count, Sum
+
+Key = Tuple[int, int, date]
+
+REBUILD_BATCH_SIZE = 1000
+
+
+def week_start(d: date) -> date:
+    """Понедельник недели, в которую попадает d."""
+    return d - timedelta(days=d.weekday())
+
+
+def success_rate(planned: int, actual: int) -> Optional[float]:
+    """actual / planned; None, если плана не было."""
+    if not planned:
+        return None
+    return actual / planned
+
+
+def _bucket_groups(keys: Iterable[Key]) -> Dict[Tuple[int, str, date], Set[int]]:
+    """(puppy_id, period, period_start) -> {exercise_id, ...} для дня и недели каждого ключа."""
+    from .models import PuppyExerciseRollup  # локальный импорт, чтобы избежать циклов
+
+    groups: Dict[Tuple[int, str, date], Set[int]] = {}
+    for puppy_id, exercise_id, d in keys:
+        groups.setdefault((puppy_id, PuppyExerciseRollup.PERIOD_DAY, d), set()).add(exercise_id)
+        groups.setdefault((puppy_id, PuppyExerciseRollup.PERIOD_WEEK, week_start(d)), set()).add(exercise_id)
+    return groups
+
+
+def refresh_keys(keys: Iterable[Key]) -> None:
+    """
+    Пересчитывает дневные и недельные сводки для переданных ключей.
+
+    Ключи группируются по (щенок, период): на группу — один GROUP BY exercise
+    по диапазону дат периода, удаление старых строк и bulk_create новых.
+    Пустая корзина (все подходы удалены) просто не создаётся заново.
+    """
+    from .models import PuppyExerciseRollup, PuppyTrainingExercise  # локальный импорт
+
+    groups = _bucket_groups(keys)
+    if not groups:
+        return
+
+    with transaction.atomic():
+        for (puppy_id, period, start), exercise_ids in groups.items():
+            end = start if period == PuppyExerciseRollup.PERIOD_DAY else start + timedelta(days=6)
+            rows = (
+                PuppyTrainingExercise.objects
+                .filter(session__puppy_id=puppy_id, exercise_id__in=exercise_ids,
+                        session__date__range=(start, end))
+                .order_by()
+                .values_list("exercise_id")
+                .annotate(
+                    sessions=Count("session", distinct=True),
+                    entries=Count("id"),
+                    planned=Sum("planned_reps"),
+                    actual=Sum("actual_reps"),
+                )
+            )
+            objs = [
+                PuppyExerciseRollup(
+                    puppy_id=puppy_id, exercise_id=exercise_id, period=period, period_start=start,
+                    sessions=sessions, entries=entries,
+                    planned_reps=planned or 0, actual_reps=actual or 0,
+                    success_rate=success_rate(planned or 0, actual or 0),
+                )
+                for exercise_id, sessions, entries, planned, actual in rows
+            ]
+            PuppyExerciseRollup.objects.filter(
+                puppy_id=puppy_id, period=period, period_start=start, exercise_id__in=exercise_ids,
+            ).delete()
+            if objs:
+                PuppyExerciseRollup.objects.bulk_create(objs)
+
+
+def session_keys(session_id: int, puppy_id: int, d: date) -> List[Key]:
+    """Ключи всех упражнений сессии (для смены даты/щенка у сессии)."""
+    from .models import PuppyTrainingExercise  # локальный импорт
+
+    exercise_ids = (
+        PuppyTrainingExercise.objects
+        .filter(session_id=session_id)
+        .values_list("exercise_id", flat=True)
+        .distinct()
+    )
+    return [(puppy_id, ex_id, d) for ex_id in exercise_ids]
+
+
+def rebuild(puppy_id: Optional[int] = None) -> int:
+    """
+    Полная пересборка сводок (backfill). Один GROUP BY по дням,
+    недели складываются из дней в памяти. Возвращает число строк.
+    """
+    from .models import PuppyExerciseRollup, PuppyTrainingExercise  # локальный импорт
+
+    rows = PuppyTrainingExercise.objects.all()
+    if puppy_id is not None:
+        rows = rows.filter(session__puppy_id=puppy_id)
+    daily = (
+        rows.order_by()
+        .values_list("session__puppy_id", "exercise_id", "session__date")
+        .annotate(
+            sessions=Count("session", distinct=True),
+            entries=Count("id"),
+            planned=Sum("planned_reps"),
+            actual=Sum("actual_reps"),
+        )
+    )
+
+    # сессия относится ровно к одному дню, поэтому сумма дневных sessions за неделю точна
+    totals: Dict[Tuple[int, int, str, date], List[int]] = {}
+    for puppy, exercise, d, sessions, entries, planned, actual in daily.iterator():
+        for period, start in ((PuppyExerciseRollup.PERIOD_DAY, d),
+                              (PuppyExerciseRollup.PERIOD_WEEK, week_start(d))):
+            acc = totals.setdefault((puppy, exercise, period, start), [0, 0, 0, 0])
+            acc[0] += sessions
+            acc[1] += entries
+            acc[2] += planned or 0
+            acc[3] += actual or 0
+
+    objs = [
+        PuppyExerciseRollup(
+            puppy_id=puppy, exercise_id=exercise, period=period, period_start=start,
+            sessions=sessions, entries=entries, planned_reps=planned, actual_reps=actual,
+            success_rate=success_rate(planned, actual),
+        )
+        for (puppy, exercise, period, start), (sessions, entries, planned, actual) in totals.items()
+    ]
+
+    with transaction.atomic():
+        existing = PuppyExerciseRollup.objects.all()
+        if puppy_id is not None:
+            existing = existing.filter(puppy_id=puppy_id)
+        existing.delete()
+        PuppyExerciseRollup.objects.bulk_create(objs, batch_size=REBUILD_BATCH_SIZE)
+
+    return len(objs)
+
+
+def progress_series(puppy, period: str, exercise_id: Optional[int] = None) -> List[dict]:
+    """
+    Данные для графика прогресса: по каждому упражнению — точки
+    {start, planned, actual, entries, success_rate} в хронологическом порядке.
+    """
+    from .models import PuppyExerciseRollup  # локальный импорт
+
+    qs = (
+        PuppyExerciseRollup.objects
+        .filter(puppy=puppy, period=period)
+        .select_related("exercise")
+        .order_by("exercise__name", "exercise_id", "period_start")
+    )
+    if exercise_id is not None:
+        qs = qs.filter(exercise_id=exercise_id)
+
+    series: List[dict] = []
+    for r in qs:
+        if not series or series[-1]["exercise_id"] != r.exercise_id:
+            series.append({"exercise_id": r.exercise_id, "exercise": r.exercise.name, "points": []})
+        series[-1]["points"].append({
+            "start": r.period_start.isoformat(),
+            "sessions": r.sessions,
+            "entries": r.entries,
+            "planned": r.planned_reps,
+            "actual": r.actual_reps,
+            "success_rate": r.success_rate,
+        })
+    return series
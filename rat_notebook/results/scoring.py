@@ -2,6 +2,8 @@
 from math import floor
 from typing import Dict, Iterable, List, Optional, Tuple
 
+from .perf import timed
+
 # Нормативы по ростовым категориям для чемпионов
 # treadmill — в секундах (например, 25.20 = 25.20 сек)
 QUALIFYING_NORMS = {
@@ -82,6 +84,7 @@ def calculate_champion_points(category: str, discipline: str, result: Optional[f
     return 10 + steps * cfg['points_per_step']
 
 
+@timed('scoring.assign_growth_scores')
 def assign_growth_scores(event):
     """
     Начисление очков для НЕ чемпионов (is_champion=False) по ростовым группам.
@@ -102,47 +105,78 @@ def assign_growth_scores(event):
                 athlete__is_champion=False,
                 athlete__growth_category=group,
                 discipline=discipline
-            )
+            ).select_related('athlete')  # save() читает is_champion с уже загруженного спортсмена
 
             items = list(qs)
             if not items:
                 continue
 
-            if is_time:
-                # Меньше — лучше; 0/None в конец
-                def sort_key(r):
-                    v = r.result or 0
-                    return (v <= 0, v)
-                sorted_results = sorted(items, key=sort_key)
-            else:
-                # Больше — лучше; 0/None в конец
-                sorted_results = sorted(items, key=lambda r: (r.result or 0), reverse=True)
-
-            # Dense-ранжирование по уникальным значениям result (с учётом 0-значений)
-            rank = 1
-            i = 0
-            n = len(sorted_results)
-            while i < n:
-                base_val = (sorted_results[i].result or 0)
-                same_bucket = [sorted_results[i]]
-                j = i + 1
-                while j < n and (sorted_results[j].result or 0) == base_val:
-                    same_bucket.append(sorted_results[j])
-                    j += 1
-
-                if base_val == 0:
-                    pts = -25
-                else:
-                    pts = RANK_POINTS[rank - 1] if rank <= len(RANK_POINTS) else 0
-
-                # Обновляем только если есть изменения — ускоряет идемпотентный повтор
-                for r in same_bucket:
-                    if r.points != pts:
-                        r.points = pts
-                        r.save(update_fields=['points'])
-
-                rank += 1
-                i = j
+            # Обновляем только если есть изменения — ускоряет идемпотентный повтор
+            for r, pts in growth_rank_points([(r, r.result) for r in items], is_time):
+                if r.points != pts:
+                    r.points = pts
+                    r.save(update_fields=['points'])
+
+
+def growth_rank_points(items: List[Tuple[object, Optional[float]]], is_time: bool) -> List[Tuple[object, int]]:
+    """
+    Очки ранжирования для одной ростовой группы в одной дисциплине.
+    items: [(ключ, result), ...] -> [(ключ, очки), ...]
+    Dense-ранжирование по уникальным значениям result; 0/None в конец и получают -25.
+    """
+    if is_time:
+        # Меньше — лучше; 0/None в конец
+        def sort_key(item):
+            v = item[1] or 0
+            return (v <= 0, v)
+        sorted_items = sorted(items, key=sort_key)
+    else:
+        # Больше — лучше; 0/None в конец
+        sorted_items = sorted(items, key=lambda item: (item[1] or 0), reverse=True)
+
+    out = []
+    rank = 1
+    i = 0
+    n = len(sorted_items)
+    while i < n:
+        base_val = (sorted_items[i][1] or 0)
+        j = i
+        while j < n and (sorted_items[j][1] or 0) == base_val:
+            j += 1
+
+        if base_val == 0:
+            pts = -25
+        else:
+            pts = RANK_POINTS[rank - 1] if rank <= len(RANK_POINTS) else 0
+        out.extend((key, pts) for key, _ in sorted_items[i:j])
+
+        rank += 1
+        i = j
+    return out
+
+
+def event_expected_points(rows: Iterable[tuple], discipline_codes: Iterable[str]) -> Dict[object, int]:
+    """
+    Ожидаемые очки всех результатов ОДНОГО события — без запросов к БД.
+    rows: (result_id, discipline_code, is_champion, growth_category, result)
+    discipline_codes: дисциплины события (assign_growth_scores ранжирует только их)
+
+    Чемпионы — по нормативам (как DisciplineResult.save), ростовые — ранжированием
+    внутри (группа, дисциплина), как assign_growth_scores. Результаты, которые
+    ни то ни другое не пересчитывает, в ответ не попадают.
+    """
+    codes = set(discipline_codes)
+    expected: Dict[object, int] = {}
+    buckets: Dict[Tuple[str, str], List[Tuple[object, Optional[float]]]] = {}
+    for result_id, code, is_champion, category, result in rows:
+        if is_champion:
+            expected[result_id] = calculate_champion_points(category, code, result)
+        elif category in GROWTH_GROUPS and code in codes:
+            buckets.setdefault((category, code), []).append((result_id, result))
+
+    for (_, code), items in buckets.items():
+        expected.update(growth_rank_points(items, code == 'treadmill'))
+    return expected
 
 
 def calculate_points(category: str, discipline: str, result: Optional[float]) -> int:
@@ -175,6 +209,7 @@ def _competition_rank(pairs: Iterable[Tuple[object, int]]) -> List[Tuple[object,
     return ranked
 
 
+@timed('scoring.compute_final_places')
 def compute_final_places(
     event,
     groups: Optional[Iterable[str]] = None,
@@ -0,0 +1,235 @@
+# -*- coding: utf-8 -*-
+"""
+Полнотекстовый поиск по дневнику: заметки сессий, плюсы/минусы упражнений.
+
+  * SQLite     — виртуальная таблица FTS5 results_diary_fts, синхронизируется
+                 сигналами (см. results/signals.py). Морфологии в FTS5 нет,
+                 поэтому слова запроса обрезаются до основы и ищутся по префиксу.
+  * PostgreSQL — to_tsvector('russian', ...) по исходным таблицам,
+                 GIN-индексы по тем же выражениям создаёт миграция.
+  * прочее     — icontains без ранжирования (запасной вариант).
+
+Доступ: staff ищет по всем щенкам, остальные — только по своим.
+"""
+import re
+from typing import Iterable, List, Optional
+
+from django.db import connection
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+FTS_TABLE = "results_diary_fts"
+
+KIND_SESSION = "session"
+KIND_EXERCISE = "exercise"
+
+# маркеры подсветки внутри сниппета; в HTML превращаются в <mark> после экранирования
+MARK_START = "\x02"
+MARK_END = "\x03"
+
+DEFAULT_LIMIT = 50
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+# окончания для «лёгкого» стемминга (от длинных к коротким)
+_RU_ENDINGS = sorted(
+    [
+        "ами", "ями", "ого", "его", "ому", "ему", "ыми", "ими", "ах", "ях", "ов", "ев",
+        "ей", "ой", "ий", "ый", "ая", "яя", "ое", "ее", "ые", "ие", "ам", "ям", "ом",
+        "ем", "ую", "юю", "у", "ю", "а", "я", "ы", "и", "е", "о", "ь", "й",
+    ],
+    key=len,
+    reverse=True,
+)
+_MIN_STEM = 3
+
+
+def _stem(word: str) -> str:
+    """Отрезает типичное русское окончание, оставляя основу не короче _MIN_STEM."""
+    for ending in _RU_ENDINGS:
+        if word.endswith(ending) and len(word) - len(ending) >= _MIN_STEM:
+            return word[: -len(ending)]
+    return word
+
+
+def _fts_query(text: str) -> str:
+    """Запрос пользователя -> безопасный MATCH для FTS5: "основа"* AND ..."""
+    words = _WORD_RE.findall(text.lower())
+    return " ".join(f'"{_stem(w)}"*' for w in words)
+
+
+def _rowid(kind: str, object_id: int) -> int:
+    # сессии — чётные rowid, упражнения — нечётные
+    return object_id * 2 + (1 if kind == KIND_EXERCISE else 0)
+
+
+_fts_ready = {}
+
+
+def fts_available() -> bool:
+    """Есть ли FTS5-таблица в текущей БД (проверяем один раз на процесс и БД)."""
+    if connection.vendor != "sqlite":
+        return False
+    name = str(connection.settings_dict["NAME"])
+    if name not in _fts_ready:
+        _fts_ready[name] = FTS_TABLE in connection.introspection.table_names()
+    return _fts_ready[name]
+
+
+# ---------------- индексация (только SQLite/FTS5) ----------------
+
+def _upsert(rows: Iterable[tuple]) -> None:
+    """rows: (kind, object_id, session_id, text)."""
+    rows = list(rows)
+    if not rows or not fts_available():
+        return
+    with connection.cursor() as cur:
+        cur.executemany(
+            f"DELETE FROM {FTS_TABLE} WHERE rowid = %s",
+            [(_rowid(kind, obj_id),) for kind, obj_id, _, _ in rows],
+        )
+        cur.executemany(
+            f"INSERT INTO {FTS_TABLE} (rowid, body, kind, object_id, session_id) VALUES (%s, %s, %s, %s, %s)",
+            [
+                (_rowid(kind, obj_id), text, kind, obj_id, session_id)
+                for kind, obj_id, session_id, text in rows
+                if text.strip()
+            ],
+        )
+
+
+def _exercise_text(ex) -> str:
+    return "\n".join(t for t in (ex.pros, ex.cons) if t)
+
+
+def index_session(session) -> None:
+    index_sessions([session])
+
+
+def index_sessions(sessions) -> None:
+    _upsert((KIND_SESSION, s.pk, s.pk, s.notes or "") for s in sessions)
+
+
+def index_exercises(exercises) -> None:
+    _upsert((KIND_EXERCISE, ex.pk, ex.session_id, _exercise_text(ex)) for ex in exercises)
+
+
+def unindex(kind: str, object_id: int) -> None:
+    if not fts_available():
+        return
+    with connection.cursor() as cur:
+        cur.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [_rowid(kind, object_id)])
+
+
+# ---------------- поиск ----------------
+
+def snippet_html(snippet: str) -> str:
+    """Экранирует текст и превращает маркеры подсветки в <mark>."""
+    html = escape(snippet).replace(MARK_START, "<mark>").replace(MARK_END, "</mark>")
+    return mark_safe(html)
+
+
+def _scope_sql(user, puppy_id: Optional[int]):
+    """Условие доступа по щенкам для алиаса сессии s."""
+    where, params = [], []
+    if puppy_id is not None:
+        where.append("s.puppy_id = %s")
+        params.append(puppy_id)
+    if not user.is_staff:
+        where.append("s.puppy_id IN (SELECT id FROM results_puppy WHERE owner_id = %s)")
+        params.append(user.pk)
+    return (" AND " + " AND ".join(where)) if where else "", params
+
+
+def _search_fts(text, user, puppy_id, limit):
+    match = _fts_query(text)
+    if not match:
+        return []
+    scope, params = _scope_sql(user, puppy_id)
+    sql = (
+        f"SELECT {FTS_TABLE}.kind, {FTS_TABLE}.object_id, {FTS_TABLE}.session_id, s.puppy_id, s.date, "
+        f"snippet({FTS_TABLE}, 0, char(2), char(3), '…', 16) "
+        f"FROM {FTS_TABLE} JOIN results_puppytrainingsession s ON s.id = {FTS_TABLE}.session_id "
+        f"WHERE {FTS_TABLE} MATCH %s{scope} ORDER BY {FTS_TABLE}.rank LIMIT %s"
+    )
+    with connection.cursor() as cur:
+        cur.execute(sql, [match, *params, limit])
+        return cur.fetchall()
+
+
+def _search_postgres(text, user, puppy_id, limit):
+    scope, params = _scope_sql(user, puppy_id)
+    opts = f"StartSel={MARK_START}, StopSel={MARK_END}, MaxWords=30, MinWords=10"
+    sql = (
+        "WITH q AS (SELECT plainto_tsquery('russian', %s) AS q) "
+        "SELECT * FROM ("
+        "  SELECT 'session' AS kind, s.id AS object_id, s.id AS session_id, s.puppy_id, s.date,"
+        "         ts_headline('russian', s.notes, q.q, %s) AS snippet,"
+        "         ts_rank(to_tsvector('russian', s.notes), q.q) AS rank"
+        "  FROM results_puppytrainingsession s, q"
+        f"  WHERE to_tsvector('russian', s.notes) @@ q.q{scope}"
+        "  UNION ALL"
+        "  SELECT 'exercise', e.id, s.id, s.puppy_id, s.date,"
+        "         ts_headline('russian', e.pros || ' ' || e.cons, q.q, %s),"
+        "         ts_rank(to_tsvector('russian', e.pros || ' ' || e.cons), q.q)"
+        "  FROM results_puppytrainingexercise e"
+        "  JOIN results_puppytrainingsession s ON s.id = e.session_id, q"
+        f"  WHERE to_tsvector('russian', e.pros || ' ' || e.cons) @@ q.q{scope}"
+        ") hits ORDER BY rank DESC LIMIT %s"
+    )
+    with connection.cursor() as cur:
+        cur.execute(sql, [text, opts, *params, opts, *params, limit])
+        return [row[:6] for row in cur.fetchall()]
+
+
+def _search_fallback(text, user, puppy_id, limit):
+    from .models import PuppyTrainingExercise, PuppyTrainingSession  # локальный импорт
+
+    sessions = PuppyTrainingSession.objects.filter(notes__icontains=text)
+    exercises = PuppyTrainingExercise.objects.filter(pros__icontains=text) | \
+        PuppyTrainingExercise.objects.filter(cons__icontains=text)
+    if puppy_id is not None:
+        sessions = sessions.filter(puppy_id=puppy_id)
+        exercises = exercises.filter(session__puppy_id=puppy_id)
+    if not user.is_staff:
+        sessions = sessions.filter(puppy__owner=user)
+        exercises = exercises.filter(session__puppy__owner=user)
+
+    rows = [
+        (KIND_SESSION, s.pk, s.pk, s.puppy_id, s.date, s.notes)
+        for s in sessions.order_by("-date")[:limit]
+    ]
+    rows += [
+        (KIND_EXERCISE, e.pk, e.session_id, e.session.puppy_id, e.session.date, _exercise_text(e))
+        for e in exercises.select_related("session").order_by("-session__date")[:limit]
+    ]
+    return rows[:limit]
+
+
+def search_diary(text: str, user, puppy_id: Optional[int] = None, limit: int = DEFAULT_LIMIT) -> List[dict]:
+    """
+    Ищет по дневнику в пределах доступных пользователю щенков.
+    Возвращает список {kind, object_id, session_id, puppy_id, date, snippet} по убыванию релевантности.
+    """
+    text = (text or "").strip()
+    if not text:
+        return []
+
+    if fts_available():
+        rows = _search_fts(text, user, puppy_id, limit)
+    elif connection.vendor == "postgresql":
+        rows = _search_postgres(text, user, puppy_id, limit)
+    else:
+        rows = _search_fallback(text, user, puppy_id, limit)
+
+    return [
+        {
+            "kind": kind,
+            "object_id": object_id,
+            "session_id": session_id,
+            "puppy_id": p_id,
+            "date": d,
+            "snippet": snippet_html(snippet or ""),
+        }
+        for kind, object_id, session_id, p_id, d, snippet in rows
+    ]
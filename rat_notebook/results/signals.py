@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+"""
+Поддержка производных данных дневника при save/delete:
+сводки прогресса (rollups) и полнотекстовый индекс (search).
+Подключается в ResultsConfig.ready().
+
+bulk_create в BasePuppyTrainingExerciseFormSet стандартных сигналов не шлёт,
+поэтому formset отправляет exercises_bulk_created.
+"""
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import Signal, receiver
+
+from . import rollups, search
+from .models import PuppyTrainingExercise, PuppyTrainingSession
+
+# kwargs: session, exercises
+exercises_bulk_created = Signal()
+
+
+def _exercise_key(ex):
+    session = ex.session
+    return (session.puppy_id, ex.exercise_id, session.date)
+
+
+@receiver(pre_save, sender=PuppyTrainingExercise)
+def remember_exercise_key(sender, instance, raw=False, **kwargs):
+    # старый ключ нужен, если строку перенесли в другую сессию/упражнение
+    instance._rollup_old_key = None
+    if raw or instance.pk is None:
+        return
+    old = (
+        PuppyTrainingExercise.objects
+        .filter(pk=instance.pk)
+        .values_list("session__puppy_id", "exercise_id", "session__date")
+        .first()
+    )
+    instance._rollup_old_key = old
+
+
+@receiver(post_save, sender=PuppyTrainingExercise)
+def sync_exercise_on_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    keys = {_exercise_key(instance)}
+    old = getattr(instance, "_rollup_old_key", None)
+    if old:
+        keys.add(old)
+    rollups.refresh_keys(keys)
+    search.index_exercises([instance])
+
+
+@receiver(exercises_bulk_created, sender=PuppyTrainingExercise)
+def sync_exercises_on_bulk_create(sender, session, exercises, **kwargs):
+    rollups.refresh_keys((session.puppy_id, ex.exercise_id, session.date) for ex in exercises)
+    search.index_exercises(exercises)
+
+
+@receiver(post_delete, sender=PuppyTrainingExercise)
+def sync_exercise_on_delete(sender, instance, **kwargs):
+    search.unindex(search.KIND_EXERCISE, instance.pk)
+    # при каскадном удалении сессии/щенка строки упражнений удаляются раньше
+    # родителей, так что сессия здесь ещё читается
+    session = (
+        PuppyTrainingSession.objects
+        .filter(pk=instance.session_id)
+        .values_list("puppy_id", "date")
+        .first()
+    )
+    if session is None:
+        return
+    rollups.refresh_keys([(session[0], instance.exercise_id, session[1])])
+
+
+@receiver(pre_save, sender=PuppyTrainingSession)
+def remember_session_key(sender, instance, raw=False, **kwargs):
+    instance._rollup_old_key = None
+    if raw or instance.pk is None:
+        return
+    instance._rollup_old_key = (
+        PuppyTrainingSession.objects
+        .filter(pk=instance.pk)
+        .values_list("puppy_id", "date")
+        .first()
+    )
+
+
+@receiver(post_save, sender=PuppyTrainingSession)
+def index_session_notes(sender, instance, raw=False, **kwargs):
+    if not raw:
+        search.index_session(instance)
+
+
+@receiver(post_delete, sender=PuppyTrainingSession)
+def unindex_session_notes(sender, instance, **kwargs):
+    search.unindex(search.KIND_SESSION, instance.pk)
+
+
+@receiver(post_save, sender=PuppyTrainingSession)
+def refresh_rollups_on_session_move(sender, instance, created=False, raw=False, **kwargs):
+    old = getattr(instance, "_rollup_old_key", None)
+    if raw or created or not old or old == (instance.puppy_id, instance.date):
+        return
+    keys = rollups.session_keys(instance.pk, instance.puppy_id, instance.date)
+    keys += [(old[0], ex_id, old[1]) for _, ex_id, _ in keys]
+    rollups.refresh_keys(keys)
@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+"""
+Журнал медленных запросов.
+
+Запросы дольше SLOW_REQUEST_THRESHOLD_MS пишутся одной JSON-строкой в
+SLOW_REQUEST_LOG (ротация по размеру): имя URL, пользователь, длительность
+и SQL, сгруппированный по «отпечаткам» — текст запроса без литералов и с
+IN (...) любой длины, свёрнутым в одно. N+1 виден как один отпечаток с
+большим count.
+
+Сводка: manage.py slow_requests --top 10
+"""
+import json
+import logging
+import re
+import threading
+from collections import defaultdict
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.utils import timezone
+
+from .perf import request_timings
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST_RE = re.compile(r"\bIN\s*\((?:\s*(?:%s|\?)\s*,?)+\)", re.I)
+_SPACE_RE = re.compile(r"\s+")
+
+
+def fingerprint(sql: str) -> str:
+    """SELECT ... WHERE id IN (%s, %s, %s) AND name = 'x' -> ... IN (...) AND name = ?"""
+    sql = _STRING_RE.sub("?", sql)
+    sql = _NUMBER_RE.sub("?", sql)
+    sql = sql.replace("%s", "?")
+    sql = _IN_LIST_RE.sub("IN (...)", sql)
+    return _SPACE_RE.sub(" ", sql).strip()
+
+
+def group_queries(queries: Iterable[Tuple[str, float]]) -> List[dict]:
+    """[(sql, сек), ...] -> [{'fingerprint', 'count', 'ms'}, ...] по убыванию времени."""
+    acc: Dict[str, List[float]] = defaultdict(lambda: [0, 0.0])
+    for sql, duration in queries:
+        item = acc[fingerprint(sql)]
+        item[0] += 1
+        item[1] += duration
+    return sorted(
+        ({"fingerprint": fp, "count": n, "ms": round(t * 1000, 2)} for fp, (n, t) in acc.items()),
+        key=lambda r: r["ms"], reverse=True,
+    )
+
+
+_handlers: Dict[str, RotatingFileHandler] = {}
+_handlers_lock = threading.Lock()
+
+
+def _handler(path: str) -> RotatingFileHandler:
+    with _handlers_lock:
+        if path not in _handlers:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            handler = RotatingFileHandler(
+                path, encoding="utf-8",
+                maxBytes=getattr(settings, "SLOW_REQUEST_LOG_MAX_BYTES", 5 * 1024 * 1024),
+                backupCount=getattr(settings, "SLOW_REQUEST_LOG_BACKUPS", 5),
+            )
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            _handlers[path] = handler
+        return _handlers[path]
+
+
+def write_record(record: dict) -> None:
+    line = json.dumps(record, ensure_ascii=False)
+    _handler(str(settings.SLOW_REQUEST_LOG)).handle(logging.makeLogRecord({"msg": line}))
+
+
+def read_records(path) -> Iterator[dict]:
+    """Записи из журнала и его ротированных копий (path.1, path.2, ...), битые строки пропускаем."""
+    path = Path(path)
+    rotated = [p for p in path.parent.glob(path.name + ".*") if p.suffix[1:].isdigit()]
+    files = sorted(rotated, key=lambda p: int(p.suffix[1:]), reverse=True) + [path]
+    for file in files:
+        if not file.exists():
+            continue
+        with file.open(encoding="utf-8") as fh:
+            for line in fh:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+
+
+class SlowRequestMiddleware:
+    """Пишет в журнал запросы дольше SLOW_REQUEST_THRESHOLD_MS (0 — выключено)."""
+
+    def __init__(self, get_response):
+        self.threshold = getattr(settings, "SLOW_REQUEST_THRESHOLD_MS", 0)
+        if not self.threshold:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with request_timings(capture_sql=True) as timings:
+            response = self.get_response(request)
+
+        duration_ms = timings.total * 1000
+        if duration_ms >= self.threshold:
+            match = getattr(request, "resolver_match", None)
+            user = getattr(request, "user", None)
+            write_record({
+                "ts": timezone.now().isoformat(),
+                "method": request.method,
+                "path": request.path,
+                "view": match.view_name if match else None,
+                "status": response.status_code,
+                "user": user.get_username() if user is not None and user.is_authenticated else None,
+                "duration_ms": round(duration_ms, 1),
+                "db_ms": round(timings.db_time * 1000, 1),
+                "db_queries": timings.db_count,
+                "sql": group_queries(timings.queries or ()),
+            })
+        return response
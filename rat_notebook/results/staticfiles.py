@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+"""
+Статика с хешами в именах и заранее сжатыми копиями.
+
+  * CompressedManifestStaticFilesStorage: collectstatic пишет styles.<hash>.css
+    и рядом styles.<hash>.css.gz / .br (brotli — если установлен пакет brotli).
+  * PrecompressedStaticMiddleware: отдаёт STATIC_URL из STATIC_ROOT, выбирая
+    br/gzip/исходник по Accept-Encoding. Файлы с хешем в имени отдаются с
+    Cache-Control: immutable на год — повторный визит не качает статику вовсе.
+    Включается настройкой SERVE_STATIC (если статику не раздаёт веб-сервер).
+"""
+import gzip
+import mimetypes
+import os
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage, staticfiles_storage
+from django.core.exceptions import MiddlewareNotUsed, SuspiciousFileOperation
+from django.http import FileResponse, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.http import http_date, parse_http_date_safe
+
+try:
+    import brotli
+except ImportError:  # brotli — необязательная зависимость
+    brotli = None
+
+COMPRESSIBLE = {".css", ".js", ".mjs", ".svg", ".json", ".txt", ".html", ".xml", ".map", ".ico"}
+MIN_SIZE = 256  # мелочь сжимать нет смысла
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "public, max-age=0, must-revalidate"
+
+
+def _encoders():
+    yield ".gz", lambda data: gzip.compress(data, compresslevel=9, mtime=0)
+    if brotli is not None:
+        yield ".br", lambda data: brotli.compress(data, quality=11)
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+
+    def stored_name(self, name):
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            # collectstatic ещё не запускали (тесты, локальный запуск без DEBUG) — имя без хеша
+            return name
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run=dry_run, **options)
+        if dry_run:
+            return
+        for hashed in set(self.hashed_files.values()):
+            if os.path.splitext(hashed)[1].lower() in COMPRESSIBLE:
+                self._compress(hashed)
+
+    def _compress(self, name):
+        path = self.path(name)
+        with open(path, "rb") as fh:
+            data = fh.read()
+        if len(data) < MIN_SIZE:
+            return
+        for suffix, encode in _encoders():
+            packed = encode(data)
+            if len(packed) < len(data):
+                with open(path + suffix, "wb") as fh:
+                    fh.write(packed)
+
+
+class PrecompressedStaticMiddleware:
+    ENCODINGS = ((".br", "br"), (".gz", "gzip"))
+
+    def __init__(self, get_response):
+        if not getattr(settings, "SERVE_STATIC", False) or not settings.STATIC_ROOT:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.prefix = settings.STATIC_URL if settings.STATIC_URL.startswith("/") else "/" + settings.STATIC_URL
+        self.root = str(settings.STATIC_ROOT)
+        self.hashed = set(getattr(staticfiles_storage, "hashed_files", {}).values())
+
+    def __call__(self, request):
+        if request.method in ("GET", "HEAD") and request.path.startswith(self.prefix):
+            response = self._serve(request, request.path[len(self.prefix):])
+            if response is not None:
+                return response
+        return self.get_response(request)
+
+    def _serve(self, request, name):
+        try:
+            path = safe_join(self.root, name)
+        except SuspiciousFileOperation:
+            return None
+        if not os.path.isfile(path):
+            return None
+
+        stat = os.stat(path)
+        if_modified_since = parse_http_date_safe(request.headers.get("If-Modified-Since") or "")
+        if if_modified_since is not None and int(stat.st_mtime) <= if_modified_since:
+            return HttpResponseNotModified()
+
+        accepted = request.headers.get("Accept-Encoding", "")
+        served, encoding = path, None
+        for suffix, coding in self.ENCODINGS:
+            if coding in accepted and os.path.isfile(path + suffix):
+                served, encoding = path + suffix, coding
+                break
+
+        content_type, _ = mimetypes.guess_type(path)
+        response = FileResponse(open(served, "rb"), content_type=content_type or "application/octet-stream")
+        if encoding:
+            response["Content-Encoding"] = encoding
+        response["Vary"] = "Accept-Encoding"
+        response["Last-Modified"] = http_date(stat.st_mtime)
+        response["Cache-Control"] = IMMUTABLE if name in self.hashed else REVALIDATE
+        return response
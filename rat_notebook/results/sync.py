@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+"""
+Пакетная синхронизация результатов офлайн-судейства (static/js/judge.js).
+
+Браузер копит записи {id, athlete, discipline, result[, version]} в очереди
+и отправляет пачками; sync_results() применяет пачку в одной транзакции:
+
+  * id записи (client_id) уже принимали — статус "duplicate" с прежним
+    результатом, ничего не пишем (ответ на прошлую отправку потерялся);
+  * результата (спортсмен, дисциплина) ещё нет — создаём (bulk_create);
+  * есть — обновляем (bulk_update) с version + 1. Если клиент прислал
+    version, и она не совпала с текущей, — "conflict", запись не применяется;
+    без version — последняя запись выигрывает;
+  * неверные спортсмен/дисциплина/значение — "invalid" с текстом ошибки.
+
+Потом один пересчёт очков события (rescoring.diff_events/apply_changes) и
+одна пачка записей журнала, вместо save() + пересчёта на каждую запись.
+Статус возвращается на каждую запись; всё, кроме сетевой ошибки, клиент
+убирает из очереди.
+"""
+from typing import Dict, List, Optional, Tuple
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from . import jobs, journal
+from .forms import validate_result
+from .models import Athlete, DisciplineResult, ResultJournalEntry, ResultSyncEntry
+from .rescoring import apply_changes, diff_events
+
+MAX_BATCH = 200
+
+CREATED = "created"
+UPDATED = "updated"
+UNCHANGED = "unchanged"
+DUPLICATE = "duplicate"
+CONFLICT = "conflict"
+INVALID = "invalid"
+
+
+class SyncError(ValueError):
+    """Пачка целиком неверна (не список, слишком большая)."""
+
+
+def _parse(raw) -> Tuple[Optional[dict], Optional[str]]:
+    if not isinstance(raw, dict):
+        return None, "Запись должна быть объектом"
+    client_id = raw.get("id")
+    if not isinstance(client_id, str) or not 0 < len(client_id) <= 64:
+        return None, "Нет id записи"
+    try:
+        entry = {
+            "id": client_id,
+            "athlete": int(raw["athlete"]),
+            "discipline": int(raw["discipline"]),
+            "result": None if raw.get("result") in (None, "") else float(raw["result"]),
+            "version": None if raw.get("version") is None else int(raw["version"]),
+        }
+    except (KeyError, TypeError, ValueError):
+        return {"id": client_id}, "Нужны athlete, discipline и числовой result"
+    return entry, None
+
+
+def sync_results(event, entries: list) -> Dict[str, object]:
+    """Применяет пачку записей судьи к событию; возвращает статусы по каждой записи."""
+    if not isinstance(entries, list):
+        raise SyncError("entries должен быть списком")
+    if len(entries) > MAX_BATCH:
+        raise SyncError(f"Не больше {MAX_BATCH} записей за раз")
+
+    statuses: List[dict] = []
+    parsed: List[dict] = []
+    for raw in entries:
+        entry, error = _parse(raw)
+        if error:
+            statuses.append({"id": entry and entry["id"], "status": INVALID, "error": error})
+        else:
+            statuses.append({"id": entry["id"]})
+            parsed.append(entry)
+
+    with transaction.atomic():
+        outcome, rescored = _apply(event, parsed)
+    for status in statuses:
+        if "status" not in status:
+            status.update(outcome[status["id"]])
+    return {"results": statuses, "rescored": rescored}
+
+
+def _apply(event, parsed: List[dict]) -> Tuple[Dict[str, dict], int]:
+    """Статусы по client_id и число строк, у которых пересчёт поменял очки."""
+    outcome: Dict[str, dict] = {}
+
+    seen = dict(ResultSyncEntry.objects.filter(client_id__in=[e["id"] for e in parsed])
+                .values_list("client_id", "result_id"))
+    disciplines = {d.pk: d for d in event.disciplines.all()}
+    athlete_ids = set(Athlete.objects.filter(event=event, pk__in={e["athlete"] for e in parsed})
+                      .values_list("id", flat=True))
+
+    todo = []
+    for e in parsed:
+        if e["id"] in seen:
+            outcome[e["id"]] = {"status": DUPLICATE, "result_id": seen[e["id"]]}
+            continue
+        if e["id"] in outcome:
+            continue  # та же запись дважды в одной пачке — один ответ на обе
+        discipline = disciplines.get(e["discipline"])
+        if e["athlete"] not in athlete_ids or discipline is None:
+            outcome[e["id"]] = {"status": INVALID, "error": "Спортсмен или дисциплина не из этого события"}
+            continue
+        try:
+            validate_result(discipline, e["result"])
+        except ValidationError as exc:
+            outcome[e["id"]] = {"status": INVALID, "error": " ".join(exc.messages)}
+            continue
+        outcome[e["id"]] = {}
+        todo.append(e)
+
+    # существующие строки — один SELECT (на PostgreSQL с блокировкой до конца транзакции)
+    current = {}
+    rows = (DisciplineResult.objects.select_for_update()
+            .filter(athlete_id__in={e["athlete"] for e in todo}, discipline_id__in={e["discipline"] for e in todo})
+            .values_list("athlete_id", "discipline_id", "id", "result", "version"))
+    for athlete_id, discipline_id, pk, result, version in rows:
+        current[(athlete_id, discipline_id)] = {"id": pk, "result": result, "version": version}
+    before = {pair: dict(row) for pair, row in current.items()}
+
+    new: Dict[Tuple[int, int], dict] = {}
+    for e in todo:
+        pair = (e["athlete"], e["discipline"])
+        row = current.get(pair) or new.get(pair)
+        if row is None:
+            new[pair] = {"result": e["result"], "version": 0, "ids": [e["id"]]}
+            outcome[e["id"]] = {"status": CREATED}
+        elif e["version"] is not None and e["version"] != row["version"]:
+            # result_id у строки из new появится только после вставки — проставим ниже
+            outcome[e["id"]] = {"status": CONFLICT, "version": row["version"], "result": row["result"]}
+            row.setdefault("conflicts", []).append(e["id"])
+        elif e["result"] == row["result"]:
+            outcome[e["id"]] = {"status": UNCHANGED}
+            row.setdefault("ids", []).append(e["id"])
+        else:
+            row["result"] = e["result"]
+            if "id" in row:
+                row["version"] = before[pair]["version"] + 1
+            outcome[e["id"]] = {"status": CREATED if pair in new else UPDATED}
+            row.setdefault("ids", []).append(e["id"])
+
+    changed = [(pair, row) for pair, row in current.items() if row["version"] != before[pair]["version"]]
+    if new:
+        DisciplineResult.objects.bulk_create([
+            DisciplineResult(athlete_id=a, discipline_id=d, result=row["result"], points=0)
+            for (a, d), row in new.items()
+        ])
+        # не все СУБД возвращают pk из bulk_create — дочитываем одним запросом
+        for a, d, pk in (DisciplineResult.objects.filter(athlete_id__in={a for a, _ in new},
+                                                           discipline_id__in={d for _, d in new})
+                         .values_list("athlete_id", "discipline_id", "id")):
+            if (a, d) in new:
+                new[(a, d)]["id"] = pk
+    if changed:
+        DisciplineResult.objects.bulk_update(
+            [DisciplineResult(pk=row["id"], result=row["result"], version=row["version"]) for _, row in changed],
+            ["result", "version"],
+        )
+
+    journal.write_many(event.id, ResultJournalEntry.KIND_RESULT, [
+        (ResultJournalEntry.OP_CREATE, row["id"], None, {"athlete": a, "discipline": d, "result": row["result"]})
+        for (a, d), row in new.items()
+    ] + [
+        (ResultJournalEntry.OP_UPDATE, row["id"],
+         {"athlete": a, "discipline": d, "result": before[(a, d)]["result"]},
+         {"athlete": a, "discipline": d, "result": row["result"]})
+        for (a, d), row in changed
+    ])
+
+    accepted = []
+    for row in list(new.values()) + list(current.values()):
+        for client_id in row.get("conflicts", []):
+            outcome[client_id]["result_id"] = row["id"]
+        for client_id in row.get("ids", []):
+            outcome[client_id].update(result_id=row["id"], version=row["version"])
+            accepted.append(ResultSyncEntry(client_id=client_id, event_id=event.id, result_id=row["id"],
+                                            status=outcome[client_id]["status"]))
+    ResultSyncEntry.objects.bulk_create(accepted)
+
+    rescored = 0
+    if new or changed:
+        # один пересчёт на всю пачку; снимок мест — в фоне
+        rescored = apply_changes(diff_events([event.id]))
+        jobs.enqueue("snapshot_standings", event_id=event.id)
+    return outcome, rescored
@@ -0,0 +1,17 @@
+# -*- coding: utf-8 -*-
+import pytest
+from django.core.cache import cache
+from django.test.utils import override_settings
+
+
+@pytest.fixture(scope="session", autouse=True)
+def locmem_cache():
+    """Тесты (и миграции тестовой БД) не пишут в файловый кэш разработчика."""
+    with override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}):
+        yield
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    # сессии и права не переживают тест: id пользователей в тестовой БД повторяются
+    cache.clear()
@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from results.models import Athlete, DisciplineResult, DisciplineType, Event
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def make_athletes():
+    disc = DisciplineType.objects.create(code="long_jump", verbose="Прыжок в длину")
+    ev = Event.objects.create(name="Rat Cup", date="2025-01-01")
+
+    def _make(n):
+        for i in range(n):
+            a = Athlete.objects.create(event=ev, name=f"Спортсмен {Athlete.objects.count()}", is_champion=True)
+            DisciplineResult.objects.create(athlete=a, discipline=disc, result=400 + i * 10)
+
+    return _make
+
+
+def _changelist_queries(client, name, params=None):
+    with CaptureQueriesContext(connection) as ctx:
+        resp = client.get(reverse(f"admin:results_{name}_changelist"), params or {})
+    assert resp.status_code == 200
+    return len(ctx)
+
+
+@pytest.mark.parametrize("name", ["athlete", "disciplineresult"])
+def test_changelist_query_count_does_not_grow_with_rows(admin_client, make_athletes, name):
+    make_athletes(3)
+    small = _changelist_queries(admin_client, name)
+    make_athletes(40)
+
+    assert _changelist_queries(admin_client, name) == small
+
+
+def test_athlete_total_points_column_is_sortable(admin_client, make_athletes):
+    make_athletes(3)
+
+    resp = admin_client.get(reverse("admin:results_athlete_changelist"), {"o": "-5"})
+
+    totals = [a._total_points for a in resp.context["cl"].result_list]
+    assert totals == sorted(totals, reverse=True)
+    assert totals == [a.total_points for a in resp.context["cl"].result_list]
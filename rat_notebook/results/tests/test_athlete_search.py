@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+import pytest
+from django.urls import reverse
+
+from results.forms import DisciplineResultForm
+from results.models import Athlete, DisciplineType, Event
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def event():
+    ev = Event.objects.create(name="Rat Cup", date="2025-01-01")
+    ev.disciplines.add(DisciplineType.objects.create(code="long_jump", verbose="Прыжок в длину"))
+    for name, cat, champ in [
+        ("Тыква", "S", False),
+        ("Тайга", "S", False),
+        ("Тор", "M", False),
+        ("FDK's Fiji / Тимка", "S", False),
+        ("Кока", "L", True),
+    ]:
+        Athlete.objects.create(event=ev, name=name, growth_category=cat, is_champion=champ)
+    other = Event.objects.create(name="Other", date="2025-02-01")
+    Athlete.objects.create(event=other, name="Тишка", growth_category="S")
+    return ev
+
+
+def _search(client, event, **params):
+    resp = client.get(reverse("event_athlete_search", args=[event.id]), params)
+    assert resp.status_code == 200
+    return [r["name"] for r in resp.json()["results"]]
+
+
+def test_prefix_search_within_event(admin_client, event):
+    assert _search(admin_client, event, q="Т") == ["FDK's Fiji / Тимка", "Тайга", "Тор", "Тыква"]
+    assert _search(admin_client, event, q="Ты") == ["Тыква"]
+
+
+def test_search_respects_active_group(admin_client, event):
+    assert _search(admin_client, event, q="Т", group="S") == ["FDK's Fiji / Тимка", "Тайга", "Тыква"]
+    assert _search(admin_client, event, group="C") == ["Кока"]
+
+
+def test_search_requires_view_permission(client, django_user_model, event):
+    client.force_login(django_user_model.objects.create_user("guest", password="pw"))
+    resp = client.get(reverse("event_athlete_search", args=[event.id]), {"q": "Т"})
+    assert resp.status_code == 403
+
+
+def test_form_accepts_only_athletes_of_the_event(event):
+    disc = event.disciplines.get()
+    mine = event.athletes.get(name="Тыква")
+    foreign = Athlete.objects.get(name="Тишка")
+
+    ok = DisciplineResultForm({"athlete": mine.pk, "discipline": disc.pk, "result": 400}, event=event)
+    bad = DisciplineResultForm({"athlete": foreign.pk, "discipline": disc.pk, "result": 400}, event=event)
+
+    assert ok.is_valid(), ok.errors
+    assert not bad.is_valid() and "athlete" in bad.errors
+    assert bad.selected_athlete_label() == ""
+
+
+def test_event_page_does_not_ship_athlete_options(admin_client, event):
+    resp = admin_client.get(reverse("event_detail", args=[event.id]))
+
+    html = resp.content.decode()
+    assert 'id="athleteSearch"' in html
+    assert "data-champion" not in html
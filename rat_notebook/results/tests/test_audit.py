@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from results.models import Athlete, DisciplineResult, DisciplineType, Event
+from results.rescoring import iter_event_batches
+from results.scoring import assign_growth_scores
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def events():
+    disc = DisciplineType.objects.create(code="long_jump", verbose="Прыжок в длину")
+    out = []
+    for n in range(3):
+        ev = Event.objects.create(name=f"Кубок {n}", date="2025-01-01")
+        ev.disciplines.add(disc)
+        for i in range(4):
+            a = Athlete.objects.create(event=ev, name=f"Спортсмен {i}", growth_category="L")
+            DisciplineResult.objects.create(athlete=a, discipline=disc, result=500 + i * 20)
+        assign_growth_scores(ev)
+        out.append(ev)
+    return out
+
+
+def _audit(**kwargs):
+    out = StringIO()
+    call_command("audit_points", stdout=out, verbosity=2, **kwargs)
+    return out.getvalue()
+
+
+def test_batches_never_split_an_event(events):
+    batches = list(iter_event_batches(batch_size=3))
+
+    seen = [event_id for batch in batches for event_id, _ in batch]
+    assert seen == [ev.id for ev in events]
+    assert all(len(rows) == 4 for batch in batches for _, rows in batch)
+
+
+def test_batches_read_by_event_keyset(events, django_assert_num_queries):
+    # страница id событий + GROUP BY по ним, по запросу на пачку, пустая страница в конце
+    with django_assert_num_queries(2 + 2 + 1):
+        batches = list(iter_event_batches(batch_size=8))
+
+    assert [[event_id for event_id, _ in batch] for batch in batches] == [
+        [events[0].id, events[1].id], [events[2].id]]
+
+
+def test_clean_database_has_no_mismatches(events):
+    assert "расхождений: 0" in _audit(batch_size=5)
+
+
+def test_champion_flag_toggled_after_save_is_reported_and_repaired(events, django_assert_max_num_queries):
+    ev = events[1]
+    # флаг сменили в обход пересчёта — очки остались от ранжирования
+    Athlete.objects.filter(event=ev, name="Спортсмен 3").update(is_champion=True)
+
+    text = _audit(batch_size=5)
+    assert f"{ev} [#{ev.id}]: расхождений 4" in text
+    # 560 при нормативе L 530: 10 + 3 полных шага по 10 см
+    assert "Спортсмен 3 / long_jump: хранится 25, должно быть 13" in text
+    # у ростовых L теперь на одного меньше — остальные поднялись
+    assert "Спортсмен 2 / long_jump: хранится 20, должно быть 25" in text
+
+    with django_assert_max_num_queries(20):
+        text = _audit(batch_size=5, repair=True)
+    assert "Исправлено: 4" in text
+    assert "расхождений: 0" in _audit(batch_size=5)
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from results.models import Athlete, DisciplineResult, DisciplineType, Event
+from results.rescoring import apply_changes, champion_changes
+from results.scoring import calculate_champion_points
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def event():
+    ev = Event.objects.create(name="Кубок", date="2025-01-01")
+    ev.disciplines.add(
+        DisciplineType.objects.create(code="long_jump", verbose="Прыжок в длину"),
+        DisciplineType.objects.create(code="wall_jump", verbose="Стена"),
+    )
+    return ev
+
+
+def _selects_from(ctx, table):
+    return [q["sql"] for q in ctx.captured_queries
+            if q["sql"].startswith("SELECT") and f'FROM "results_{table}"' in q["sql"]]
+
+
+def test_save_reuses_loaded_athlete_and_discipline(event):
+    champ = Athlete.objects.create(event=event, name="Кока", growth_category="L", is_champion=True)
+    jump = event.disciplines.get(code="long_jump")
+
+    with CaptureQueriesContext(connection) as ctx:
+        r = DisciplineResult.objects.create(athlete=champ, discipline=jump, result=560)
+
+    assert r.points == calculate_champion_points("L", "long_jump", 560)
+    assert not _selects_from(ctx, "athlete") and not _selects_from(ctx, "disciplinetype")
+
+
+def test_save_by_ids_fetches_only_what_scoring_needs(event):
+    plain = Athlete.objects.create(event=event, name="Тыква", growth_category="L")
+    champ = Athlete.objects.create(event=event, name="Кока", growth_category="L", is_champion=True)
+    jump_id = event.disciplines.get(code="long_jump").pk
+
+    with CaptureQueriesContext(connection) as ctx:
+        DisciplineResult.objects.create(athlete_id=plain.pk, discipline_id=jump_id, result=500)
+    # ростовым код дисциплины не нужен; спортсмен — одна узкая выборка на всё сохранение
+    assert len(_selects_from(ctx, "athlete")) == 1
+    assert not _selects_from(ctx, "disciplinetype")
+
+    with CaptureQueriesContext(connection) as ctx:
+        r = DisciplineResult.objects.create(athlete_id=champ.pk, discipline_id=jump_id, result=560)
+    assert len(_selects_from(ctx, "athlete")) == 1
+    assert len(_selects_from(ctx, "disciplinetype")) == 1
+    assert r.points == calculate_champion_points("L", "long_jump", 560)
+
+
+def test_bulk_pass_from_tuples(event, django_assert_num_queries):
+    disciplines = list(event.disciplines.all())
+    for i, cat in enumerate(("S", "M", "L")):
+        a = Athlete.objects.create(event=event, name=f"Чемпион {i}", growth_category=cat, is_champion=True)
+        for d in disciplines:
+            DisciplineResult.objects.create(athlete=a, discipline=d, result=600 if d.code == "long_jump" else 400)
+    DisciplineResult.objects.update(points=-1)  # «испорченные» очки
+
+    with django_assert_num_queries(1):
+        changes = champion_changes(event_ids=[event.id])
+    assert len(changes) == 6
+    with CaptureQueriesContext(connection) as ctx:
+        apply_changes(changes)
+    assert [q["sql"][:6] for q in ctx.captured_queries if "results_disciplineresult" in q["sql"]] == ["UPDATE"]
+
+    for r in DisciplineResult.objects.select_related("athlete", "discipline"):
+        assert r.points == calculate_champion_points(r.athlete.growth_category, r.discipline.code, r.result)
+    assert champion_changes() == []
+
+
+@pytest.mark.parametrize("before, after", [
+    ({"is_champion": False, "growth_category": "L"}, {"is_champion": True}),
+    ({"is_champion": True, "growth_category": "L"}, {"growth_category": "XS"}),
+])
+def test_flag_or_category_change_rescores_that_champion(event, before, after):
+    jump = event.disciplines.get(code="long_jump")
+    athlete = Athlete.objects.create(event=event, name="Кока", **before)
+    other = Athlete.objects.create(event=event, name="Белка", growth_category="S", is_champion=True)
+    mine = DisciplineResult.objects.create(athlete=athlete, discipline=jump, result=560)
+    theirs = DisciplineResult.objects.create(athlete=other, discipline=jump, result=560)
+    DisciplineResult.objects.filter(pk=theirs.pk).update(points=-1)
+
+    for field, value in after.items():
+        setattr(athlete, field, value)
+    athlete.save()
+
+    mine.refresh_from_db()
+    theirs.refresh_from_db()
+    assert mine.points == calculate_champion_points(athlete.growth_category, "long_jump", 560)
+    assert theirs.points == -1  # проход только по изменённому спортсмену
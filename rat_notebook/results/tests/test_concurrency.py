@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+import re
+from datetime import date, time
+
+import pytest
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from results.models import (
+    Athlete, DisciplineResult, DisciplineType, Event, Exercise, Puppy, PuppyTrainingExercise, PuppyTrainingSession,
+    StaleObjectError,
+)
+from results.scoring import assign_growth_scores
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def result():
+    disc = DisciplineType.objects.create(code="long_jump", verbose="Прыжок в длину")
+    ev = Event.objects.create(name="Кубок", date="2025-01-01")
+    ev.disciplines.add(disc)
+    athlete = Athlete.objects.create(event=ev, name="Тыква", growth_category="L")
+    return DisciplineResult.objects.create(athlete=athlete, discipline=disc, result=500)
+
+
+@pytest.fixture
+def judges(django_user_model):
+    clients = []
+    for name in ("judge1", "judge2"):
+        c = Client()
+        c.force_login(django_user_model.objects.create_superuser(name, password="pw"))
+        clients.append(c)
+    return clients
+
+
+def _version(html):
+    return re.search(r'name="version" value="(\d+)"', html).group(1)
+
+
+def test_version_is_checked_in_update_where_clause(result):
+    first = DisciplineResult.objects.get(pk=result.pk)
+    second = DisciplineResult.objects.get(pk=result.pk)
+
+    first.result = 520
+    with CaptureQueriesContext(connection) as ctx:
+        first.save()
+    update = next(q["sql"] for q in ctx.captured_queries if q["sql"].startswith("UPDATE"))
+    assert '"version" = 0' in update.split("WHERE", 1)[1]
+
+    second.result = 540
+    with pytest.raises(StaleObjectError):
+        second.save()
+
+    result.refresh_from_db()
+    assert (result.result, result.version) == (520, 1)
+    assert second.version == 0  # откатили — можно перечитать и повторить
+
+
+def test_points_recalculation_does_not_bump_version(result):
+    assign_growth_scores(result.athlete.event)
+    DisciplineResult.objects.filter(pk=result.pk).update(points=0)
+    assign_growth_scores(result.athlete.event)
+
+    result.refresh_from_db()
+    assert result.version == 0
+
+
+def test_save_of_deleted_row_conflicts_instead_of_inserting(result):
+    stale = DisciplineResult.objects.get(pk=result.pk)
+    DisciplineResult.objects.filter(pk=result.pk).delete()
+
+    with pytest.raises(StaleObjectError):
+        stale.save()
+    assert not DisciplineResult.objects.exists()
+
+
+def test_second_judge_gets_conflict_and_can_retry(result, judges):
+    url = reverse("edit_result", args=[result.athlete.event_id, result.pk])
+    first, second = judges
+    seen = _version(second.get(url).content.decode())
+
+    assert first.post(url, {"result": 520, "version": _version(first.get(url).content.decode())}).status_code == 302
+
+    resp = second.post(url, {"result": 540, "version": seen})
+    html = resp.content.decode()
+    assert resp.status_code == 409
+    assert "изменил другой судья: сейчас 520, вы вводили 540" in html
+    result.refresh_from_db()
+    assert result.result == 520
+
+    # форма конфликта несёт актуальную версию — повторная отправка проходит
+    assert second.post(url, {"result": 540, "version": _version(html)}).status_code == 302
+    result.refresh_from_db()
+    assert (result.result, result.version) == (540, 2)
+
+
+def test_session_edit_conflict_rolls_back_exercises(judges):
+    puppy = Puppy.objects.create(pet_name="Хатори", sex="M", birth_date=date(2024, 1, 1))
+    session = PuppyTrainingSession.objects.create(
+        puppy=puppy, date=date(2025, 1, 1), start_time=time(10, 0), end_time=time(11, 0))
+    entry = PuppyTrainingExercise.objects.create(
+        session=session, exercise=Exercise.objects.create(name="Подзыв"), planned_reps=5, actual_reps=3)
+    url = reverse("puppy_session_edit", args=[puppy.id, session.pk])
+
+    def data(notes, actual, version):
+        return {
+            "date": "2025-01-01", "start_time": "10:00", "end_time": "11:00", "notes": notes, "version": version,
+            "exercises-TOTAL_FORMS": "1", "exercises-INITIAL_FORMS": "1",
+            "exercises-0-id": entry.pk, "exercises-0-exercise": entry.exercise_id,
+            "exercises-0-planned_reps": "5", "exercises-0-actual_reps": str(actual),
+        }
+
+    first, second = judges
+    seen = _version(second.get(url).content.decode())
+    assert first.post(url, data("первый", 4, seen)).status_code == 302
+
+    resp = second.post(url, data("второй", 1, seen))
+
+    assert resp.status_code == 409
+    assert "уже сохранили в другом окне" in resp.content.decode()
+    session.refresh_from_db()
+    entry.refresh_from_db()
+    assert (session.notes, session.version, entry.actual_reps) == ("первый", 1, 4)
@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+import json
+import re
+from datetime import date, time
+
+import pytest
+from django.contrib.staticfiles import finders
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+from django.urls import reverse
+
+from results.models import Exercise, Puppy, PuppyTrainingExercise, PuppyTrainingSession
+
+pytestmark = pytest.mark.django_db
+
+# со встроенным <script> страницы из фикстуры весили ~29 и ~35 КБ, без него — ~21 и ~25 КБ
+PAGE_BUDGETS = (24 * 1024, 28 * 1024)
+
+
+@pytest.fixture
+def admin_client(client, django_user_model):
+    user = django_user_model.objects.create_superuser("trainer", password="pw")
+    client.force_login(user)
+    return client
+
+
+@pytest.fixture
+def session():
+    puppy = Puppy.objects.create(pet_name="Хатори", sex="M", birth_date=date(2024, 1, 1))
+    session = PuppyTrainingSession.objects.create(
+        puppy=puppy, date=date(2025, 1, 1), start_time=time(10, 0), end_time=time(11, 0),
+    )
+    for i in range(3):
+        PuppyTrainingExercise.objects.create(
+            session=session, exercise=Exercise.objects.create(name=f"Упражнение {i}"), planned_reps=5, actual_reps=3,
+        )
+    return session
+
+
+def _pages(session):
+    return [
+        reverse("puppy_diary", args=[session.puppy_id]) + "?date=2025-01-01",
+        reverse("puppy_session_edit", args=[session.puppy_id, session.pk]),
+    ]
+
+
+def _attr(html, name):
+    return re.search(rf'{name}="([^"]*)"', html).group(1)
+
+
+def test_pages_have_no_inline_scripts_and_fit_budget(admin_client, session):
+    for url, budget in zip(_pages(session), PAGE_BUDGETS):
+        html = admin_client.get(url).content.decode()
+
+        assert re.findall(r"<script>", html) == [], url
+        assert staticfiles_storage.url("js/diary.js") in html
+        assert len(html.encode()) < budget, (url, len(html.encode()))
+
+
+def test_shared_script_covers_both_page_kinds():
+    source = open(finders.find("js/diary.js"), encoding="utf-8").read()
+
+    for hook in (".js-remove-row", ".js-remove-new", ".js-delete-saved", ".js-ex-info", ".js-clamp",
+                 "data-default-reps-url", "data-reorder-url", "data-description-url"):
+        assert hook in source
+
+
+def test_endpoint_urls_come_from_markup(admin_client, session):
+    html = admin_client.get(_pages(session)[1]).content.decode()
+    ex = Exercise.objects.create(name="Подзыв", default_reps=7, description="С игрушкой")
+
+    # скрипт подставляет id вместо 0
+    reps = admin_client.get(_attr(html, "data-default-reps-url").replace("/0/", f"/{ex.pk}/"))
+    description = admin_client.get(_attr(html, "data-description-url").replace("/0/", f"/{ex.pk}/"))
+
+    assert reps.json()["default_reps"] == 7
+    assert description.json()["description"] == "С игрушкой"
+
+
+def test_reorder_via_markup_config(admin_client, session):
+    html = admin_client.get(_pages(session)[1]).content.decode()
+    ids = [int(x) for x in re.findall(r'data-ex-id="(\d+)"', html)]
+    ids = list(dict.fromkeys(ids))  # строки таблицы и карточки дублируют друг друга
+
+    resp = admin_client.post(
+        _attr(html, "data-reorder-url"),
+        data=json.dumps({"ordered_ids": ids[::-1], "version": int(_attr(html, "data-order-version"))}),
+        content_type="application/json",
+    )
+
+    assert resp.status_code == 200
+    assert list(session.exercises.order_by("position").values_list("id", flat=True)) == ids[::-1]
+
+
+def test_diary_formset_post_still_saves(admin_client, session):
+    exercises = list(Exercise.objects.order_by("id"))
+    data = {
+        "date": "2025-01-02", "start_time": "09:00", "end_time": "09:30", "notes": "",
+        "exercises-TOTAL_FORMS": "2", "exercises-INITIAL_FORMS": "0",
+        "exercises-MIN_NUM_FORMS": "0", "exercises-MAX_NUM_FORMS": "1000",
+    }
+    for i, ex in enumerate(exercises[:2]):
+        data.update({f"exercises-{i}-exercise": ex.pk, f"exercises-{i}-planned_reps": 5,
+                     f"exercises-{i}-actual_reps": 4})
+
+    resp = admin_client.post(reverse("puppy_diary", args=[session.puppy_id]), data)
+
+    assert resp.status_code == 302
+    created = PuppyTrainingSession.objects.get(puppy=session.puppy, date=date(2025, 1, 2))
+    assert created.exercises.count() == 2
+
+
+def test_collectstatic_versions_the_script(settings, tmp_path):
+    settings.STATIC_ROOT = str(tmp_path)
+    call_command("collectstatic", interactive=False, verbosity=0)
+
+    hashed = staticfiles_storage.stored_name("js/diary.js")
+    assert re.fullmatch(r"js/diary\.[0-9a-f]{12}\.js", hashed)
+    assert (tmp_path / f"{hashed}.gz").exists()
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+from datetime import date, time, timedelta
+
+import pytest
+from django.urls import reverse
+
+from results.diary import calendar_range, calendar_weeks, day_totals, shift_anchor
+from results.models import Exercise, Puppy, PuppyTrainingExercise, PuppyTrainingSession
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def puppy():
+    return Puppy.objects.create(pet_name="Хатори", sex="M", birth_date=date(2024, 1, 1))
+
+
+@pytest.fixture
+def make_session(puppy):
+    ex = Exercise.objects.create(name="Сидеть")
+
+    def _make(day, start, end, reps=()):
+        s = PuppyTrainingSession.objects.create(puppy=puppy, date=day, start_time=start, end_time=end)
+        for planned, actual in reps:
+            PuppyTrainingExercise.objects.create(session=s, exercise=ex, planned_reps=planned, actual_reps=actual)
+        return s
+
+    return _make
+
+
+def test_calendar_range_week_and_month():
+    # 2025-01-15 — среда
+    assert calendar_range("week", date(2025, 1, 15)) == (date(2025, 1, 13), date(2025, 1, 19))
+    assert calendar_range("month", date(2024, 2, 10)) == (date(2024, 2, 1), date(2024, 2, 29))
+    assert shift_anchor("month", date(2025, 1, 31), -1) == date(2024, 12, 1)
+    assert shift_anchor("week", date(2025, 1, 15), 1) == date(2025, 1, 22)
+
+
+def test_day_totals_does_not_multiply_duration_by_exercises(puppy, make_session):
+    make_session(date(2025, 1, 1), time(10, 0), time(11, 30), reps=[(5, 4), (10, 6)])
+    make_session(date(2025, 1, 1), time(12, 0), time(12, 30))
+    make_session(date(2025, 1, 3), time(9, 0), time(9, 45), reps=[(3, 3)])
+    make_session(date(2025, 2, 1), time(9, 0), time(10, 0), reps=[(1, 1)])  # вне периода
+
+    totals = day_totals(puppy, date(2025, 1, 1), date(2025, 1, 31))
+
+    assert totals == {
+        date(2025, 1, 1): {"sessions": 2, "planned": 15, "actual": 10, "duration": timedelta(minutes=120)},
+        date(2025, 1, 3): {"sessions": 1, "planned": 3, "actual": 3, "duration": timedelta(minutes=45)},
+    }
+
+
+def test_calendar_weeks_month_grid_is_padded_to_full_weeks():
+    weeks = calendar_weeks("month", date(2025, 1, 15), {})
+    days = [cell["date"] for week in weeks for cell in week]
+
+    assert all(len(w) == 7 for w in weeks)
+    assert days[0] == date(2024, 12, 30) and days[-1] == date(2025, 2, 2)
+    assert sum(cell["in_range"] for week in weeks for cell in week) == 31
+
+
+def test_calendar_view_loads_in_constant_queries(client, django_user_model, puppy, make_session,
+                                                 django_assert_max_num_queries):
+    user = django_user_model.objects.create_user("trainer", password="pw", is_staff=True)
+    client.force_login(user)
+    for d in range(1, 29):
+        make_session(date(2025, 2, d), time(10, 0), time(10, 30), reps=[(5, 5)] * 3)
+
+    # сессия, пользователь, щенок, сводка
+    with django_assert_max_num_queries(4):
+        resp = client.get(reverse("puppy_calendar", args=[puppy.id]), {"view": "month", "date": "2025-02-10"})
+
+    assert resp.status_code == 200
+    html = resp.content.decode()
+    assert "План/факт: 15/15" in html
+    assert f"{reverse('puppy_diary', args=[puppy.id])}?date=2025-02-14" in html
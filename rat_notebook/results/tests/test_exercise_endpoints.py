@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+import pytest
+from django.urls import reverse
+from django.utils.http import http_date
+
+from results.models import Exercise
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def staff_client(client, django_user_model):
+    user = django_user_model.objects.create_user("trainer", password="pw", is_staff=True)
+    client.force_login(user)
+    return client
+
+
+@pytest.fixture
+def exercise():
+    return Exercise.objects.create(name="Подзыв", default_reps=5, description="С игрушкой")
+
+
+def _url(name, ex):
+    return reverse(name, args=[ex.pk])
+
+
+@pytest.mark.parametrize("name, key, value", [
+    ("exercise_default_reps", "default_reps", 5),
+    ("exercise_description", "description", "С игрушкой"),
+])
+def test_response_carries_validators_and_private_caching(staff_client, exercise, name, key, value):
+    resp = staff_client.get(_url(name, exercise))
+
+    assert resp.status_code == 200
+    assert resp.json() == {key: value}
+    assert resp["ETag"] == f'"ex{exercise.pk}-v1"'
+    assert resp["Last-Modified"]
+    assert "private" in resp["Cache-Control"] and "max-age=60" in resp["Cache-Control"]
+
+
+def test_matching_etag_is_304_with_single_exercise_query(staff_client, exercise, django_assert_num_queries):
+    url = _url("exercise_default_reps", exercise)
+    etag = staff_client.get(url)["ETag"]
+
+    # пользователь + одна выборка версии (сессия — из кэша)
+    with django_assert_num_queries(2):
+        resp = staff_client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    assert resp.status_code == 304
+    assert resp.content == b""
+    assert resp["ETag"] == etag
+    assert "private" in resp["Cache-Control"]
+
+
+def test_if_modified_since_is_304(staff_client, exercise):
+    resp = staff_client.get(_url("exercise_description", exercise),
+                            HTTP_IF_MODIFIED_SINCE=http_date(exercise.updated_at.timestamp() + 1))
+
+    assert resp.status_code == 304
+
+
+def test_edit_bumps_version_and_invalidates_etag(staff_client, exercise):
+    url = _url("exercise_default_reps", exercise)
+    etag = staff_client.get(url)["ETag"]
+
+    exercise.default_reps = 8
+    exercise.save(update_fields=["default_reps"])
+    resp = staff_client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    assert resp.status_code == 200
+    assert resp.json() == {"default_reps": 8}
+    assert resp["ETag"] == f'"ex{exercise.pk}-v2"'
+    exercise.refresh_from_db()
+    assert exercise.version == 2
+
+
+def test_missing_exercise_is_404(staff_client):
+    assert staff_client.get(reverse("exercise_description", args=[999])).status_code == 404
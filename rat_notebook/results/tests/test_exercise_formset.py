@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+from datetime import date, time
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from results.forms import PuppyTrainingExerciseCreateFormSet, PuppyTrainingExerciseEditFormSet
+from results.models import Exercise, Puppy, PuppyTrainingExercise, PuppyTrainingSession
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def session():
+    puppy = Puppy.objects.create(pet_name="Хатори", sex="M", birth_date=date(2024, 1, 1))
+    return PuppyTrainingSession.objects.create(
+        puppy=puppy, date=date(2025, 1, 1), start_time=time(10, 0), end_time=time(11, 0),
+    )
+
+
+@pytest.fixture
+def exercises():
+    return [Exercise.objects.create(name=f"Упражнение {i}") for i in range(12)]
+
+
+def _formset_data(prefix, rows, initial=0):
+    data = {
+        f"{prefix}-TOTAL_FORMS": str(initial + len(rows)),
+        f"{prefix}-INITIAL_FORMS": str(initial),
+        f"{prefix}-MIN_NUM_FORMS": "0",
+        f"{prefix}-MAX_NUM_FORMS": "1000",
+    }
+    for i, ex in enumerate(rows, start=initial):
+        data.update({
+            f"{prefix}-{i}-exercise": str(ex.pk),
+            f"{prefix}-{i}-planned_reps": "5",
+            f"{prefix}-{i}-actual_reps": "4",
+        })
+    return data
+
+
+def _save_counting_queries(session, rows):
+    prefix = PuppyTrainingExerciseCreateFormSet.get_default_prefix()
+    formset = PuppyTrainingExerciseCreateFormSet(_formset_data(prefix, rows), instance=session)
+    assert formset.is_valid(), formset.errors
+    with CaptureQueriesContext(connection) as ctx:
+        saved = formset.save()
+    assert len(saved) == len(rows)
+    return len(ctx)
+
+
+def test_new_rows_get_sequential_positions_in_constant_queries(session, exercises):
+    other = PuppyTrainingSession.objects.create(
+        puppy=session.puppy, date=session.date, start_time=time(12, 0), end_time=time(13, 0),
+    )
+
+    # блокировка сессии + один Max + один bulk INSERT (+ сводки) — на любое число строк
+    assert _save_counting_queries(session, exercises) == _save_counting_queries(other, exercises[:2])
+
+    assert list(
+        session.exercises.values_list("exercise_id", "position")
+    ) == [(ex.pk, pos) for pos, ex in enumerate(exercises, start=1)]
+
+
+def test_edit_formset_appends_after_existing_rows(session, exercises):
+    first = PuppyTrainingExercise.objects.create(
+        session=session, exercise=exercises[0], planned_reps=1, actual_reps=1,
+    )
+    PuppyTrainingExercise.objects.filter(pk=first.pk).update(position=7)
+
+    prefix = PuppyTrainingExerciseEditFormSet.get_default_prefix()
+    data = _formset_data(prefix, exercises[1:3], initial=1)
+    data.update({
+        f"{prefix}-0-id": str(first.pk),
+        f"{prefix}-0-exercise": str(exercises[0].pk),
+        f"{prefix}-0-planned_reps": "1",
+        f"{prefix}-0-actual_reps": "1",
+    })
+    formset = PuppyTrainingExerciseEditFormSet(data, instance=session)
+    assert formset.is_valid(), formset.errors
+    formset.save()
+
+    assert list(session.exercises.values_list("position", flat=True)) == [7, 8, 9]
@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+
+from results import jobs
+from results.jobs import claim, enqueue, job_key, run_job, run_pending
+from results.models import Athlete, DisciplineResult, DisciplineType, Event, Job, StandingsSnapshot
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def event():
+    disc = DisciplineType.objects.create(code="long_jump", verbose="Прыжок в длину")
+    ev = Event.objects.create(name="Кубок", date="2025-01-01")
+    ev.disciplines.add(disc)
+    for i, jump in enumerate((500, 520, 540)):
+        a = Athlete.objects.create(event=ev, name=f"Спортсмен {i}", growth_category="L")
+        DisciplineResult.objects.create(athlete=a, discipline=disc, result=jump)
+    return ev
+
+
+@pytest.fixture
+def flaky(monkeypatch):
+    calls = []
+
+    def handler(n):
+        calls.append(n)
+        raise RuntimeError("нет связи")
+
+    monkeypatch.setitem(jobs.HANDLERS, "flaky", handler)
+    return calls
+
+
+def _points(ev):
+    return sorted(DisciplineResult.objects.filter(athlete__event=ev).values_list("points", flat=True))
+
+
+def test_result_edits_coalesce_into_one_rescore(event):
+    for r in DisciplineResult.objects.filter(athlete__event=event):
+        r.result += 5
+        r.save()
+
+    assert list(Job.objects.values_list("key", "state")) == [
+        (job_key("rescore_event", event_id=event.id), Job.STATE_QUEUED)]
+    assert enqueue("rescore_event", event_id=event.id) is False
+
+
+def test_worker_rescores_and_materializes_standings(event):
+    assert _points(event) == [0, 0, 0]
+
+    assert run_pending("w1") == 2  # пересчёт, затем поставленный им снимок
+
+    assert _points(event) == [15, 20, 25]
+    assert not Job.objects.exists()
+    assert StandingsSnapshot.objects.filter(event_id=event.id).count() == 1
+
+
+def test_change_during_run_queues_another_pass(event):
+    job = claim("w1")
+    DisciplineResult.objects.filter(athlete__event=event).first().save()
+
+    assert Job.objects.filter(key=job.key).count() == 2
+    run_job(job, "w1")
+    assert Job.objects.get(key=job.key).state == Job.STATE_QUEUED
+
+
+def test_failure_is_retried_with_backoff_then_parked(flaky, settings):
+    settings.JOBS_RETRY_DELAY = 10
+    enqueue("flaky", max_attempts=2, n=1)
+
+    assert run_pending("w1") == 1
+    job = Job.objects.get()
+    assert (job.state, job.attempts) == (Job.STATE_QUEUED, 1)
+    assert "нет связи" in job.last_error
+    assert job.run_after > timezone.now() + timedelta(seconds=5)
+    assert run_pending("w1") == 0  # ещё рано
+
+    Job.objects.update(run_after=timezone.now())
+    run_pending("w1")
+
+    job.refresh_from_db()
+    assert (job.state, job.attempts, flaky) == (Job.STATE_FAILED, 2, [1, 1])
+    assert enqueue("flaky", n=1) is True  # проваленная не мешает новой постановке
+
+
+def test_retry_folds_into_duplicate_queued_meanwhile(flaky):
+    enqueue("flaky", n=1)
+    job = claim("w1")
+    enqueue("flaky", n=1)
+
+    run_job(job, "w1")
+
+    assert list(Job.objects.values_list("state", "attempts")) == [(Job.STATE_QUEUED, 0)]
+
+
+def test_expired_visibility_lets_another_worker_take_over(settings):
+    settings.JOBS_VISIBILITY_TIMEOUT = 60
+    enqueue("rebuild_rollups")
+    lost = claim("w1")
+    assert claim("w2") is None  # пока невидима
+
+    Job.objects.update(locked_until=timezone.now() - timedelta(seconds=1))
+    taken = claim("w2")
+    assert (taken.pk, taken.locked_by, taken.attempts) == (lost.pk, "w2", 2)
+
+    run_job(lost, "w1")  # опоздавший воркер чужую задачу не снимает
+    assert Job.objects.filter(pk=taken.pk, locked_by="w2").exists()
+    run_job(taken, "w2")
+    assert not Job.objects.exists()
+
+
+def test_job_outliving_timeout_on_every_attempt_ends_failed():
+    enqueue("rebuild_rollups", max_attempts=2)
+    for worker in ("w1", "w2"):
+        assert claim(worker) is not None  # воркер «умирает», не отчитавшись
+        Job.objects.update(locked_until=timezone.now() - timedelta(seconds=1))
+
+    assert claim("w3") is None
+    job = Job.objects.get()
+    assert (job.state, job.attempts, job.locked_until) == (Job.STATE_FAILED, 2, None)
+    assert "visibility timeout" in job.last_error
+
+
+def test_view_enqueues_and_returns_immediately(admin_client, event):
+    Job.objects.all().delete()
+    url = reverse("event_rescore", args=[event.id])
+
+    resp = admin_client.post(url, HTTP_X_REQUESTED_WITH="XMLHttpRequest")
+    assert resp.status_code == 202 and resp.json() == {"queued": True}
+    assert admin_client.post(url, HTTP_X_REQUESTED_WITH="XMLHttpRequest").json() == {"queued": False}
+    assert _points(event) == [0, 0, 0]
+
+    page = admin_client.get(reverse("event_detail", args=[event.id])).content.decode()
+    assert "Очки пересчитываются" in page
+
+
+def test_run_jobs_command_once(event):
+    out = StringIO()
+    call_command("run_jobs", once=True, stdout=out)
+
+    assert "Задач выполнено: 2" in out.getvalue()
+    assert _points(event) == [15, 20, 25]
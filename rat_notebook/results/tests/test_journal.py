@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from results import journal
+from results.journal import standings_at, take_snapshot
+from results.models import Athlete, DisciplineResult, DisciplineType, Event, ResultJournalEntry, StandingsSnapshot
+from results.scoring import assign_growth_scores, compute_final_places
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def event():
+    jump = DisciplineType.objects.create(code="long_jump", verbose="Прыжок в длину")
+    wall = DisciplineType.objects.create(code="wall_jump", verbose="Стена")
+    ev = Event.objects.create(name="Кубок", date="2025-01-01")
+    ev.disciplines.add(jump, wall)
+    for i in range(4):
+        a = Athlete.objects.create(event=ev, name=f"Спортсмен {i}", growth_category="L", is_champion=(i == 3))
+        DisciplineResult.objects.create(athlete=a, discipline=jump, result=500 + i * 20)
+        DisciplineResult.objects.create(athlete=a, discipline=wall, result=300 + i * 10)
+    assign_growth_scores(ev)
+    return ev
+
+
+def _result(ev, name, code):
+    return DisciplineResult.objects.get(athlete__event=ev, athlete__name=name, discipline__code=code)
+
+
+def _places(standings, group):
+    return [(row["athlete"], row["total"], row["place"]) for row in standings[group]]
+
+
+def test_changes_are_journaled_with_old_and_new_values(event):
+    r = _result(event, "Спортсмен 0", "long_jump")
+    pk = r.pk
+    r.result = 700
+    r.save()
+    r.delete()
+
+    create, update, delete = ResultJournalEntry.objects.filter(kind="result", object_id=pk).order_by("id")
+    assert (create.op, create.old, create.new["result"]) == ("create", None, 500)
+    assert (update.op, update.old["result"], update.new["result"]) == ("update", 500, 700)
+    assert (delete.op, delete.old["result"], delete.new) == ("delete", 700, None)
+
+
+def test_points_recalculation_is_not_journaled(event):
+    before = ResultJournalEntry.objects.count()
+    Athlete.objects.filter(event=event, name="Спортсмен 0").update(growth_category="M")
+
+    assign_growth_scores(event)
+
+    assert ResultJournalEntry.objects.count() == before
+
+
+def test_replay_from_empty_matches_database_standings(event):
+    replay = standings_at(event.id, at=timezone.now())
+
+    assert replay.snapshot is None
+    expected = compute_final_places(event)["L"]
+    assert _places(replay.standings, "L") == [(row["athlete"].name, row["total_points"], row["place"])
+                                              for row in expected]
+    assert [row["athlete"] for row in replay.standings["C"]] == ["Спортсмен 3"]
+
+
+def test_standings_as_of_a_moment_before_a_bad_edit(event):
+    take_snapshot(event.id)
+    before_edit = timezone.now()
+    good = _places(standings_at(event.id).standings, "L")
+
+    r = _result(event, "Спортсмен 0", "long_jump")
+    r.result = 900  # опечатка судьи
+    r.save()
+    assign_growth_scores(event)
+
+    assert _places(standings_at(event.id).standings, "L") != good
+    assert _places(standings_at(event.id, at=before_edit).standings, "L") == good
+
+
+def test_replay_costs_snapshot_plus_tail(event, django_assert_max_num_queries):
+    take_snapshot(event.id)
+    athlete = Athlete.objects.get(event=event, name="Спортсмен 1")
+    athlete.is_champion = True
+    athlete.save()
+    Athlete.objects.get(event=event, name="Спортсмен 0").delete()  # + 2 результата каскадом
+
+    with django_assert_max_num_queries(4):
+        replay = standings_at(event.id)
+
+    assert replay.tail == 4
+    assert [row["athlete"] for row in replay.standings["C"]] == ["Спортсмен 3", "Спортсмен 1"]
+    assert [row["athlete"] for row in replay.standings["L"]] == ["Спортсмен 2"]
+    assert replay.state == journal.current_state(event.id)
+
+
+def test_long_tail_is_compacted_into_a_new_snapshot(event, monkeypatch):
+    monkeypatch.setattr(journal, "SNAPSHOT_EVERY", 3)
+    take_snapshot(event.id)
+    r = _result(event, "Спортсмен 0", "wall_jump")
+    for value in (301, 302, 303):
+        r.result = value
+        r.save()
+
+    first = standings_at(event.id)
+    second = standings_at(event.id)
+
+    assert first.tail == 3 and second.tail == 0
+    assert StandingsSnapshot.objects.filter(event_id=event.id).count() == 2
+    assert second.standings == first.standings
+
+
+def test_commands(event):
+    out = StringIO()
+    call_command("snapshot_standings", stdout=out)
+    assert "Снимков: 1 из 1" in out.getvalue()
+
+    out = StringIO()
+    call_command("snapshot_standings", min_tail=1, stdout=out)
+    assert "Снимков: 0 из 1" in out.getvalue()
+
+    out = StringIO()
+    call_command("replay_standings", event.id, stdout=out)
+    text = out.getvalue()
+    assert "+ 0 записей журнала" in text
+    assert "Чемпионы" in text and "Спортсмен 3" in text
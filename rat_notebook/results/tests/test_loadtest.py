@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from results.loadtest import percentile
+from results.models import Athlete, DisciplineResult, DisciplineType, Event, Exercise, Puppy
+
+
+def test_percentile_nearest_rank():
+    values = [i / 100 for i in range(1, 101)]
+
+    assert (percentile(values, 50), percentile(values, 95), percentile(values, 99)) == (0.5, 0.95, 0.99)
+    assert percentile([], 99) == 0.0
+
+
+# сервер работает в своих потоках — данные должны быть закоммичены
+@pytest.mark.django_db(transaction=True)
+def test_loadtest_reports_latency_and_writes(tmp_path):
+    ev = Event.objects.create(name="Rat Cup", date="2025-01-01")
+    disc = DisciplineType.objects.create(code="long_jump", verbose="Прыжок в длину")
+    ev.disciplines.add(disc)
+    for i in range(5):
+        Athlete.objects.create(event=ev, name=f"Спортсмен {i}", growth_category="S")
+    Puppy.objects.create(pet_name="Хатори", sex="M", birth_date="2024-01-01")
+    Exercise.objects.create(name="Подзыв", default_reps=5)
+    report_path = tmp_path / "report.json"
+
+    call_command("loadtest", users=2, duration=30, requests=40, json_path=str(report_path), stdout=StringIO())
+
+    data = json.loads(report_path.read_text(encoding="utf-8"))
+    assert data["requests"] == 40
+    assert data["errors"] == {}
+    for name, s in data["scenarios"].items():
+        assert s["errors"] == 0, name
+        assert s["p50_ms"] <= s["p95_ms"] <= s["p99_ms"] <= s["max_ms"]
+    # судьи реально вносили результаты
+    assert DisciplineResult.objects.filter(athlete__event=ev).count() == data["scenarios"]["add_result"]["requests"]
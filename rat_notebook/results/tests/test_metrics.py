@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+import re
+
+import pytest
+from django.urls import reverse
+
+from results.metrics import MetricsStore, REQUEST_LATENCY, record_cache
+from results.models import Athlete, DisciplineType, Event
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def metrics(settings, tmp_path):
+    settings.METRICS_ENABLED = True
+    settings.METRICS_STORE = str(tmp_path / "metrics.sqlite3")
+    settings.METRICS_FLUSH_INTERVAL = 0
+    return settings.METRICS_STORE
+
+
+def _scrape(client):
+    resp = client.get(reverse("metrics"))
+    assert resp.status_code == 200
+    assert resp["Content-Type"].startswith("text/plain; version=0.0.4")
+    return resp.content.decode()
+
+
+def _value(text, sample):
+    m = re.search(rf"^{re.escape(sample)} (\S+)$", text, re.M)
+    return float(m.group(1)) if m else None
+
+
+def test_request_latency_and_scoring_histograms(admin_client, metrics):
+    ev = Event.objects.create(name="Rat Cup", date="2025-01-01")
+    ev.disciplines.add(DisciplineType.objects.create(code="long_jump", verbose="Прыжок в длину"))
+    Athlete.objects.create(event=ev, name="Тыква", growth_category="S")
+
+    admin_client.get(reverse("event_detail", args=[ev.id]))
+    admin_client.get(reverse("event_detail", args=[ev.id]))
+    text = _scrape(admin_client)
+
+    assert "# TYPE ratnote_request_duration_seconds histogram" in text
+    assert _value(text, 'ratnote_request_duration_seconds_count{view="event_detail"}') == 2
+    assert _value(text, 'ratnote_request_duration_seconds_bucket{view="event_detail",le="+Inf"}') == 2
+    assert _value(text, 'ratnote_request_db_queries_count{view="event_detail"}') == 2
+    assert _value(text, 'ratnote_scoring_duration_seconds_count{function="compute_final_places"}') == 2
+
+
+def test_buckets_are_cumulative(admin_client, metrics):
+    for value in (0.001, 0.02, 0.02, 30):
+        REQUEST_LATENCY.observe(value, view="x")
+
+    text = _scrape(admin_client)
+
+    assert _value(text, 'ratnote_request_duration_seconds_bucket{view="x",le="0.005"}') == 1
+    assert _value(text, 'ratnote_request_duration_seconds_bucket{view="x",le="0.025"}') == 3
+    assert _value(text, 'ratnote_request_duration_seconds_bucket{view="x",le="10"}') == 3
+    assert _value(text, 'ratnote_request_duration_seconds_bucket{view="x",le="+Inf"}') == 4
+    assert _value(text, 'ratnote_request_duration_seconds_sum{view="x"}') == pytest.approx(30.041)
+
+
+def test_workers_are_aggregated_through_shared_store(admin_client, metrics):
+    record_cache("default_reps", hit=True)
+    other_worker = MetricsStore(metrics)  # второй процесс пишет в тот же файл
+    other_worker.add("ratnote_cache_lookups_total", '[["cache", "default_reps"], ["result", "hit"]]', "", 2)
+    other_worker.flush()
+
+    text = _scrape(admin_client)
+
+    assert _value(text, 'ratnote_cache_lookups_total{cache="default_reps",result="hit"}') == 3
+
+
+def test_endpoint_is_staff_only(client, django_user_model, metrics):
+    client.force_login(django_user_model.objects.create_user("judge", password="pw"))
+
+    resp = client.get(reverse("metrics"))
+
+    assert resp.status_code == 302
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+from datetime import date
+
+import pytest
+from django.contrib.auth.models import Permission
+from django.urls import reverse
+
+from results.models import Event, Puppy
+from results.pagination import decode_cursor, encode_cursor, keyset_page
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def events():
+    # по несколько событий на дату — проверяем тай-брейк по id
+    return [
+        Event.objects.create(name=f"Кубок {i}", date=date(2025, 1, 1 + i // 3))
+        for i in range(10)
+    ]
+
+
+def _walk(qs, ordering, size):
+    """Проходит все страницы вперёд, затем назад; возвращает (вперёд, назад)."""
+    forward, pages = [], []
+    page = keyset_page(qs, ordering, size=size)
+    while True:
+        pages.append(page)
+        forward += [e.pk for e in page.rows]
+        if not page.next_cursor:
+            break
+        page = keyset_page(qs, ordering, after=page.next_cursor, size=size)
+
+    backward = []
+    while page.prev_cursor:
+        page = keyset_page(qs, ordering, before=page.prev_cursor, size=size)
+        backward = [e.pk for e in page.rows] + backward
+    return forward, backward, pages
+
+
+def test_keyset_walk_matches_full_ordering(events):
+    expected = list(Event.objects.order_by("-date", "-id").values_list("pk", flat=True))
+
+    forward, backward, pages = _walk(Event.objects.all(), ["-date", "-id"], size=4)
+
+    assert forward == expected
+    assert backward == expected[:-2]  # назад от последней (неполной) страницы
+    assert [len(p.rows) for p in pages] == [4, 4, 2]
+    assert pages[0].prev_cursor is None
+
+
+def test_cursor_roundtrip_and_garbage():
+    assert decode_cursor(encode_cursor(["Тыква", 5])) == ["Тыква", 5]
+    assert decode_cursor("не-курсор") is None
+    assert keyset_page(Event.objects.all(), ["-date", "-id"], after="%%%").prev_cursor is None
+
+
+def test_event_list_page_is_one_query(client, django_user_model, django_assert_max_num_queries):
+    Event.objects.bulk_create(Event(name=f"Этап {i}", date=date(2024, 1, 1 + i % 28)) for i in range(45))
+    user = django_user_model.objects.create_user("judge", password="pw")
+    user.user_permissions.add(Permission.objects.get(codename="view_event"))
+    client.force_login(user)
+    first = client.get(reverse("event_list"))
+    cursor = first.context["page"].next_cursor
+
+    # сессия, пользователь, права (x2), страница событий
+    with django_assert_max_num_queries(5):
+        resp = client.get(reverse("event_list"), {"after": cursor})
+
+    assert resp.status_code == 200
+    assert len(resp.context["events"]) == 45 - len(first.context["events"])
+
+
+def test_puppy_list_owner_scope_and_age(client, django_user_model):
+    owner = django_user_model.objects.create_user("owner", password="pw")
+    Puppy.objects.create(pet_name="Чужой", sex="M", birth_date=date(2024, 1, 1))
+    Puppy.objects.create(pet_name="Хатори", sex="M", birth_date=date(2024, 1, 1), owner=owner)
+    client.force_login(owner)
+
+    resp = client.get(reverse("puppy_list"))
+
+    assert [p.pet_name for p in resp.context["puppies"]] == ["Хатори"]
+    assert resp.context["puppies"][0].age == resp.context["puppies"][0].age_display
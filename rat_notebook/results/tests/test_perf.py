@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+import json
+import logging
+
+import pytest
+from django.urls import reverse
+
+from results.models import Athlete, DisciplineType, Event
+from results.perf import RequestTimings, current_timings, measure, span
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def event():
+    ev = Event.objects.create(name="Rat Cup", date="2025-01-01")
+    disc = DisciplineType.objects.create(code="long_jump", verbose="Прыжок в длину")
+    ev.disciplines.add(disc)
+    Athlete.objects.create(event=ev, name="Тыква", growth_category="S")
+    return ev
+
+
+def _metrics(header):
+    return {part.split(";")[0].strip(): part for part in header.split(",")}
+
+
+def test_server_timing_header_and_log_line(admin_client, settings, event, caplog):
+    settings.PERF_TIMING = True
+
+    with caplog.at_level(logging.INFO, logger="results.perf"):
+        resp = admin_client.get(reverse("event_detail", args=[event.id]))
+
+    metrics = _metrics(resp["Server-Timing"])
+    assert {"total", "db", "scoring.compute_final_places", "render"} <= set(metrics)
+
+    record = json.loads(caplog.records[-1].getMessage())
+    assert record["view"] == "event_detail"
+    assert record["status"] == 200
+    assert record["db_queries"] > 0
+    assert f'desc="{record["db_queries"]} queries"' in metrics["db"]
+
+
+def test_disabled_by_default(admin_client, event):
+    resp = admin_client.get(reverse("event_detail", args=[event.id]))
+
+    assert "Server-Timing" not in resp
+
+
+def test_span_outside_request_is_noop():
+    with span("anything"):
+        pass
+    assert current_timings() is None
+
+
+def test_measure_counts_queries_and_repeated_spans():
+    timings = RequestTimings()
+    with measure(timings):
+        for _ in range(3):
+            with span("loop"):
+                list(Event.objects.all())
+
+    assert timings.db_count == 3
+    assert timings.spans["loop"][1] == 3
+    assert 'loop;dur=' in timings.server_timing() and 'desc="x3"' in timings.server_timing()
+    assert current_timings() is None
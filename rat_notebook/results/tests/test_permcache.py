@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+import pytest
+from django.contrib.auth.models import Group, Permission
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from results.models import Event
+
+pytestmark = pytest.mark.django_db
+
+
+def _perm(codename):
+    return Permission.objects.get(content_type__app_label="results", codename=codename)
+
+
+@pytest.fixture
+def judges():
+    group = Group.objects.create(name="Судьи")
+    group.permissions.add(_perm("view_event"))
+    return group
+
+
+@pytest.fixture
+def judge(client, django_user_model, judges):
+    user = django_user_model.objects.create_user("judge", password="pw")
+    user.groups.add(judges)
+    client.force_login(user)
+    return user
+
+
+def _get(client, url):
+    with CaptureQueriesContext(connection) as ctx:
+        resp = client.get(url)
+    sql = [q["sql"] for q in ctx.captured_queries]
+    return resp, sql
+
+
+def _tables(sql, *names):
+    return [q for q in sql if any(f'"{name}"' in q for name in names)]
+
+
+def test_permissions_and_session_come_from_cache(client, judge):
+    Event.objects.create(name="Кубок", date="2025-01-01")
+    url = reverse("event_list")
+
+    first, _ = _get(client, url)
+    second, sql = _get(client, url)
+
+    assert first.status_code == second.status_code == 200
+    assert _tables(sql, "auth_permission", "auth_group") == []
+    assert _tables(sql, "django_session") == []
+
+
+def test_group_permission_change_applies_on_next_request(client, judge, judges):
+    url = reverse("event_create")
+    assert client.get(url).status_code == 403
+
+    judges.permissions.add(_perm("add_event"))
+
+    assert client.get(url).status_code == 200
+
+
+def test_removing_user_from_group_revokes_cached_permissions(client, judge, judges):
+    url = reverse("event_list")
+    assert client.get(url).status_code == 200
+
+    judge.groups.remove(judges)
+
+    assert client.get(url).status_code == 403
+
+
+def test_direct_user_permission_invalidates_only_that_user(client, judge):
+    url = reverse("event_create")
+    assert client.get(url).status_code == 403
+
+    judge.user_permissions.add(_perm("add_event"))
+
+    assert client.get(url).status_code == 200
+
+
+def test_deleting_group_revokes_permissions(client, judge, judges):
+    url = reverse("event_list")
+    assert client.get(url).status_code == 200
+
+    judges.delete()
+
+    assert client.get(url).status_code == 403
+
+
+def test_demoted_superuser_loses_cached_permissions(django_user_model):
+    boss = django_user_model.objects.create_superuser("boss", password="pw")
+    # суперпользователю ModelBackend отдаёт все права — они и попадают в кэш
+    assert "results.delete_event" in django_user_model.objects.get(pk=boss.pk).get_all_permissions()
+
+    boss.is_superuser = False
+    boss.save()
+
+    assert not django_user_model.objects.get(pk=boss.pk).has_perm("results.delete_event")
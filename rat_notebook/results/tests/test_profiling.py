@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+import pstats
+
+import pytest
+from django.urls import reverse
+
+from results.models import Event
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def profile_dir(settings, tmp_path):
+    settings.PROFILE_DIR = str(tmp_path)
+    return tmp_path
+
+
+def test_staff_gets_report_and_pstats_file(admin_client, profile_dir):
+    ev = Event.objects.create(name="Rat Cup", date="2025-01-01")
+
+    resp = admin_client.get(reverse("event_detail", args=[ev.id]), {"_profile": "tottime"})
+
+    assert resp["Content-Type"].startswith("text/plain")
+    text = resp.content.decode()
+    assert "status 200" in text and "Ordered by: internal time" in text
+    saved = profile_dir / resp["X-Profile-File"]
+    assert "event_detail" in saved.name
+    assert any("compute_final_places" in func for _, _, func in pstats.Stats(str(saved)).stats)
+
+
+def test_flag_is_ignored_for_non_staff(client, django_user_model, profile_dir):
+    client.force_login(django_user_model.objects.create_user("judge", password="pw"))
+
+    resp = client.get(reverse("puppy_list"), {"_profile": "1"})
+
+    assert resp.status_code == 200
+    assert "X-Profile-File" not in resp
+    assert list(profile_dir.iterdir()) == []
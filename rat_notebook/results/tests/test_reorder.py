@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+import json
+from datetime import date, time
+
+import pytest
+from django.urls import reverse
+
+from results.models import Exercise, Puppy, PuppyTrainingExercise, PuppyTrainingSession
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def staff_client(client, django_user_model):
+    user = django_user_model.objects.create_user("trainer", password="pw", is_staff=True)
+    client.force_login(user)
+    return client
+
+
+@pytest.fixture
+def session_with_exercises():
+    """Сессия с пятью упражнениями в порядке создания."""
+    puppy = Puppy.objects.create(pet_name="Хатори", sex="M", birth_date=date(2024, 1, 1))
+    session = PuppyTrainingSession.objects.create(
+        puppy=puppy, date=date(2025, 1, 1), start_time=time(10, 0), end_time=time(11, 0),
+    )
+    rows = []
+    for i in range(5):
+        ex = Exercise.objects.create(name=f"Упражнение {i}")
+        rows.append(PuppyTrainingExercise.objects.create(
+            session=session, exercise=ex, planned_reps=5, actual_reps=3,
+        ))
+    return session, rows
+
+
+def _post(client, session, payload):
+    url = reverse("hattorihanzo_exercises_reorder", args=[session.pk])
+    return client.post(url, data=json.dumps(payload), content_type="application/json")
+
+
+def _positions(session):
+    return list(session.exercises.order_by("position").values_list("id", flat=True))
+
+
+def test_reorder_writes_new_order_and_bumps_version(staff_client, session_with_exercises):
+    session, rows = session_with_exercises
+    new_order = [r.id for r in reversed(rows)]
+
+    resp = _post(staff_client, session, {"ordered_ids": new_order, "version": 0})
+
+    assert resp.status_code == 200
+    assert resp.json() == {"ok": True, "version": 1}
+    assert _positions(session) == new_order
+    session.refresh_from_db()
+    assert session.order_version == 1
+
+
+def test_reorder_query_count_does_not_depend_on_rows(staff_client, session_with_exercises,
+                                                     django_assert_max_num_queries):
+    session, rows = session_with_exercises
+    for i in range(30):
+        ex = Exercise.objects.create(name=f"Ещё {i}")
+        rows.append(PuppyTrainingExercise.objects.create(
+            session=session, exercise=ex, planned_reps=1, actual_reps=1,
+        ))
+    new_order = [r.id for r in reversed(rows)]
+
+    # сессия+пользователь, сессия тренировки, savepoint-ы, токен, CASE — без цикла по строкам
+    with django_assert_max_num_queries(7):
+        resp = _post(staff_client, session, {"ordered_ids": new_order, "version": 0})
+
+    assert resp.status_code == 200
+    assert _positions(session) == new_order
+
+
+def test_reorder_stale_version_is_conflict(staff_client, session_with_exercises):
+    session, rows = session_with_exercises
+    ids = [r.id for r in rows]
+    assert _post(staff_client, session, {"ordered_ids": ids[::-1], "version": 0}).status_code == 200
+
+    # второй клиент всё ещё держит версию 0
+    resp = _post(staff_client, session, {"ordered_ids": ids, "version": 0})
+
+    assert resp.status_code == 409
+    assert resp.json() == {"ok": False, "error": "conflict", "version": 1}
+    assert _positions(session) == ids[::-1]
+
+
+def test_reorder_foreign_ids_roll_back(staff_client, session_with_exercises):
+    session, rows = session_with_exercises
+    other = PuppyTrainingSession.objects.create(
+        puppy=session.puppy, date=date(2025, 1, 2), start_time=time(10, 0), end_time=time(11, 0),
+    )
+    foreign = PuppyTrainingExercise.objects.create(
+        session=other, exercise=rows[0].exercise, planned_reps=1, actual_reps=1,
+    )
+    before = _positions(session)
+
+    resp = _post(staff_client, session, {"ordered_ids": [rows[1].id, foreign.id], "version": 0})
+
+    assert resp.status_code == 400
+    assert resp.json()["error"] == "invalid_ids"
+    assert _positions(session) == before
+    session.refresh_from_db()
+    assert session.order_version == 0
+
+
+@pytest.mark.parametrize("payload", [
+    {"ordered_ids": []},
+    {"ordered_ids": [1, 1]},
+])
+def test_reorder_rejects_bad_id_lists(staff_client, session_with_exercises, payload):
+    session, _ = session_with_exercises
+    assert _post(staff_client, session, payload).status_code == 400
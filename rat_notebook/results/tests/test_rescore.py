@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from results.models import Athlete, DisciplineResult, DisciplineType, Event
+from results.scoring import assign_growth_scores
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def events():
+    long_jump = DisciplineType.objects.create(code="long_jump", verbose="Прыжок в длину")
+    treadmill = DisciplineType.objects.create(code="treadmill", verbose="Дорожка")
+    out = []
+    for n, day in enumerate(["2024-05-01", "2025-05-01"]):
+        ev = Event.objects.create(name=f"Кубок {n}", date=day)
+        ev.disciplines.add(long_jump, treadmill)
+        for i, (cat, champ, jump, run) in enumerate([
+            ("S", False, 400, 30.5), ("S", False, 420, 0), ("S", False, 400, 29.0),
+            ("M", False, None, 31.0), ("L", True, 560, 40.0),
+        ]):
+            a = Athlete.objects.create(event=ev, name=f"Спортсмен {i}", growth_category=cat, is_champion=champ)
+            DisciplineResult.objects.create(athlete=a, discipline=long_jump, result=jump)
+            DisciplineResult.objects.create(athlete=a, discipline=treadmill, result=run)
+        assign_growth_scores(ev)
+        out.append(ev)
+    return out
+
+
+def _points():
+    return dict(DisciplineResult.objects.values_list("id", "points"))
+
+
+def _rescore(*args, **kwargs):
+    out = StringIO()
+    call_command("rescore", *args, workers=1, stdout=out, **kwargs)
+    return out.getvalue()
+
+
+def test_rescore_restores_what_scoring_produces(events, tmp_path):
+    expected = _points()
+    DisciplineResult.objects.update(points=999)
+
+    text = _rescore(state=str(tmp_path / "state.json"))
+
+    assert _points() == expected
+    assert f"Изменено результатов: {len(expected)}" in text
+    assert not (tmp_path / "state.json").exists()
+
+
+def test_dry_run_reports_diff_and_writes_nothing(events, tmp_path):
+    DisciplineResult.objects.filter(athlete__name="Спортсмен 1", discipline__code="long_jump").update(points=3)
+
+    text = _rescore(dry_run=True, state=str(tmp_path / "state.json"))
+
+    assert "Спортсмен 1 / long_jump: 3 -> 25" in text
+    assert "Будет изменено результатов: 2" in text
+    assert set(DisciplineResult.objects.filter(points=3).values_list("athlete__name", flat=True)) == {"Спортсмен 1"}
+
+
+def test_filters_and_resume(events, tmp_path):
+    old, new = events
+    state = tmp_path / "state.json"
+    DisciplineResult.objects.update(points=999)
+
+    _rescore(since="2025-01-01", state=str(state))
+    assert not DisciplineResult.objects.filter(athlete__event=new, points=999).exists()
+    assert DisciplineResult.objects.filter(athlete__event=old, points=999).count() == 10
+
+    # прерванный прошлый запуск успел обработать old — его пропускаем
+    state.write_text(json.dumps({"done": [old.id]}))
+    text = _rescore(resume=True, state=str(state))
+    assert "пропущено: 1" in text
+    assert DisciplineResult.objects.filter(athlete__event=old, points=999).count() == 10
+
+    _rescore(event=[old.id], state=str(state))
+    assert not DisciplineResult.objects.filter(points=999).exists()
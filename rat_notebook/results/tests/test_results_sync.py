@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+import json
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from results.models import Athlete, DisciplineResult, DisciplineType, Event, ResultJournalEntry, ResultSyncEntry
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def event():
+    ev = Event.objects.create(name="Кубок", date="2025-01-01")
+    ev.disciplines.add(
+        DisciplineType.objects.create(code="long_jump", verbose="Прыжок в длину"),
+        DisciplineType.objects.create(code="wall_jump", verbose="Стена"),
+    )
+    for i in range(3):
+        Athlete.objects.create(event=ev, name=f"Спортсмен {i}", growth_category="L")
+    Athlete.objects.create(event=ev, name="Чемпион", growth_category="L", is_champion=True)
+    return ev
+
+
+@pytest.fixture
+def ids(event):
+    athletes = dict(event.athletes.values_list("name", "id"))
+    disciplines = dict(event.disciplines.values_list("code", "id"))
+    return athletes, disciplines
+
+
+def _sync(client, event, entries):
+    return client.post(reverse("event_results_sync", args=[event.id]),
+                       data=json.dumps({"entries": entries}), content_type="application/json")
+
+
+def _entry(ids, client_id, name, code, result, **extra):
+    athletes, disciplines = ids
+    return {"id": client_id, "athlete": athletes[name], "discipline": disciplines[code], "result": result, **extra}
+
+
+def _points(event):
+    return dict(DisciplineResult.objects.filter(athlete__event=event)
+                .values_list("athlete__name", "points"))
+
+
+def test_batch_upserts_and_rescores_once(admin_client, event, ids):
+    entries = [_entry(ids, f"c{i}", f"Спортсмен {i}", "long_jump", 500 + i * 20) for i in range(3)]
+    entries.append(_entry(ids, "champ", "Чемпион", "long_jump", 560))
+
+    resp = _sync(admin_client, event, entries)
+
+    assert resp.status_code == 200
+    body = resp.json()
+    assert [r["status"] for r in body["results"]] == ["created"] * 4
+    assert all(r["result_id"] and r["version"] == 0 for r in body["results"])
+    assert _points(event) == {"Спортсмен 0": 15, "Спортсмен 1": 20, "Спортсмен 2": 25, "Чемпион": 13}
+    assert ResultJournalEntry.objects.filter(event_id=event.id, kind="result", op="create").count() == 4
+
+
+def test_replayed_batch_is_a_no_op(admin_client, event, ids):
+    entries = [_entry(ids, "a", "Спортсмен 0", "long_jump", 500),
+               _entry(ids, "b", "Спортсмен 0", "long_jump", 510)]
+    first = _sync(admin_client, event, entries).json()["results"]
+    journal = ResultJournalEntry.objects.count()
+
+    again = _sync(admin_client, event, entries).json()["results"]
+
+    assert [r["status"] for r in first] == ["created", "created"]
+    assert [r["status"] for r in again] == ["duplicate", "duplicate"]
+    assert again[0]["result_id"] == first[0]["result_id"]
+    assert DisciplineResult.objects.get().result == 510
+    assert ResultJournalEntry.objects.count() == journal
+
+
+def test_updates_bump_version_and_honour_client_version(admin_client, event, ids):
+    athlete = Athlete.objects.get(name="Спортсмен 0")
+    r = DisciplineResult.objects.create(athlete=athlete, discipline_id=ids[1]["long_jump"], result=500)
+
+    body = _sync(admin_client, event, [
+        _entry(ids, "same", "Спортсмен 0", "long_jump", 500),
+        _entry(ids, "stale", "Спортсмен 0", "long_jump", 700, version=5),
+        _entry(ids, "fresh", "Спортсмен 0", "long_jump", 520, version=0),
+    ]).json()["results"]
+
+    assert [x["status"] for x in body] == ["unchanged", "conflict", "updated"]
+    assert body[1]["result"] == 500
+    r.refresh_from_db()
+    assert (r.result, r.version) == (520, 1)
+    update = ResultJournalEntry.objects.get(op="update", object_id=r.pk)
+    assert (update.old["result"], update.new["result"]) == (500, 520)
+
+
+def test_versioned_entry_for_pair_created_in_same_batch(admin_client, event, ids):
+    resp = _sync(admin_client, event, [
+        _entry(ids, "c1", "Спортсмен 0", "long_jump", 500),
+        _entry(ids, "c2", "Спортсмен 0", "long_jump", 510, version=3),
+    ])
+
+    assert resp.status_code == 200
+    first, second = resp.json()["results"]
+    assert first["status"] == "created"
+    assert (second["status"], second["result"], second["version"]) == ("conflict", 500, 0)
+    assert second["result_id"] == first["result_id"] == DisciplineResult.objects.get().pk
+
+
+def test_invalid_entries_are_reported_without_blocking_the_batch(admin_client, event, ids):
+    other = Event.objects.create(name="Другое", date="2025-02-01")
+    stranger = Athlete.objects.create(event=other, name="Чужой", growth_category="L")
+
+    body = _sync(admin_client, event, [
+        {"id": "x1", "athlete": stranger.id, "discipline": ids[1]["long_jump"], "result": 500},
+        _entry(ids, "x2", "Спортсмен 0", "long_jump", 505),
+        {"id": "x3", "athlete": "?", "discipline": ids[1]["long_jump"]},
+        "мусор",
+        _entry(ids, "x5", "Спортсмен 1", "wall_jump", 300),
+    ]).json()["results"]
+
+    assert [x["status"] for x in body] == ["invalid", "invalid", "invalid", "invalid", "created"]
+    assert "кратен 10" in body[1]["error"]
+    assert DisciplineResult.objects.count() == 1
+    assert set(ResultSyncEntry.objects.values_list("client_id", flat=True)) == {"x5"}
+
+
+def test_query_count_does_not_grow_with_batch(admin_client, event, ids):
+    names = [f"Спортсмен {i}" for i in range(3)]
+    _sync(admin_client, event, [_entry(ids, "warm", "Чемпион", "wall_jump", 350)])
+
+    with CaptureQueriesContext(connection) as small:
+        _sync(admin_client, event, [_entry(ids, "s0", names[0], "long_jump", 500)])
+    with CaptureQueriesContext(connection) as big:
+        resp = _sync(admin_client, event, [_entry(ids, f"b{n}{c}", name, c, 600 if c == "long_jump" else 300)
+                                           for n, name in enumerate(names[1:]) for c in ("long_jump", "wall_jump")]
+                     + [_entry(ids, "s1", names[0], "long_jump", 520)])
+
+    assert resp.status_code == 200
+    assert DisciplineResult.objects.count() == 6
+    # + один UPDATE пачкой для изменённой строки
+    assert len(big) == len(small) + 1
+
+
+def test_bad_requests(admin_client, client, django_user_model, event):
+    url = reverse("event_results_sync", args=[event.id])
+    assert admin_client.post(url, data="{", content_type="application/json").status_code == 400
+    assert _sync(admin_client, event, [{}] * 201).status_code == 400
+    assert admin_client.get(url).status_code == 405
+
+    client.force_login(django_user_model.objects.create_user("viewer", password="pw"))
+    assert _sync(client, event, []).status_code == 403
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+from datetime import date, time
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+
+from results.models import Exercise, Puppy, PuppyExerciseRollup, PuppyTrainingExercise, PuppyTrainingSession
+
+pytestmark = pytest.mark.django_db
+
+DAY, WEEK = PuppyExerciseRollup.PERIOD_DAY, PuppyExerciseRollup.PERIOD_WEEK
+
+
+@pytest.fixture
+def puppy():
+    return Puppy.objects.create(pet_name="Хатори", sex="M", birth_date=date(2024, 1, 1))
+
+
+@pytest.fixture
+def sit():
+    return Exercise.objects.create(name="Сидеть")
+
+
+def _session(puppy, day):
+    return PuppyTrainingSession.objects.create(puppy=puppy, date=day, start_time=time(10), end_time=time(11))
+
+
+def _rollups(period):
+    return {
+        (r.exercise_id, r.period_start): (r.sessions, r.entries, r.planned_reps, r.actual_reps, r.success_rate)
+        for r in PuppyExerciseRollup.objects.filter(period=period)
+    }
+
+
+def test_rollups_follow_saves_and_deletes(puppy, sit):
+    # 2025-01-13 — понедельник
+    mon = _session(puppy, date(2025, 1, 13))
+    wed = _session(puppy, date(2025, 1, 15))
+    a = PuppyTrainingExercise.objects.create(session=mon, exercise=sit, planned_reps=10, actual_reps=5)
+    PuppyTrainingExercise.objects.create(session=wed, exercise=sit, planned_reps=10, actual_reps=10)
+
+    assert _rollups(DAY) == {
+        (sit.id, date(2025, 1, 13)): (1, 1, 10, 5, 0.5),
+        (sit.id, date(2025, 1, 15)): (1, 1, 10, 10, 1.0),
+    }
+    assert _rollups(WEEK) == {(sit.id, date(2025, 1, 13)): (2, 2, 20, 15, 0.75)}
+
+    a.actual_reps = 10
+    a.save()
+    assert _rollups(WEEK)[(sit.id, date(2025, 1, 13))] == (2, 2, 20, 20, 1.0)
+
+    wed.delete()
+    assert _rollups(DAY) == {(sit.id, date(2025, 1, 13)): (1, 1, 10, 10, 1.0)}
+    assert _rollups(WEEK) == {(sit.id, date(2025, 1, 13)): (1, 1, 10, 10, 1.0)}
+
+
+def test_moving_session_moves_rollups(puppy, sit):
+    s = _session(puppy, date(2025, 1, 13))
+    PuppyTrainingExercise.objects.create(session=s, exercise=sit, planned_reps=4, actual_reps=2)
+
+    s.date = date(2025, 1, 20)
+    s.save()
+
+    assert set(_rollups(DAY)) == {(sit.id, date(2025, 1, 20))}
+    assert set(_rollups(WEEK)) == {(sit.id, date(2025, 1, 20))}
+
+
+def test_rebuild_matches_incremental(puppy, sit):
+    down = Exercise.objects.create(name="Лежать")
+    for d in (6, 7, 13, 14, 15):
+        s = _session(puppy, date(2025, 1, d))
+        PuppyTrainingExercise.objects.create(session=s, exercise=sit, planned_reps=d, actual_reps=d // 2)
+        PuppyTrainingExercise.objects.create(session=s, exercise=down, planned_reps=0, actual_reps=0)
+    incremental = (_rollups(DAY), _rollups(WEEK))
+
+    PuppyExerciseRollup.objects.all().delete()
+    call_command("rebuild_rollups")
+
+    assert (_rollups(DAY), _rollups(WEEK)) == incremental
+    assert _rollups(WEEK)[(down.id, date(2025, 1, 13))][-1] is None
+
+
+def test_progress_endpoint_reads_rollups(client, django_user_model, puppy, sit,
+                                         django_assert_max_num_queries):
+    user = django_user_model.objects.create_user("owner", password="pw")
+    puppy.owner = user
+    puppy.save()
+    client.force_login(user)
+    for d in (6, 13, 20):
+        s = _session(puppy, date(2025, 1, d))
+        PuppyTrainingExercise.objects.create(session=s, exercise=sit, planned_reps=10, actual_reps=d // 2)
+
+    with django_assert_max_num_queries(4):
+        resp = client.get(reverse("puppy_progress", args=[puppy.id]), {"period": "week"})
+
+    data = resp.json()
+    assert data["ok"] and data["period"] == "week"
+    [series] = data["series"]
+    assert series["exercise"] == "Сидеть"
+    assert [(p["start"], p["success_rate"]) for p in series["points"]] == [
+        ("2025-01-06", 0.3), ("2025-01-13", 0.6), ("2025-01-20", 1.0),
+    ]
+    assert client.get(reverse("puppy_progress", args=[puppy.id]), {"period": "year"}).status_code == 400
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+from datetime import date, time
+
+import pytest
+from django.urls import reverse
+
+from results.models import Exercise, Puppy, PuppyTrainingExercise, PuppyTrainingSession
+from results.search import _fts_query, fts_available, search_diary
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def owner(django_user_model):
+    return django_user_model.objects.create_user("owner", password="pw")
+
+
+@pytest.fixture
+def diary(owner, django_user_model):
+    mine = Puppy.objects.create(pet_name="Хатори", sex="M", birth_date=date(2024, 1, 1), owner=owner)
+    other_user = django_user_model.objects.create_user("other", password="pw")
+    theirs = Puppy.objects.create(pet_name="Чужой", sex="F", birth_date=date(2024, 1, 1), owner=other_user)
+    ex = Exercise.objects.create(name="Барьер")
+
+    s1 = PuppyTrainingSession.objects.create(
+        puppy=mine, date=date(2025, 3, 1), start_time=time(10), end_time=time(11),
+        notes="Отлично брал барьеры, но отвлекался на птиц",
+    )
+    e1 = PuppyTrainingExercise.objects.create(
+        session=s1, exercise=ex, planned_reps=5, actual_reps=4,
+        pros="Уверенный прыжок", cons="Сбивал <планку>",
+    )
+    PuppyTrainingSession.objects.create(
+        puppy=theirs, date=date(2025, 3, 2), start_time=time(10), end_time=time(11),
+        notes="Барьер не даётся",
+    )
+    return {"mine": mine, "theirs": theirs, "session": s1, "exercise": e1}
+
+
+def test_sqlite_build_uses_fts5():
+    assert fts_available()
+
+
+def test_query_is_stemmed_and_quoted():
+    assert _fts_query('Барьеры "OR" прыжков') == '"барьер"* "or"* "прыжк"*'
+
+
+def test_search_finds_word_forms_and_is_scoped_by_owner(diary, owner):
+    hits = search_diary("барьер", owner)
+
+    assert [(h["kind"], h["session_id"]) for h in hits] == [("session", diary["session"].id)]
+    assert hits[0]["date"] == date(2025, 3, 1)
+    assert "<mark>барьеры</mark>" in hits[0]["snippet"]
+
+
+def test_staff_sees_all_puppies_unless_filtered(diary, django_user_model):
+    staff = django_user_model.objects.create_user("staff", password="pw", is_staff=True)
+
+    assert {h["puppy_id"] for h in search_diary("барьер", staff)} == {diary["mine"].id, diary["theirs"].id}
+    assert {h["puppy_id"] for h in search_diary("барьер", staff, puppy_id=diary["theirs"].id)} == {diary["theirs"].id}
+
+
+def test_index_follows_edits_and_deletes(diary, owner):
+    ex = diary["exercise"]
+    assert [h["object_id"] for h in search_diary("уверенно", owner)] == [ex.id]
+
+    ex.pros = "Спокойная посадка"
+    ex.save()
+    assert search_diary("уверенно", owner) == []
+
+    diary["session"].delete()
+    assert search_diary("посадка", owner) == []
+    assert search_diary("птицы", owner) == []
+
+
+def test_snippet_escapes_user_text(diary, owner):
+    [hit] = search_diary("сбивал", owner)
+    assert "&lt;планку&gt;" in hit["snippet"]
+
+
+def test_search_page_renders_hits(client, diary, owner):
+    client.force_login(owner)
+    resp = client.get(reverse("diary_search"), {"q": "птицы", "puppy": diary["mine"].id})
+
+    assert resp.status_code == 200
+    assert "<mark>птиц</mark>" in resp.content.decode()
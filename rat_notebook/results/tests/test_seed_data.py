@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from results.forms import VALIDATION_RULES
+from results.models import DisciplineResult, Event, Puppy, PuppyExerciseRollup, PuppyTrainingExercise
+from results.rescoring import audit
+
+pytestmark = pytest.mark.django_db
+
+SMALL = dict(events=6, athletes=12, exercises=25, puppies=2, years=1, batch_size=200, stdout=StringIO())
+
+
+def _snapshot():
+    return (
+        list(DisciplineResult.objects.order_by("id").values_list(
+            "athlete__event__date", "athlete__name", "athlete__growth_category", "discipline__code",
+            "result", "points")),
+        list(PuppyTrainingExercise.objects.order_by("id").values_list(
+            "session__date", "session__start_time", "exercise__name", "planned_reps", "actual_reps", "position")),
+    )
+
+
+def test_seed_is_deterministic_and_consistent():
+    puppies_before = Puppy.objects.count()  # миграции заводят своего щенка
+    call_command("seed_data", seed=7, **SMALL)
+    first = _snapshot()
+
+    assert Event.objects.count() == 6 and Puppy.objects.count() == puppies_before + 2
+    assert first[1] and PuppyExerciseRollup.objects.exists()
+    for code, result in DisciplineResult.objects.values_list("discipline__code", "result"):
+        assert result is None or VALIDATION_RULES[code]["min"] <= result <= VALIDATION_RULES[code]["max"]
+    # очки, посчитанные при генерации, совпадают с пересчётом
+    assert not any(changes for _, _, changes in audit())
+
+    Event.objects.all().delete()
+    Puppy.objects.all().delete()
+    call_command("seed_data", seed=7, **SMALL)
+
+    assert _snapshot() == first
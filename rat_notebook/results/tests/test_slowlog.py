@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+
+from results.models import Event
+from results.slowlog import fingerprint, group_queries, read_records
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def slow_log(settings, tmp_path):
+    settings.SLOW_REQUEST_THRESHOLD_MS = 0.001  # пишем всё
+    settings.SLOW_REQUEST_LOG = str(tmp_path / "slow.log")
+    return tmp_path / "slow.log"
+
+
+def test_fingerprint_strips_literals_and_in_lists():
+    a = fingerprint('SELECT * FROM "t" WHERE "id" IN (%s, %s, %s) AND "name" = \'Тыква\' LIMIT 21')
+    b = fingerprint('SELECT *   FROM "t" WHERE "id" IN (%s) AND "name" = \'Кока\' LIMIT 21')
+
+    assert a == b == 'SELECT * FROM "t" WHERE "id" IN (...) AND "name" = ? LIMIT ?'
+
+
+def test_group_queries_counts_repeats():
+    rows = group_queries([
+        ('SELECT 1 FROM "a" WHERE "id" = %s', 0.001),
+        ('SELECT 1 FROM "a" WHERE "id" = %s', 0.003),
+        ('SELECT 1 FROM "b"', 0.010),
+    ])
+
+    assert [(r["count"], r["ms"]) for r in rows] == [(1, 10.0), (2, 4.0)]
+
+
+def test_slow_request_is_logged_with_sql(admin_client, slow_log):
+    Event.objects.create(name="Rat Cup", date="2025-01-01")
+
+    admin_client.get(reverse("event_list"))
+
+    record = list(read_records(slow_log))[-1]
+    assert record["view"] == "event_list"
+    assert record["user"] == "admin"
+    assert record["db_queries"] == sum(q["count"] for q in record["sql"])
+    assert any('"results_event"' in q["fingerprint"] for q in record["sql"])
+
+
+def test_fast_requests_are_not_logged(admin_client, settings, slow_log):
+    settings.SLOW_REQUEST_THRESHOLD_MS = 60_000
+
+    admin_client.get(reverse("event_list"))
+
+    assert not slow_log.exists() or slow_log.read_text() == ""
+
+
+def test_report_ranks_views_and_fingerprints_by_total_time(tmp_path):
+    log = tmp_path / "slow.log"
+    n_plus_one = 'SELECT * FROM "results_exercise" WHERE "id" = ?'
+    records = [
+        {"view": "puppy_diary", "duration_ms": 900, "db_queries": 40,
+         "sql": [{"fingerprint": n_plus_one, "count": 38, "ms": 700}]},
+        {"view": "event_list", "duration_ms": 300, "db_queries": 3,
+         "sql": [{"fingerprint": 'SELECT * FROM "results_event"', "count": 1, "ms": 5}]},
+    ]
+    # старая запись в ротированной копии тоже учитывается
+    (tmp_path / "slow.log.1").write_text(json.dumps(records[0]) + "\n", encoding="utf-8")
+    log.write_text("\n".join(json.dumps(r) for r in records) + "\nне json\n", encoding="utf-8")
+    out = StringIO()
+
+    call_command("slow_requests", log=str(log), top=5, stdout=out)
+
+    text = out.getvalue()
+    assert text.index("puppy_diary") < text.index("event_list")
+    assert "1800.0" in text  # 2 x 900 мс
+    line = next(l for l in text.splitlines() if n_plus_one in l)
+    assert "76" in line and "38.0" in line
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+import gzip
+
+import pytest
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+from django.urls import reverse
+
+from results.staticfiles import IMMUTABLE, REVALIDATE
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def collected(settings, tmp_path):
+    settings.STATIC_ROOT = str(tmp_path)
+    settings.SERVE_STATIC = True
+    call_command("collectstatic", interactive=False, verbosity=0)
+    return tmp_path
+
+
+def test_collectstatic_writes_hashed_and_precompressed_files(collected):
+    hashed = staticfiles_storage.stored_name("css/styles.css")
+
+    assert hashed != "css/styles.css" and hashed.startswith("css/styles.")
+    original = (collected / hashed).read_bytes()
+    assert gzip.decompress((collected / f"{hashed}.gz").read_bytes()) == original
+    # картинки не сжимаем
+    assert not (collected / staticfiles_storage.stored_name("images/logo.jpg")).with_suffix(".jpg.gz").exists()
+
+
+def test_brotli_variant_when_available(collected):
+    brotli = pytest.importorskip("brotli")
+    hashed = staticfiles_storage.stored_name("css/styles.css")
+
+    assert brotli.decompress((collected / f"{hashed}.br").read_bytes()) == (collected / hashed).read_bytes()
+
+
+def test_pages_link_hashed_assets(client, collected):
+    html = client.get(reverse("login")).content.decode()
+
+    assert staticfiles_storage.url("css/styles.css") in html
+    assert "/static/css/styles.css\"" not in html
+
+
+def test_hashed_asset_is_served_compressed_and_immutable(client, collected):
+    hashed = staticfiles_storage.stored_name("css/styles.css")
+
+    resp = client.get(f"/static/{hashed}", HTTP_ACCEPT_ENCODING="gzip")
+
+    assert resp.status_code == 200
+    assert resp["Content-Encoding"] == "gzip"
+    assert resp["Cache-Control"] == IMMUTABLE
+    assert resp["Content-Type"] == "text/css"
+    assert "Accept-Encoding" in resp["Vary"]
+    assert gzip.decompress(b"".join(resp.streaming_content)) == (collected / hashed).read_bytes()
+
+
+def test_plain_names_and_clients_without_gzip(client, collected):
+    resp = client.get("/static/css/styles.css")
+
+    assert resp.status_code == 200
+    assert not resp.has_header("Content-Encoding")
+    assert resp["Cache-Control"] == REVALIDATE
+
+    again = client.get("/static/css/styles.css", HTTP_IF_MODIFIED_SINCE=resp["Last-Modified"])
+    assert again.status_code == 304
+
+
+def test_path_traversal_is_not_served(client, collected, tmp_path):
+    (tmp_path.parent / "secret.txt").write_text("x")
+
+    assert client.get("/static/../secret.txt").status_code == 404
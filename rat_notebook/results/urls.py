@@ -1,11 +1,13 @@
 from django.urls import path
 
 from .views import (
-    event_list, event_detail, edit_result, delete_result, event_create, event_edit,
-    login_view, custom_logout, dashboard,
+    event_list, event_detail, event_rescore, event_results_sync, event_athlete_search,
+    edit_result, delete_result, event_create, event_edit,
+    login_view, custom_logout, dashboard, metrics_view,
 
     # puppies
-    puppy_list, puppy_create, puppy_edit, puppy_diary,
+    puppy_list, puppy_create, puppy_edit, puppy_diary, puppy_calendar,
+    puppy_progress, diary_search,
     puppy_session_edit, puppy_session_delete,
 
     # legacy
@@ -27,16 +29,23 @@ urlpatterns = [
     path("events/add/", event_create, name="event_create"),
     path("events/<int:event_id>/", event_detail, name="event_detail"),
     path("events/<int:event_id>/edit/", event_edit, name="event_edit"),
-    path("results/<int:result_id>/edit/", edit_result, name="edit_result"),
-    path("results/<int:result_id>/delete/", delete_result, name="delete_result"),
+    path("events/<int:event_id>/rescore/", event_rescore, name="event_rescore"),
+    path("events/<int:event_id>/athletes/search/", event_athlete_search, name="event_athlete_search"),
+    path("events/<int:event_id>/results/sync/", event_results_sync, name="event_results_sync"),
+    path("events/<int:event_id>/results/<int:pk>/edit/", edit_result, name="edit_result"),
+    path("events/<int:event_id>/results/<int:pk>/delete/", delete_result, name="delete_result"),
 
     path("logout/", custom_logout, name="logout"),
+    path("metrics/", metrics_view, name="metrics"),
 
     # --- Puppies ---
     path("puppies/", puppy_list, name="puppy_list"),
     path("puppies/add/", puppy_create, name="puppy_create"),
+    path("puppies/search/", diary_search, name="diary_search"),
     path("puppies/<int:puppy_id>/edit/", puppy_edit, name="puppy_edit"),
     path("puppies/<int:puppy_id>/diary/", puppy_diary, name="puppy_diary"),
+    path("puppies/<int:puppy_id>/calendar/", puppy_calendar, name="puppy_calendar"),
+    path("puppies/<int:puppy_id>/progress/", puppy_progress, name="puppy_progress"),
     path("puppies/<int:puppy_id>/session/<int:pk>/edit/", puppy_session_edit, name="puppy_session_edit"),
     path("puppies/<int:puppy_id>/session/<int:pk>/delete/", puppy_session_delete, name="puppy_session_delete"),
 
@@ -4,22 +4,37 @@ from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.decorators import login_required, permission_required
 from django.contrib.auth import authenticate, login, logout
 from django.views.decorators.http import require_POST, require_GET
-from django.http import HttpResponseForbidden, JsonResponse, HttpResponseRedirect
+from django.http import Http404, HttpResponse, HttpResponseForbidden, JsonResponse, HttpResponseRedirect
 from django.shortcuts import render, redirect, get_object_or_404
 from django.urls import reverse
 from django.db import transaction
+from django.db.models import Case, F, PositiveIntegerField, Q, Value, When
+from django.utils.cache import get_conditional_response, patch_cache_control
 from django.utils.dateparse import parse_date
-from .models import Event, DisciplineResult, PuppyTrainingSession, PuppyTrainingExercise, Exercise, Puppy
+from django.utils.http import http_date, quote_etag
+from .models import Event, Athlete, DisciplineResult, PuppyTrainingSession, PuppyTrainingExercise, Exercise, Puppy, \
+    PuppyExerciseRollup, StaleObjectError
 from .forms import AthleteForm, DisciplineResultForm, EventForm, LoginForm, PuppyTrainingSessionForm, \
     PuppyTrainingExerciseCreateFormSet, PuppyTrainingExerciseEditFormSet, ExerciseForm, PuppyForm
-from .scoring import assign_growth_scores, compute_final_places
+from .scoring import compute_final_places
+from .diary import CALENDAR_VIEWS, calendar_range, calendar_weeks, day_totals, shift_anchor
+from .rollups import progress_series
+from .search import search_diary
+from .pagination import keyset_page
+from .perf import span
+from .metrics import exposition, record_cache
+from . import jobs
+from .sync import SyncError, sync_results
 
 
 @login_required
 @permission_required('results.view_event', raise_exception=True)
 def event_list(request):
-    events = Event.objects.order_by('-date')
-    return render(request, 'results/event_list.html', {'events': events})
+    page = keyset_page(
+        Event.objects.all(), ['-date', '-id'],
+        after=request.GET.get('after'), before=request.GET.get('before'),
+    )
+    return render(request, 'results/event_list.html', {'events': page.rows, 'page': page})
 
 
 @login_required
@@ -85,8 +100,8 @@ def event_detail(request, event_id):
     else:
         r_form = DisciplineResultForm(prefix='res', event=event)
 
-    # Пересчёт очков по снарядам (идемпотентен)
-    assign_growth_scores(event)
+    # Очки пересчитывает воркер (results/jobs.py): правки результатов ставят задачу
+    rescore_pending = jobs.is_pending('rescore_event', event_id=event.id)
 
     # Готовим таблицы мест по competition внутри ростовых/породных групп
     standings = compute_final_places(event, include_champions=False)
@@ -98,12 +113,9 @@ def event_detail(request, event_id):
         event.athletes.filter(is_champion=True)
         .prefetch_related("results", "results__discipline")
     )
-    if champs_qs.exists():
-        champs = []
-        for a in champs_qs:
-            total = sum(int(r.points or 0) for r in a.results.all())
-            champs.append((a, total))
-
+    with span("event_detail.champions"):
+        champs = [(a, sum(int(r.points or 0) for r in a.results.all())) for a in champs_qs]
+    if champs:
         champs.sort(key=lambda p: (p[1], p[0].name), reverse=True)
 
         last = None
@@ -136,13 +148,80 @@ def event_detail(request, event_id):
     if active_group not in category_rankings:
         active_group = next(iter(category_rankings), None)
 
-    return render(request, "results/event_detail.html", {
-        "event": event,
-        "athlete_form": a_form,
-        "result_form": r_form,
-        "category_rankings": category_rankings,
-        "active_group": active_group,
-    })
+    with span("render"):
+        return render(request, "results/event_detail.html", {
+            "event": event,
+            "athlete_form": a_form,
+            "result_form": r_form,
+            "category_rankings": category_rankings,
+            "active_group": active_group,
+            "rescore_pending": rescore_pending,
+        })
+
+
+@login_required
+@permission_required('results.change_event', raise_exception=True)
+@require_POST
+def event_rescore(request, event_id):
+    """Ставит пересчёт очков события в очередь и сразу отвечает."""
+    event = get_object_or_404(Event, pk=event_id)
+    queued = jobs.enqueue_rescore(event.id)
+    if request.headers.get('x-requested-with') == 'XMLHttpRequest':
+        return JsonResponse({'queued': queued}, status=202)
+    return redirect('event_detail', event_id=event.id)
+
+
+@login_required
+@permission_required(['results.add_disciplineresult', 'results.change_disciplineresult'], raise_exception=True)
+@require_POST
+def event_results_sync(request, event_id):
+    """
+    Приём пачки записей офлайн-судейства (static/js/judge.js): JSON
+    {"entries": [{"id", "athlete", "discipline", "result", "version"?}, ...]}.
+    Идемпотентно по id записи, см. results/sync.py.
+    """
+    event = get_object_or_404(Event, pk=event_id)
+    try:
+        payload = json.loads(request.body)
+    except ValueError:
+        return JsonResponse({'error': 'Ожидается JSON'}, status=400)
+    entries = payload.get('entries') if isinstance(payload, dict) else None
+    try:
+        return JsonResponse(sync_results(event, entries))
+    except SyncError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+
+ATHLETE_SEARCH_LIMIT = 20
+
+
+@login_required
+@permission_required('results.view_event', raise_exception=True)
+@require_GET
+def event_athlete_search(request, event_id):
+    """
+    Подсказки для ввода результата: спортсмены события по началу имени
+    (или началу любого слова в имени). ?q=<префикс>&group=<код группы или C>
+    Фильтр по событию и сортировка по имени идут по индексу (event, name)
+    из unique_together.
+    """
+    q = (request.GET.get('q') or '').strip()
+    qs = Athlete.objects.filter(event_id=event_id)
+
+    group = request.GET.get('group')
+    if group == 'C':
+        qs = qs.filter(is_champion=True)
+    elif group:
+        qs = qs.filter(is_champion=False, growth_category=group)
+
+    if q:
+        qs = qs.filter(Q(name__istartswith=q) | Q(name__icontains=f' {q}'))
+
+    rows = list(
+        qs.order_by('name')
+        .values('id', 'name', 'growth_category', 'is_champion')[:ATHLETE_SEARCH_LIMIT]
+    )
+    return JsonResponse({'results': rows})
 
 
 @login_required
@@ -163,7 +242,11 @@ def edit_result(request, event_id, pk):
             # серверная защита: не позволяем сменить спортсмена/дисциплину
             obj.athlete_id = r.athlete_id
             obj.discipline_id = r.discipline_id
-            obj.save()
+            try:
+                obj.save()
+            except StaleObjectError:
+                # другой судья сохранил раньше — показываем актуальное значение, ничего не перетираем
+                return _result_conflict(request, event, pk, form.cleaned_data['result'])
             url = reverse('event_detail', args=[event.id])
             return redirect(f"{url}?group={group_param}#pane-{group_param}")
     else:
@@ -175,6 +258,21 @@ def edit_result(request, event_id, pk):
     return render(request, 'results/edit_result.html', {'event': event, 'form': form})
 
 
+def _result_conflict(request, event, pk, attempted):
+    current = DisciplineResult.objects.select_related('athlete', 'discipline').filter(pk=pk).first()
+    if current is None:
+        raise Http404('Результат уже удалён другим судьёй')
+    form = DisciplineResultForm(instance=current, event=event)
+    form.fields['athlete'].disabled = True
+    form.fields['discipline'].disabled = True
+    conflict = (f'Пока вы редактировали, результат изменил другой судья: сейчас {current.result:g}, '
+                f'вы вводили {attempted:g}. Проверьте значение и сохраните ещё раз.'
+                if current.result is not None and attempted is not None else
+                'Пока вы редактировали, результат изменил другой судья. Проверьте значение и сохраните ещё раз.')
+    return render(request, 'results/edit_result.html', {'event': event, 'form': form, 'conflict': conflict},
+                  status=409)
+
+
 @login_required
 @permission_required('results.delete_disciplineresult', raise_exception=True)  # <—
 def delete_result(request, event_id, pk):
@@ -255,7 +353,17 @@ def puppy_list(request):
     qs = Puppy.objects.all()
     if not request.user.is_staff:
         qs = qs.filter(owner=request.user)
-    return render(request, "results/puppy_list.html", {"puppies": qs})
+    page = keyset_page(
+        qs, ["pet_name", "id"],
+        after=request.GET.get("after"), before=request.GET.get("before"),
+    )
+
+    # возраст считаем один раз на страницу от одной даты
+    today = dt_date.today()
+    for p in page.rows:
+        p.age = p.age_display_on(today)
+
+    return render(request, "results/puppy_list.html", {"puppies": page.rows, "page": page})
 
 
 def get_puppy_for_user_or_404(request, puppy_id: int):
@@ -323,12 +431,89 @@ def puppy_diary(request, puppy_id: int):
         .order_by("start_time", "id")
     )
 
-    return render(request, "results/puppy_diary.html", {
+    with span("render"):
+        return render(request, "results/puppy_diary.html", {
+            "puppy": puppy,
+            "selected_date": selected_date,
+            "session_form": session_form,
+            "formset": formset,
+            "sessions": sessions,
+        })
+
+
+@login_required
+def puppy_calendar(request, puppy_id: int):
+    """
+    Обзор дневника за неделю/месяц: по каждому дню — число тренировок,
+    план/факт повторений и длительность. Вся сводка — один GROUP BY запрос.
+    """
+    puppy = get_puppy_for_user_or_404(request, puppy_id)
+    view = request.GET.get("view")
+    if view not in CALENDAR_VIEWS:
+        view = "month"
+    anchor = parse_date(request.GET.get("date") or "") or dt_date.today()
+
+    start, end = calendar_range(view, anchor)
+    totals = day_totals(puppy, start, end)
+
+    return render(request, "results/puppy_calendar.html", {
         "puppy": puppy,
-        "selected_date": selected_date,
-        "session_form": session_form,
-        "formset": formset,
-        "sessions": sessions,
+        "view": view,
+        "anchor": anchor,
+        "start": start,
+        "end": end,
+        "weeks": calendar_weeks(view, anchor, totals),
+        "prev_date": shift_anchor(view, anchor, -1),
+        "next_date": shift_anchor(view, anchor, 1),
+        "today": dt_date.today(),
+    })
+
+
+@login_required
+@require_GET
+def puppy_progress(request, puppy_id: int):
+    """
+    JSON для графика прогресса: успешность (факт/план) по упражнениям
+    по дням или неделям. Читает только предрасчитанные сводки.
+    ?period=week|day&exercise=<id>
+    """
+    puppy = get_puppy_for_user_or_404(request, puppy_id)
+    period = request.GET.get("period") or PuppyExerciseRollup.PERIOD_WEEK
+    if period not in dict(PuppyExerciseRollup.PERIOD_CHOICES):
+        return JsonResponse({"ok": False, "error": "bad_period"}, status=400)
+    try:
+        exercise_id = int(request.GET["exercise"]) if request.GET.get("exercise") else None
+    except ValueError:
+        return JsonResponse({"ok": False, "error": "bad_exercise"}, status=400)
+
+    return JsonResponse({
+        "ok": True,
+        "period": period,
+        "series": progress_series(puppy, period, exercise_id),
+    })
+
+
+@login_required
+@require_GET
+def diary_search(request):
+    """
+    Поиск по заметкам, плюсам и минусам в дневниках доступных щенков.
+    ?q=<текст>&puppy=<id> — puppy необязателен.
+    """
+    q = (request.GET.get("q") or "").strip()
+    puppy = None
+    if request.GET.get("puppy"):
+        try:
+            puppy = get_puppy_for_user_or_404(request, int(request.GET["puppy"]))
+        except ValueError:
+            puppy = None
+
+    hits = search_diary(q, request.user, puppy_id=puppy.id if puppy else None) if q else []
+
+    return render(request, "results/diary_search.html", {
+        "q": q,
+        "puppy": puppy,
+        "hits": hits,
     })
 
 
@@ -341,8 +526,10 @@ def puppy_session_edit(request, puppy_id: int, pk: int):
         formset = PuppyTrainingExerciseEditFormSet(request.POST, instance=session)
 
         if session_form.is_valid() and formset.is_valid():
-            session_form.save()
-            formset.save()
+            try:
+                _save_session_forms(session_form, formset)
+            except StaleObjectError:
+                return _session_conflict(request, "results/puppy_session_edit.html", session.pk, {"puppy": puppy})
             return redirect(f"{reverse('puppy_diary', args=[puppy.id])}?date={session.date.isoformat()}")
     else:
         session_form = PuppyTrainingSessionForm(instance=session)
@@ -356,6 +543,26 @@ def puppy_session_edit(request, puppy_id: int, pk: int):
     })
 
 
+def _save_session_forms(session_form, formset):
+    # тренировка и упражнения — одной транзакцией: при конфликте версий не остаётся половины правок
+    with transaction.atomic():
+        session_form.save()
+        formset.save()
+
+
+def _session_conflict(request, template, pk, context):
+    session = PuppyTrainingSession.objects.filter(pk=pk).first()
+    if session is None:
+        raise Http404("Тренировка уже удалена")
+    return render(request, template, {
+        **context,
+        "session": session,
+        "session_form": PuppyTrainingSessionForm(instance=session),
+        "formset": PuppyTrainingExerciseEditFormSet(instance=session),
+        "conflict": "Тренировку уже сохранили в другом окне. Ниже — актуальные данные; внесите правки заново.",
+    }, status=409)
+
+
 def puppy_session_delete(request, puppy_id: int, pk: int):
     puppy = get_puppy_for_user_or_404(request, puppy_id)  # ✅ было get_object_or_404
     session = get_object_or_404(PuppyTrainingSession, pk=pk, puppy=puppy)
@@ -389,8 +596,10 @@ def hattorihanzo_session_edit(request, pk: int):
         formset = PuppyTrainingExerciseEditFormSet(request.POST, instance=session)
 
         if session_form.is_valid() and formset.is_valid():
-            session_form.save()
-            formset.save()
+            try:
+                _save_session_forms(session_form, formset)
+            except StaleObjectError:
+                return _session_conflict(request, "results/hattorihanzo_session_edit.html", session.pk, {})
             return redirect(f"/hattorihanzo?date={session.date.isoformat()}")
     else:
         session_form = PuppyTrainingSessionForm(instance=session)
@@ -437,7 +646,12 @@ def hattorihanzo_exercise_delete(request, pk: int):
 def hattorihanzo_exercises_reorder(request, pk: int):
     """
     pk = id сессии
-    body: {"ordered_ids":[12, 15, 9]}
+    body: {"ordered_ids":[12, 15, 9], "version": 3}
+
+    Порядок пишется одним UPDATE ... CASE, поэтому число запросов не зависит
+    от количества упражнений. version — токен order_version, который клиент
+    получил со страницей (или из прошлого ответа); если кто-то успел
+    переставить упражнения раньше, отвечаем 409 и не перетираем чужой порядок.
     """
     session = get_object_or_404(PuppyTrainingSession, pk=pk)
 
@@ -445,22 +659,44 @@ def hattorihanzo_exercises_reorder(request, pk: int):
         payload = json.loads(request.body.decode("utf-8"))
         ordered_ids = payload.get("ordered_ids", [])
         ordered_ids = [int(x) for x in ordered_ids]
+        version = payload.get("version")
+        version = int(version) if version is not None else None
     except Exception:
         return JsonResponse({"ok": False, "error": "bad_json"}, status=400)
 
-    # проверяем что это упражнения именно этой сессии
-    existing_ids = set(
-        PuppyTrainingExercise.objects.filter(session=session).values_list("id", flat=True)
-    )
-    if not ordered_ids or any(x not in existing_ids for x in ordered_ids):
+    if not ordered_ids or len(set(ordered_ids)) != len(ordered_ids):
         return JsonResponse({"ok": False, "error": "invalid_ids"}, status=400)
 
-    # Обновляем позиции 1..N в новом порядке
     with transaction.atomic():
-        for pos, ex_id in enumerate(ordered_ids, start=1):
-            PuppyTrainingExercise.objects.filter(id=ex_id, session=session).update(position=pos)
-
-    return JsonResponse({"ok": True})
+        # 1) сдвигаем токен — условие по версии прямо в WHERE
+        sessions = PuppyTrainingSession.objects.filter(pk=session.pk)
+        if version is not None:
+            sessions = sessions.filter(order_version=version)
+        if not sessions.update(order_version=F("order_version") + 1):
+            current = (
+                PuppyTrainingSession.objects
+                .filter(pk=session.pk)
+                .values_list("order_version", flat=True)
+                .first()
+            )
+            return JsonResponse({"ok": False, "error": "conflict", "version": current}, status=409)
+
+        # 2) позиции 1..N одним запросом; чужие id просто не попадут под фильтр
+        updated = (
+            PuppyTrainingExercise.objects
+            .filter(session=session, id__in=ordered_ids)
+            .update(position=Case(
+                *[When(id=ex_id, then=Value(pos)) for pos, ex_id in enumerate(ordered_ids, start=1)],
+                output_field=PositiveIntegerField(),
+            ))
+        )
+        if updated != len(ordered_ids):
+            # есть упражнения не из этой сессии — откатываем и токен, и позиции
+            transaction.set_rollback(True)
+            return JsonResponse({"ok": False, "error": "invalid_ids"}, status=400)
+
+    new_version = version + 1 if version is not None else session.order_version + 1
+    return JsonResponse({"ok": True, "version": new_version})
 
 
 @login_required
@@ -486,11 +722,39 @@ def exercise_create(request):
     })
 
 
+EXERCISE_JSON_MAX_AGE = 60  # секунд: повторный выбор того же упражнения браузер берёт из своего кэша
+
+
+def _exercise_json(request, pk: int, field: str):
+    """
+    JSON с одним полем упражнения и валидаторами из версии строки.
+
+    Версия, updated_at и само поле читаются одним запросом; если ETag
+    (If-None-Match) или Last-Modified (If-Modified-Since) совпали — 304 без тела.
+    Cache-Control: private — ответ только для браузера этого тренера.
+    """
+    row = Exercise.objects.filter(pk=pk).values_list("version", "updated_at", field).first()
+    if row is None:
+        raise Http404("Упражнение не найдено")
+    version, updated_at, value = row
+
+    etag = quote_etag(f"ex{pk}-v{version}")
+    last_modified = int(updated_at.timestamp())
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    record_cache("exercise_json", hit=response is not None)
+    if response is None:
+        response = JsonResponse({field: value if value is not None else ""})
+    # 304 тоже несёт валидаторы и Cache-Control — браузер продлевает свою копию
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(last_modified)
+    patch_cache_control(response, private=True, max_age=EXERCISE_JSON_MAX_AGE)
+    return response
+
+
 @staff_member_required
 @require_GET
 def exercise_default_reps(request, pk: int):
-    ex = get_object_or_404(Exercise, pk=pk)
-    return JsonResponse({"default_reps": ex.default_reps})
+    return _exercise_json(request, pk, "default_reps")
 
 
 from django.contrib.auth.decorators import login_required
@@ -502,6 +766,13 @@ def dashboard(request):
     return render(request, "dashboard.html")
 
 
+@require_GET
 def exercise_description(request, pk: int):
-    ex = get_object_or_404(Exercise, pk=pk)
-    return JsonResponse({"description": ex.description or ""})
+    return _exercise_json(request, pk, "description")
+
+
+@staff_member_required
+@require_GET
+def metrics_view(request):
+    """Метрики всех воркеров в формате Prometheus (см. results/metrics.py)."""
+    return HttpResponse(exposition(), content_type="text/plain; version=0.0.4; charset=utf-8")
@@ -0,0 +1,392 @@
+// Дневник тренировок: общий код страниц дневника и редактирования тренировки
+// (Хатори и щенки). Подключается после bootstrap.bundle из base.html.
+//
+// Настройки — data-атрибуты в разметке, URL в скрипт не зашиты:
+//   form[data-diary-form]         data-default-reps-url — «/…/exercises/0/default-reps/», 0 заменяется на id
+//                                 data-reorder-url      — только на странице редактирования
+//   #reorder-status               data-order-version    — токен порядка (409 при чужой перестановке)
+//   #exerciseInfoModal            data-description-url  — «/…/exercises/0/description/»
+(function () {
+  const form = document.querySelector("[data-diary-form]");
+
+  const addBtn = document.getElementById("add-row-btn");
+  const totalForms = document.querySelector('[name$="-TOTAL_FORMS"]');
+  const statusEl = document.getElementById("reorder-status");
+
+  const tableBody = document.getElementById("formset-body-table");
+  const cardsWrap = document.getElementById("formset-cards");
+
+  const tplTable = document.getElementById("row-template-table");
+  const tplCard = document.getElementById("row-template-card");
+
+  function exerciseUrl(template, exId) {
+    return template.replace("/0/", `/${exId}/`);
+  }
+
+  function rowOf(el) {
+    return el.closest("tr.formset-row") || el.closest(".formset-card");
+  }
+
+  function isMobile() {
+    return window.matchMedia("(max-width: 767.98px)").matches;
+  }
+
+  function getCsrf() {
+    const el = document.querySelector('input[name="csrfmiddlewaretoken"]');
+    return el ? el.value : "";
+  }
+
+  function setStatus(text) {
+    if (!statusEl) return;
+    statusEl.textContent = text || "";
+  }
+
+  function setDisabled(rootEl, disabled) {
+    if (!rootEl) return;
+    rootEl.querySelectorAll("input, select, textarea").forEach((el) => {
+      el.disabled = disabled;
+    });
+  }
+
+  // таблица и карточки содержат одни и те же поля — отправляем только видимый вариант
+  function syncLayoutInputs() {
+    if (isMobile()) {
+      setDisabled(tableBody, true);
+      setDisabled(cardsWrap, false);
+    } else {
+      setDisabled(cardsWrap, true);
+      setDisabled(tableBody, false);
+    }
+  }
+
+  function syncInfoButtons(root = document) {
+    root.querySelectorAll(".js-exercise-select").forEach((select) => {
+      const container = rowOf(select);
+      if (!container) return;
+      const infoBtn = container.querySelector(".js-ex-info");
+      if (infoBtn) infoBtn.disabled = !select.value;
+    });
+  }
+
+  // ---------------- строки формсета: добавить / убрать ----------------
+  function addRow() {
+    const index = parseInt(totalForms.value, 10);
+
+    if (isMobile()) {
+      cardsWrap.insertAdjacentHTML("beforeend", tplCard.innerHTML.replaceAll("__prefix__", String(index)));
+    } else {
+      tableBody.insertAdjacentHTML("beforeend", tplTable.innerHTML.replaceAll("__prefix__", String(index)));
+    }
+
+    totalForms.value = index + 1;
+
+    syncLayoutInputs();
+    syncInfoButtons(); // ✅ включить/выключить ℹ️ у новой строки
+  }
+
+  // страница дневника: несохранённая строка, счётчик форм уменьшаем
+  function removeRow(btn) {
+    const row = isMobile() ? btn.closest(".formset-card") : btn.closest("tr.formset-row");
+    if (!row) return;
+    row.remove();
+
+    const currentTotal = parseInt(totalForms.value, 10);
+    if (currentTotal > 0) totalForms.value = currentTotal - 1;
+
+    syncLayoutInputs();
+    syncInfoButtons();
+  }
+
+  // страница редактирования: сохранённое упражнение удаляем сразу на сервере
+  async function deleteSaved(el, url) {
+    const delInput = el.querySelector('input[type="checkbox"][name$="-DELETE"]');
+    if (delInput) delInput.checked = true;
+
+    el.style.display = "none";
+    syncLayoutInputs();
+
+    try {
+      const resp = await fetch(url, {
+        method: "POST",
+        headers: { "X-CSRFToken": getCsrf() },
+      });
+      if (!resp.ok) throw new Error("bad_response");
+
+      await persistOrder();
+    } catch (e) {
+      if (delInput) delInput.checked = false;
+      el.style.display = "";
+      syncLayoutInputs();
+      window.location.reload();
+    }
+  }
+
+  if (addBtn && totalForms && tplTable && tplCard && tableBody && cardsWrap) {
+    addBtn.addEventListener("click", addRow);
+  }
+
+  document.addEventListener("click", (e) => {
+    const btnSaved = e.target.closest(".js-delete-saved");
+    if (btnSaved) {
+      e.preventDefault();
+      const url = btnSaved.getAttribute("data-delete-url");
+      const row = rowOf(btnSaved);
+      if (url && row) deleteSaved(row, url);
+      return;
+    }
+
+    const btnNew = e.target.closest(".js-remove-new");
+    if (btnNew) {
+      e.preventDefault();
+      const row = rowOf(btnNew);
+      if (row) row.remove();
+      syncLayoutInputs();
+      syncInfoButtons();
+      return;
+    }
+
+    const btn = e.target.closest(".js-remove-row");
+    if (btn) {
+      e.preventDefault();
+      removeRow(btn);
+    }
+  });
+
+  // первичная синхронизация + при смене ориентации/ширины
+  syncLayoutInputs();
+  syncInfoButtons();
+
+  window.addEventListener("resize", () => {
+    syncLayoutInputs();
+    syncInfoButtons();
+  });
+
+  // ---------------- auto-fill planned reps + enable info button ----------------
+  const defaultRepsUrl = form ? form.getAttribute("data-default-reps-url") : null;
+
+  document.addEventListener("change", async (e) => {
+    const select = e.target.closest(".js-exercise-select");
+    if (!select) return;
+
+    const container = rowOf(select);
+    if (!container) return;
+
+    const infoBtn = container.querySelector(".js-ex-info");
+    if (infoBtn) infoBtn.disabled = !select.value;
+
+    const exId = select.value;
+    if (!exId || !defaultRepsUrl) return;
+
+    const planned = container.querySelector('input[name$="-planned_reps"]');
+    if (!planned || planned.value) return;
+
+    try {
+      const resp = await fetch(exerciseUrl(defaultRepsUrl, exId), {
+        headers: { "X-Requested-With": "XMLHttpRequest" },
+      });
+      if (!resp.ok) throw new Error("bad_response");
+      const data = await resp.json();
+      if (data.default_reps !== undefined && data.default_reps !== null) {
+        planned.value = String(data.default_reps);
+      }
+    } catch (err) {
+      // молча
+    }
+  });
+
+  // ---------------- reorder (drag & drop) ----------------
+  const reorderUrl = form ? form.getAttribute("data-reorder-url") : null;
+  let dragged = null;
+  let orderVersion = statusEl ? parseInt(statusEl.getAttribute("data-order-version") || "0", 10) : 0;
+
+  function currentSavedIds() {
+    const container = isMobile() ? cardsWrap : tableBody;
+    return Array.from(container.querySelectorAll("[data-ex-id]"))
+      .filter(el => el.style.display !== "none")
+      .map(el => el.getAttribute("data-ex-id"))
+      .filter(Boolean)
+      .map(x => parseInt(x, 10));
+  }
+
+  async function persistOrder() {
+    if (!reorderUrl) return;
+    const ids = currentSavedIds();
+    if (ids.length < 2) return;
+
+    setStatus("Сохраняю порядок…");
+
+    try {
+      const resp = await fetch(reorderUrl, {
+        method: "POST",
+        headers: {
+          "Content-Type": "application/json",
+          "X-CSRFToken": getCsrf(),
+        },
+        body: JSON.stringify({ ordered_ids: ids, version: orderVersion }),
+      });
+      if (resp.status === 409) {
+        // порядок успел поменяться в другой вкладке/у другого тренера
+        setStatus("Порядок изменён в другом окне — обновите страницу");
+        return;
+      }
+      if (!resp.ok) throw new Error("bad_response");
+      const data = await resp.json();
+      if (data.version !== undefined && data.version !== null) orderVersion = data.version;
+      setStatus("Порядок сохранён");
+      setTimeout(() => setStatus(""), 1200);
+    } catch (e) {
+      setStatus("Ошибка сохранения порядка");
+      setTimeout(() => setStatus(""), 2000);
+    }
+  }
+
+  function onDragStart(e) {
+    const row = rowOf(e.target);
+    if (!row || row.style.display === "none") return;
+    dragged = row;
+    row.classList.add("opacity-50");
+    e.dataTransfer.effectAllowed = "move";
+  }
+
+  function onDragEnd(e) {
+    const row = rowOf(e.target);
+    if (row) row.classList.remove("opacity-50");
+    dragged = null;
+  }
+
+  function onDragOver(e) {
+    e.preventDefault();
+    const container = isMobile() ? cardsWrap : tableBody;
+    const target = rowOf(e.target);
+    if (!container || !container.contains(target)) return;
+    if (!target || !dragged || target === dragged) return;
+    if (target.style.display === "none" || dragged.style.display === "none") return;
+
+    const rect = target.getBoundingClientRect();
+    const isAfter = (e.clientY - rect.top) > rect.height / 2;
+
+    if (isAfter) target.after(dragged);
+    else target.before(dragged);
+  }
+
+  function onDrop(e) {
+    e.preventDefault();
+    persistOrder();
+  }
+
+  if (reorderUrl) {
+    [tableBody, cardsWrap].forEach((container) => {
+      if (!container) return;
+      container.addEventListener("dragstart", onDragStart);
+      container.addEventListener("dragend", onDragEnd);
+      container.addEventListener("dragover", onDragOver);
+      container.addEventListener("drop", onDrop);
+    });
+  }
+
+  // ---------------- mobile clamp expand/collapse (pros/cons) ----------------
+  function isOverflowing(el) {
+    const was = el.classList.contains("hhz-expanded");
+
+    el.classList.remove("hhz-expanded");
+    const clampedH = el.getBoundingClientRect().height;
+
+    el.classList.add("hhz-expanded");
+    const fullH = el.getBoundingClientRect().height;
+
+    if (!was) el.classList.remove("hhz-expanded");
+
+    return fullH > clampedH + 1;
+  }
+
+  function initClampBlocks() {
+    document.querySelectorAll(".js-clamp").forEach((block) => {
+      const lines = parseInt(block.getAttribute("data-clamp-lines") || "3", 10);
+      block.style.setProperty("--hhz-lines", String(lines));
+      block.classList.add("hhz-clamp");
+
+      const btn = block.parentElement.querySelector(".js-toggle-clamp");
+      if (!btn) return;
+
+      if (!block.textContent || block.textContent.trim().length === 0 || !isOverflowing(block)) {
+        btn.style.display = "none";
+        return;
+      }
+      btn.style.display = "inline-block";
+      btn.textContent = "Показать полностью";
+    });
+  }
+
+  document.addEventListener("click", (e) => {
+    const btn = e.target.closest(".js-toggle-clamp");
+    if (!btn) return;
+
+    e.preventDefault();
+    const block = btn.parentElement.querySelector(".js-clamp");
+    if (!block) return;
+
+    const expanded = block.classList.toggle("hhz-expanded");
+    btn.textContent = expanded ? "Свернуть" : "Показать полностью";
+  });
+
+  if (document.querySelector(".js-clamp")) {
+    initClampBlocks();
+    window.addEventListener("resize", initClampBlocks);
+  }
+
+  // ---------------- exercise description modal ----------------
+  const infoModalEl = document.getElementById("exerciseInfoModal");
+  const infoTitleEl = document.getElementById("exerciseInfoTitle");
+  const infoBodyEl = document.getElementById("exerciseInfoBody");
+  const infoModal = infoModalEl ? new bootstrap.Modal(infoModalEl) : null;
+  const descriptionUrl = infoModalEl ? infoModalEl.getAttribute("data-description-url") : null;
+
+  async function openExerciseInfo(exId, exName) {
+    if (!infoModal || !infoTitleEl || !infoBodyEl) return;
+
+    infoTitleEl.textContent = exName || "Упражнение";
+
+    if (!exId) {
+      infoBodyEl.textContent = "Сначала выберите упражнение.";
+      infoModal.show();
+      return;
+    }
+
+    infoBodyEl.textContent = "Загрузка…";
+    infoModal.show();
+
+    try {
+      const resp = await fetch(exerciseUrl(descriptionUrl, exId), {
+        headers: { "X-Requested-With": "XMLHttpRequest" },
+      });
+      if (!resp.ok) throw new Error("bad_response");
+      const data = await resp.json();
+
+      const text = (data.description || "").trim();
+      infoBodyEl.textContent = text ? text : "Описание не задано.";
+    } catch (e) {
+      infoBodyEl.textContent = "Не удалось загрузить описание.";
+    }
+  }
+
+  document.addEventListener("click", (e) => {
+    const btn = e.target.closest(".js-ex-info");
+    if (!btn) return;
+
+    e.preventDefault();
+
+    // 1) История (кнопка имеет data-exercise-id)
+    const dataId = btn.getAttribute("data-exercise-id");
+    if (dataId) {
+      openExerciseInfo(dataId, btn.getAttribute("data-exercise-name"));
+      return;
+    }
+
+    // 2) Форма (кнопка стоит рядом с select)
+    const container = rowOf(btn);
+    const select = container ? container.querySelector(".js-exercise-select") : null;
+    const option = select ? select.options[select.selectedIndex] : null;
+
+    openExerciseInfo(select ? select.value : "", option ? option.text : "Упражнение");
+  });
+})();
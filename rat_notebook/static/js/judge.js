@@ -0,0 +1,159 @@
+// Офлайн-режим судьи на странице события: результаты копятся в localStorage
+// и отправляются пачками на идемпотентный endpoint (results/sync.py).
+//
+// Настройки — data-атрибуты формы добавления результата:
+//   form[data-judge-sync-url]   data-judge-sync-url — POST пачки {"entries": [...]}
+//                               data-event-id       — ключ очереди в localStorage
+//   #judgeMode                  переключатель режима (запоминается)
+//   #judgeStatus, #judgeErrors  счётчик очереди и отклонённые записи
+//
+// Запись уходит из очереди только после ответа сервера: сеть пропала,
+// сессия истекла (редирект на логин) — пачка остаётся и повторяется позже.
+// Повтор той же записи сервер узнаёт по id и второй раз не применяет.
+(function () {
+  const form = document.querySelector("form[data-judge-sync-url]");
+  if (!form) return;
+
+  const syncUrl = form.dataset.judgeSyncUrl;
+  const queueKey = `judge-queue:${form.dataset.eventId}`;
+  const modeKey = "judge-mode";
+  const BATCH = 50;
+  const MAX_DELAY = 60000;
+
+  const toggle = document.getElementById("judgeMode");
+  const statusEl = document.getElementById("judgeStatus");
+  const errorsEl = document.getElementById("judgeErrors");
+  const athleteId = document.getElementById("athleteId");
+  const athleteSearch = document.getElementById("athleteSearch");
+  const discipline = document.getElementById("id_discipline");
+  const result = document.getElementById("id_result");
+
+  let inFlight = false;
+  let delay = 2000;
+  let retryTimer = null;
+  let synced = 0;
+
+  function load() {
+    try {
+      return JSON.parse(localStorage.getItem(queueKey)) || [];
+    } catch (e) {
+      return [];
+    }
+  }
+
+  function save(queue) {
+    localStorage.setItem(queueKey, JSON.stringify(queue));
+  }
+
+  function newId() {
+    if (window.crypto && crypto.randomUUID) return crypto.randomUUID();
+    return `${Date.now().toString(36)}-${Math.random().toString(36).slice(2, 12)}`;
+  }
+
+  function getCsrf() {
+    const el = form.querySelector('input[name="csrfmiddlewaretoken"]');
+    return el ? el.value : "";
+  }
+
+  function render() {
+    if (!statusEl) return;
+    const pending = load().length;
+    const parts = [];
+    if (pending) parts.push(`В очереди: ${pending}` + (navigator.onLine ? "" : " (нет сети)"));
+    if (synced) parts.push(`отправлено: ${synced} — обновите страницу, чтобы увидеть места`);
+    statusEl.textContent = parts.join(", ");
+  }
+
+  function reject(entry, text) {
+    if (!errorsEl) return;
+    const item = document.createElement("div");
+    item.textContent = `${entry.label}: ${text}`;
+    errorsEl.append(item);
+    errorsEl.classList.remove("d-none");
+  }
+
+  function scheduleRetry() {
+    clearTimeout(retryTimer);
+    retryTimer = setTimeout(flush, delay);
+    delay = Math.min(delay * 2, MAX_DELAY);
+  }
+
+  async function flush() {
+    const batch = load().slice(0, BATCH);
+    if (inFlight || !batch.length) return render();
+    inFlight = true;
+    try {
+      const resp = await fetch(syncUrl, {
+        method: "POST",
+        headers: {"Content-Type": "application/json", "X-CSRFToken": getCsrf(), "X-Requested-With": "XMLHttpRequest"},
+        body: JSON.stringify({entries: batch.map(({label, ...entry}) => entry)}),
+        credentials: "same-origin",
+        redirect: "error",
+      });
+      if (!resp.ok) throw new Error(`HTTP ${resp.status}`);
+      const data = await resp.json();
+
+      const byId = new Map(batch.map(e => [e.id, e]));
+      const answered = new Set();
+      data.results.forEach(r => {
+        answered.add(r.id);
+        const entry = byId.get(r.id);
+        if (!entry) return;
+        if (r.status === "invalid") reject(entry, r.error);
+        else if (r.status === "conflict") reject(entry, `уже изменён другим судьёй (сейчас ${r.result})`);
+        else synced += 1;
+      });
+      // добавленное во время запроса остаётся в очереди
+      save(load().filter(e => !answered.has(e.id)));
+      delay = 2000;
+      inFlight = false;
+      if (load().length) return flush();
+    } catch (e) {
+      inFlight = false;
+      scheduleRetry();
+    }
+    render();
+  }
+
+  function setMode(on) {
+    toggle.checked = on;
+    localStorage.setItem(modeKey, on ? "1" : "");
+  }
+
+  if (toggle) {
+    setMode(localStorage.getItem(modeKey) === "1");
+    toggle.addEventListener("change", () => setMode(toggle.checked));
+  }
+
+  form.addEventListener("submit", e => {
+    if (!toggle || !toggle.checked) return;
+    e.preventDefault();
+    if (!athleteId.value || !discipline.value) {
+      reject({label: "Запись"}, "выберите спортсмена и дисциплину");
+      return;
+    }
+    const disc = discipline.options[discipline.selectedIndex];
+    const queue = load();
+    queue.push({
+      id: newId(),
+      athlete: Number(athleteId.value),
+      discipline: Number(discipline.value),
+      result: result.value === "" ? null : Number(result.value),
+      label: `${athleteSearch.value} / ${disc.textContent.trim()} = ${result.value || "—"}`,
+    });
+    save(queue);
+    // следующий результат того же спортсмена вводится без повторного поиска
+    result.value = "";
+    result.focus();
+    render();
+    flush();
+  });
+
+  window.addEventListener("online", () => {
+    delay = 2000;
+    flush();
+  });
+  window.addEventListener("offline", render);
+  setInterval(flush, 15000);
+  flush();
+})();